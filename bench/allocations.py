@@ -0,0 +1,137 @@
+"""
+Mémoire allouée par la recherche de la version fonctions
+
+Mesure avec tracemalloc, pour chaque recherche, la mémoire restée
+allouée à la fin et le pic de mémoire au-delà de ce qui reste :
+la table de transposition, les grilles, listes de coups et compteurs
+créés puis libérés en cours de route.
+
+tracemalloc ne voit que la mémoire vivante : les copies de grille,
+aussitôt libérées, pèsent peu sur le pic. On compte donc aussi les
+blocs alloués pendant la recherche : sys.getallocatedblocks() est relu
+à chaque appel et retour de fonction (sys.setprofile) et ses hausses
+sont cumulées, moins l'objet frame que le profileur crée à chaque
+appel. La recherche « copies » est le negamax d'avant push_move / pop_move,
+qui copiait la grille pour chaque coup essayé : la référence à
+laquelle comparer negamax.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.allocations
+"""
+
+import sys
+import time
+import random
+import tracemalloc
+
+from engine import grid as fonctions
+from engine.transposition import TranspositionTable
+
+# (nom, coups déjà joués) ; X commence
+POSITIONS = [
+    ('ouverture', []),
+    ('après un coin', [(0, 0)]),
+    ('milieu de partie', [(1, 1), (0, 0), (2, 2), (0, 2)]),
+]
+FAIBLE_POSITIONS = 2000
+
+
+def functional_grid(moves):
+    grid = fonctions.init_grid()
+    player = fonctions.CROIX
+    for r, c in moves:
+        grid[r][c] = player
+        player = 3 - player
+    return grid, player
+
+
+def copies(grid, player, table):
+    """
+    Le negamax d'avant push_move / pop_move : une copie de la grille
+    par coup essayé
+    """
+    if fonctions.check_winner(grid, 3 - player):
+        return -1
+    elif fonctions.full(grid):
+        return 0
+    key = fonctions.grid_key(grid, player)
+    entry = table.get(key)
+    if entry is not None and entry[1] == fonctions.EXACT:
+        return entry[0]
+    bestScore = -10
+    for r, c in fonctions.empty_cells(grid):
+        grid2 = [grid[row].copy() for row in range(3)]
+        grid2[r][c] = player
+        score = -copies(grid2, 3 - player, table)
+        if score > bestScore:
+            bestScore = score
+    table.store(key, (bestScore, fonctions.EXACT))
+    return bestScore
+
+
+def allocated_blocks(fct):
+    """ Nombre de blocs alloués pendant fct(), libérés ou non """
+    total = 0
+    last = sys.getallocatedblocks()
+    def hook(frame, event, arg):
+        nonlocal total, last
+        now = sys.getallocatedblocks()
+        # à l'appel, le profileur vient de créer l'objet frame
+        grown = now - last - (event == 'call')
+        if grown > 0:
+            total += grown
+        last = now
+    sys.setprofile(hook)
+    fct()
+    sys.setprofile(None)
+    return total
+
+
+def measure(fct):
+    """
+    (durée, mémoire restante, pic au-delà de la mémoire restante,
+    blocs alloués) ; les blocs sont comptés lors d'une seconde exécution
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    elapsed = time.perf_counter()
+    fct()
+    elapsed = time.perf_counter() - elapsed
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, end - start, peak - end, allocated_blocks(fct)
+
+
+def faible_positions(n, seed=0):
+    """ n grilles de milieu de partie, jouées au hasard """
+    random.seed(seed)
+    grids = []
+    for _ in range(n):
+        grid, player = functional_grid([])
+        for r, c in random.sample(fonctions.empty_cells(grid), random.randint(2, 6)):
+            grid[r][c] = player
+            player = 3 - player
+        grids.append((grid, player))
+    return grids
+
+
+def main():
+    fonctions.TABLEBASE.missing = True      # on veut mesurer la recherche
+    print(f'{"recherche":35}{"durée":>10}{"restant":>12}{"pic":>12}{"blocs alloués":>15}')
+    def show(name, elapsed, kept, peak, blocks):
+        print(f'{name:35}{elapsed:>9.3f}s{kept:>11}o{peak:>11}o{blocks:>15}')
+    for name, moves in POSITIONS:
+        grid, player = functional_grid(moves)
+        show('copies, ' + name, *measure(lambda: copies(grid, player, TranspositionTable())))
+        for search in ('negamax', 'alphabeta', 'choice'):
+            fct = getattr(fonctions, search)
+            show(search + ', ' + name, *measure(lambda: fct(grid, player, table=TranspositionTable())))
+    grids = faible_positions(FAIBLE_POSITIONS)
+    def faible():
+        for grid, player in grids:
+            fonctions.faible(grid, player)
+    show(f'faible, {FAIBLE_POSITIONS} positions', *measure(faible))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Nombre de positions visitées : negamax contre alphabeta
+
+Pour quelques positions de référence, on compte les appels
+récursifs de chaque recherche (table de transposition vidée
+avant chaque mesure) et on vérifie que choice() tire le même
+coup que l'ancienne version, à graine aléatoire égale.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.alphabeta
+"""
+
+import random
+
+from engine import grid as fonctions, model as objet
+from engine.transposition import TranspositionTable
+
+# positions de référence : la liste des coups joués depuis la grille vide
+POSITIONS = {
+    'ouverture': [],
+    'après le centre': [(1, 1)],
+    'après un coin': [(0, 0)],
+    'milieu de partie': [(1, 1), (0, 0), (2, 2)],
+    'fin de partie': [(1, 1), (0, 0), (2, 2), (0, 2), (0, 1)],
+}
+
+
+def count_calls(owner, name, run):
+    """
+    Remplace temporairement owner.name par un compteur
+    (les appels récursifs passent par ce nom) et exécute run()
+    """
+    original = getattr(owner, name)
+    calls = 0
+
+    def counter(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(*args, **kwargs)
+
+    setattr(owner, name, counter)
+    try:
+        run()
+    finally:
+        setattr(owner, name, original)
+    return calls
+
+
+def functional_grid(moves):
+    grid = fonctions.init_grid()
+    player = fonctions.CROIX
+    for r, c in moves:
+        grid[r][c] = player
+        player = 3 - player
+    return grid, player
+
+def oo_model(moves):
+    model = objet.GameModel()
+    for move in moves:
+        model.play(move)
+    return model
+
+
+def reference_choice(scores, cells):
+    """ Le tirage de l'ancienne version : tous les coups évalués """
+    best = max(scores[cell] for cell in cells)
+    return random.choice([cell for cell in cells if scores[cell] == best])
+
+
+def functional_nodes(moves):
+    grid, player = functional_grid(moves)
+    root = fonctions.empty_cells(grid)
+
+    def search(name):
+        table = TranspositionTable()
+        def run():
+            search_fct = getattr(fonctions, name)
+            for r, c in root:
+                grid[r][c] = player
+                search_fct(grid, 3 - player, table=table)
+                grid[r][c] = fonctions.EMPTY
+        return count_calls(fonctions, name, run)
+
+    return search('negamax'), search('alphabeta')
+
+def oo_nodes(moves):
+    model = oo_model(moves)
+
+    def search(name):
+        model.table = TranspositionTable()
+        def run():
+            for r, c in model.empty_cells():
+                bit = objet.BITS[r][c]
+                model.put(bit)
+                getattr(model, name)()
+                model.remove(bit)
+        return count_calls(objet.GameModel, name, run)
+
+    return search('negamax'), search('alphabeta')
+
+
+def same_choices(moves, seeds=range(20)):
+    """ choice() tire-t-il le même coup que l'ancienne version ? """
+    grid, player = functional_grid(moves)
+    cells = fonctions.empty_cells(grid)
+    scores = {}
+    for r, c in cells:
+        grid[r][c] = player
+        scores[r, c] = -fonctions.negamax(grid, 3 - player, TranspositionTable())
+        grid[r][c] = fonctions.EMPTY
+    for seed in seeds:
+        random.seed(seed)
+        expected = reference_choice(scores, cells)
+        random.seed(seed)
+        if fonctions.choice(grid, player, TranspositionTable()) != expected:
+            return False
+        random.seed(seed)
+        if oo_model(moves).choice() != expected:
+            return False
+    return True
+
+
+def main():
+    print(f'{"position":20}{"moteur":>12}{"negamax":>10}{"alphabeta":>11}{"économie":>10}  choix')
+    for name, moves in POSITIONS.items():
+        same = 'identique' if same_choices(moves) else 'DIFFÉRENT'
+        for label, count in (('fonctions', functional_nodes), ('objet', oo_nodes)):
+            plain, pruned = count(moves)
+            saved = 1 - pruned / plain
+            print(f'{name:20}{label:>12}{plain:>10}{pruned:>11}{saved:>10.0%}  {same}')
+
+
+if __name__ == '__main__':
+    main()
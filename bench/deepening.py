@@ -0,0 +1,101 @@
+"""
+Approfondissement itératif de MNKModel.choice : coût et latence
+
+1. Ordre des coups : pour des positions tirées au hasard (9x9, 5
+   alignés), la durée d'un choice() mené jusqu'à la profondeur depth
+     - en une passe à cette profondeur (l'ancien choice),
+     - par approfondissement itératif, sans reprendre la variation
+       principale,
+     - par approfondissement itératif avec (le choice actuel).
+2. Latence : des parties de la machine contre elle-même, avec un
+   budget par coup (50 ms par défaut) sur des grilles de plus en plus
+   grandes ; durée médiane et maximale d'un coup, et profondeurs
+   achevées.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.deepening [--positions N] [--depth D] [--budget MS] [--plies N]
+"""
+
+import time
+import random
+from collections import Counter
+
+from engine.model import MNKModel
+
+SEED = 2024
+SIZES = ((9, 9, 5), (15, 15, 5), (19, 19, 5))
+
+
+class OnePassModel(MNKModel):
+    """ Une seule recherche, à la profondeur depth """
+
+    def choice(self):
+        self.deadline = time.monotonic() + self.time_limit
+        self.pv_moves = {}
+        results = self.search_root(self.ordered_moves(self.occupied()), self.depth)
+        best = max(results.values())
+        return divmod(random.choice([i for i in sorted(results) if results[i] == best]), self.width)
+
+class NoPVModel(MNKModel):
+    """ Approfondissement itératif, sans mémoire des meilleurs coups """
+
+    def alphabeta(self, *args):
+        self.pv_moves.clear()
+        return MNKModel.alphabeta(self, *args)
+
+
+def random_position(model, marks):
+    for i in random.sample(range(model.nb_cells), marks):
+        model.put(model.bits[i])
+    return model
+
+
+def ordering(positions, depth):
+    print(f'9x9, 5 alignés, profondeur {depth} : {positions} positions')
+    for name, cls in (('une passe', OnePassModel), ('itératif', NoPVModel),
+                      ('itératif + PV', MNKModel)):
+        random.seed(SEED)
+        elapsed = 0
+        for _ in range(positions):
+            model = random_position(cls(9, 9, 5, depth=depth, time_limit=3600), 6)
+            start = time.perf_counter()
+            model.choice()
+            elapsed += time.perf_counter() - start
+        print(f'  {name:16}{1000 * elapsed / positions:9.1f} ms par coup')
+
+
+def latency(budget, plies):
+    print(f'budget de {1000 * budget:.0f} ms par coup, {plies} coups par grille')
+    for width, height, k in SIZES:
+        random.seed(SEED)
+        model = MNKModel(width, height, k, depth=width * height, time_limit=budget)
+        times, depths = [], Counter()
+        while len(times) < plies:
+            if model.end_game():
+                model.reset()
+            start = time.perf_counter()
+            move = model.choice()
+            times.append(time.perf_counter() - start)
+            depths[model.completed_depth] += 1
+            model.play(move)
+        times.sort()
+        print(f'  {width}x{height}, {k} alignés : médiane {1000 * times[len(times) // 2]:.1f} ms, '
+              f'max {1000 * times[-1]:.1f} ms ; profondeurs achevées '
+              + ', '.join(f'{depth}: {count}' for depth, count in sorted(depths.items())))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Approfondissement itératif : coût et latence')
+    parser.add_argument('--positions', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--budget', type=float, default=50, help='ms par coup')
+    parser.add_argument('--plies', type=int, default=40)
+    args = parser.parse_args()
+    ordering(args.positions, args.depth)
+    latency(args.budget / 1000, args.plies)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Version fonctions contre version objet : qui est la plus rapide ?
+
+Chronomètre les mêmes opérations sur les deux moteurs, depuis des
+positions fixes (ouverture, milieu et fin de partie) : choice,
+negamax (table de transposition neuve à chaque appel), check_winner,
+faible, et des parties complètes faible contre negamax. La table de
+finales est désactivée : on mesure la recherche.
+
+Chaque mesure est répétée (--samples fois, 7 par défaut), le hasard
+étant réinitialisé avec la même graine avant chaque échantillon ; on
+affiche la médiane, l'écart type relatif et le rapport des deux
+moteurs. --save enregistre les résultats dans un fichier de référence
+(bench/baseline.json par défaut, propre à la machine, non suivi par
+git) ; s'il existe, les lancements suivants s'y comparent et signalent
+les écarts qui dépassent le bruit de mesure. Une boucle étalon, qui
+ne dépend pas du code du dépôt, est mesurée à chaque lancement : les
+comparaisons sont corrigées de la vitesse de la machine du moment.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.engines [--save] [--baseline FICHIER] [--samples N]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+
+from engine import grid as fonctions
+from engine.model import GameModel
+from engine.simulation import simulate
+from engine.tablebase import TABLEBASE
+from engine.transposition import TranspositionTable
+
+SEED = 2018
+SAMPLES = 7
+MIN_TIME = 0.02         # durée minimale d'un échantillon, en secondes
+TOLERANCE = 0.10        # écart relatif toujours considéré comme du bruit
+GAMES = 20              # parties par échantillon pour self-play
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# positions de référence : les coups joués depuis la grille vide
+POSITIONS = {
+    'ouverture': [],
+    'milieu': [(1, 1), (0, 0), (2, 2)],
+    'fin': [(1, 1), (0, 0), (2, 2), (0, 2), (0, 1), (2, 1)],
+}
+
+
+# -- LES OPÉRATIONS MESURÉES
+# --
+
+def functional_grid(moves):
+    grid = fonctions.init_grid()
+    player = fonctions.CROIX
+    for r, c in moves:
+        grid[r][c] = player
+        player = 3 - player
+    return grid, player
+
+def oo_model(moves):
+    model = GameModel()
+    for move in moves:
+        model.play(move)
+    return model
+
+
+def functional_operations(moves):
+    grid, player = functional_grid(moves)
+    return {
+        'choice': lambda: fonctions.choice(grid, player, TranspositionTable()),
+        'negamax': lambda: fonctions.negamax(grid, player, TranspositionTable()),
+        'check_winner': lambda: fonctions.check_winner(grid, player),
+        'faible': lambda: fonctions.faible(grid, player),
+    }
+
+def oo_operations(moves):
+    model = oo_model(moves)
+
+    def search(method):
+        def run():
+            model.table = TranspositionTable()
+            return method()
+        return run
+
+    return {
+        'choice': search(model.choice),
+        'negamax': search(model.negamax),
+        'check_winner': model.check_winner,
+        'faible': model.faible,
+    }
+
+
+def benchmarks():
+    """ Les mesures : {(opération, position): {moteur: fonction}} """
+    cases = {}
+    for name, moves in POSITIONS.items():
+        functional = functional_operations(moves)
+        oo = oo_operations(moves)
+        for operation in functional:
+            cases[operation, name] = {'fonctions': functional[operation], 'objet': oo[operation]}
+
+    def self_play(engine):
+        def run():
+            fonctions.TABLE.clear()     # chaque échantillon part d'une table vide
+            simulate(GAMES, 'faible', 'negamax', SEED, engine)
+        return run
+
+    cases['self-play', f'{GAMES} parties'] = {engine: self_play(engine)
+                                              for engine in ('fonctions', 'objet')}
+    return cases
+
+
+# -- LA MESURE
+# --
+
+def calibrate(fct):
+    """ Le nombre d'appels pour qu'un échantillon dure au moins MIN_TIME """
+    number = 1
+    while True:
+        random.seed(SEED)
+        start = time.perf_counter()
+        for _ in range(number):
+            fct()
+        if time.perf_counter() - start >= MIN_TIME:
+            return number
+        number *= 2
+
+def measure(fct, samples):
+    """ Durée d'un appel : médiane, minimum et écart type relatif """
+    number = calibrate(fct)
+    times = []
+    for _ in range(samples):
+        random.seed(SEED)
+        start = time.perf_counter()
+        for _ in range(number):
+            fct()
+        times.append((time.perf_counter() - start) / number)
+    median = statistics.median(times)
+    return {
+        'median': median,
+        'min': min(times),
+        'stdev': statistics.stdev(times) / median if samples > 1 else 0.0,
+        'number': number,
+        'samples': samples,
+    }
+
+
+def etalon():
+    """ Du Python pur, indépendant du code du dépôt """
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def key(operation, position, engine):
+    return f'{operation}/{position}/{engine}'
+
+def duration(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds:.2f} s'
+
+def compare(result, reference, speed=1.0):
+    """
+    Évolution par rapport à la référence, corrigée de la vitesse
+    relative de la machine (speed) : signalée seulement si la
+    médiane et le minimum s'écartent tous deux au-delà du bruit
+    """
+    ratio = result['median'] / reference['median'] / speed
+    best = result['min'] / reference['min'] / speed
+    noise = max(TOLERANCE, 2 * result['stdev'], 2 * reference['stdev'])
+    if min(ratio, best) > 1 + noise:
+        return f'RÉGRESSION x{ratio:.2f}'
+    if max(ratio, best) < 1 - noise:
+        return f'gain x{1 / ratio:.2f}'
+    return '='
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Version fonctions contre version objet')
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    parser.add_argument('--baseline', default=BASELINE, help='fichier de référence')
+    parser.add_argument('--save', action='store_true', help='enregistre la référence')
+    args = parser.parse_args()
+
+    TABLEBASE.missing = True
+    reference = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as baseline:
+            reference = json.load(baseline)['results']
+
+    results = {'etalon': measure(etalon, args.samples)}
+    speed = results['etalon']['median'] / reference['etalon']['median'] if reference else 1.0
+    if reference:
+        print(f'étalon : x{speed:.2f} par rapport à la référence (> 1 : machine plus lente)')
+    print(f'{"opération":14}{"position":12}{"fonctions":>20}{"objet":>20}{"rapport":>10}'
+          + ('  évolution (fonctions / objet)' if reference else ''))
+    for (operation, position), engines in benchmarks().items():
+        line = f'{operation:14}{position:12}'
+        changes = []
+        for engine, fct in engines.items():
+            result = results[key(operation, position, engine)] = measure(fct, args.samples)
+            line += f'{duration(result["median"]):>12} ±{result["stdev"]:>4.0%}  '
+            old = reference.get(key(operation, position, engine))
+            changes.append(compare(result, old, speed) if old else '?')
+        ratio = (results[key(operation, position, 'fonctions')]['median']
+                 / results[key(operation, position, 'objet')]['median'])
+        line += f'{ratio:>8.1f}x'
+        if reference:
+            line += '  ' + ' / '.join(changes)
+        print(line)
+    print('rapport : durée version fonctions / durée version objet')
+
+    if args.save:
+        with open(args.baseline, 'w') as baseline:
+            json.dump({
+                'python': sys.version.split()[0],
+                'machine': platform.machine(),
+                'date': time.strftime('%Y-%m-%d %H:%M'),
+                'seed': SEED,
+                'results': results,
+            }, baseline, indent=1)
+        print(f'référence enregistrée dans {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Durée d'affichage d'un coup dans tictactoe_oo.py : marques tamponnées
+contre marques tracées
+
+La vue traçait autrefois chaque croix et chaque rond trait par trait
+(fd, circle) et effaçait tout l'écran à chaque nouvelle partie ;
+elle tamponne maintenant des formes enregistrées une fois pour toutes
+et, pour une nouvelle partie, retire seulement les tampons.
+
+On rejoue les mêmes parties machine contre machine (au hasard, pour
+que seul l'affichage compte) avec les deux vues, et on mesure :
+la durée d'une image (view.update(), dessin et rafraîchissement de la
+fenêtre compris) et celle de l'écran d'une nouvelle partie.
+
+Il faut un affichage : la fenêtre turtle s'ouvre le temps de la mesure.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.frames [--games N] [largeur hauteur k]
+"""
+
+import sys
+import math
+import time
+import types
+import random
+import tkinter
+import statistics
+
+SEED = 2018
+GAMES = 20
+
+
+def stroke_view():
+    """ La vue d'avant : marques tracées, écran effacé à chaque partie """
+    from tictactoe_oo import GameView
+
+    class StrokeView(GameView):
+
+        def __init__(self, controller, model):
+            super().__init__(controller, model)
+            self.screen.tracer(300)
+
+        def game_screen(self):
+            self.clear()
+            self.draw_title()
+            self.draw_grid()
+            self.screen.update()
+
+        def cross(self, centre, small=False):
+            self.seth(0)
+            self.color(GameView.CROSS_COLOR)
+            self.pensize(self.mark_thickness)
+            d = round(2*self.game_size / (3*math.sqrt(2)))
+            if small:
+                d = round(d/1.5)
+            self.move_to(centre)
+            self.left(45)
+            for _ in range(4):
+                self.fd(d)
+                self.move_to(centre)
+                self.left(90)
+
+        def round(self, centre, small=False):
+            x, y = centre
+            self.seth(0)
+            self.color(GameView.CIRCLE_COLOR)
+            self.pensize(self.mark_thickness)
+            self.move_to((x, y - self.game_size // 2 + self.mark_thickness))
+            radius = self.game_size // 2 - self.margin // 2 - self.mark_thickness // 2
+            if small:
+                radius = round(radius / 1.5)
+            self.circle(radius)
+
+    return StrokeView
+
+
+def stamp_view():
+    from tictactoe_oo import GameView
+    return GameView
+
+
+def measure(view_class, games, width, height, k):
+    """ Les durées (en s) des images et des écrans de nouvelle partie """
+    from engine.model import GameModel, MNKModel
+
+    model = GameModel() if (width, height, k) == (3, 3, 3) else MNKModel(width, height, k)
+    controller = types.SimpleNamespace(last_move=None, stats=None, fast=lambda: False)
+    view = view_class(controller, model)
+    view.first_screen()
+    view.screen.update()
+    random.seed(SEED)
+    frames, screens = [], []
+    for _ in range(games):
+        model.reset()
+        start = time.perf_counter()
+        view.game_screen()
+        screens.append(time.perf_counter() - start)
+        over = False
+        while not over:
+            controller.last_move = model.hasard()
+            start = time.perf_counter()
+            view.update()
+            frames.append(time.perf_counter() - start)
+            over = model.play(controller.last_move)
+    view.screen.clear()     # la vue suivante repart d'un écran neuf
+    return frames, screens
+
+
+def summary(times):
+    times = sorted(times)
+    return (f'{1000 * statistics.mean(times):8.2f}{1000 * statistics.median(times):8.2f}'
+            f'{1000 * times[int(0.95 * (len(times) - 1))]:8.2f}{1000 * times[-1]:8.2f}')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Durée d'affichage d'un coup")
+    parser.add_argument('--games', type=int, default=GAMES)
+    parser.add_argument('sizes', type=int, nargs='*', help='largeur hauteur k')
+    args = parser.parse_args()
+    width, height, k = (args.sizes + [3, 3, 3][len(args.sizes):])[:3]
+
+    try:
+        results = {name: measure(view(), args.games, width, height, k)
+                   for name, view in (('traits', stroke_view), ('tampons', stamp_view))}
+    except tkinter.TclError as error:
+        sys.exit(f"pas d'affichage disponible : {error}")
+
+    print(f'{width}x{height}, {k} alignés, {args.games} parties au hasard ; durées en ms')
+    print(f'{"":26}{"moy.":>8}{"méd.":>8}{"95%":>8}{"max":>8}')
+    for name, (frames, screens) in results.items():
+        print(f'{name + ", image":26}{summary(frames)}')
+        print(f'{name + ", nouvelle partie":26}{summary(screens)}')
+    old, new = (statistics.median(results[name][0]) for name in ('traits', 'tampons'))
+    print(f'image : x{old / new:.1f} plus rapide avec les tampons')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Temps d'import du moteur
+
+Chaque mesure se fait dans un nouvel interpréteur (python -X importtime),
+la meilleure de REPEAT est retenue. On distingue le coût propre des
+modules du paquet engine de celui des modules de la bibliothèque
+standard qu'ils importent, et on vérifie que turtle n'est pas chargé.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.import_time
+"""
+
+import sys
+import subprocess
+
+REPEAT = 10
+MODULES = ('engine.model', 'engine.grid')
+REFERENCE = 'json'      # pour situer la machine : import de json
+
+
+def measure(modules):
+    """ (coût propre des modules engine, coût total) en millisecondes """
+    code = f'import sys, {", ".join(modules)}; print("turtle" in sys.modules or "tkinter" in sys.modules)'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, check=True)
+    if result.stdout.strip() != 'False':
+        raise RuntimeError('le moteur a importé turtle')
+    own = total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip().startswith('engine'):
+            own += int(self_us)
+        if not name.startswith('  '):       # modules importés directement
+            total += int(cumulative)
+    return own / 1000, total / 1000
+
+
+def main():
+    runs = [measure(MODULES) for _ in range(REPEAT)]
+    own = min(run[0] for run in runs)
+    total = min(run[1] for run in runs)
+    reference = min(measure((REFERENCE,))[1] for _ in range(REPEAT))
+    print(f'import {", ".join(MODULES)} : {total:.1f} ms au total, '
+          f'dont {own:.1f} ms pour les modules du moteur (turtle non chargé)')
+    print(f'pour comparaison, import {REFERENCE} : {reference:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
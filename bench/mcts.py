@@ -0,0 +1,127 @@
+"""
+MCTS contre negamax : qualité des coups et vitesse
+
+1. Sur le 3x3, où negamax connaît le score exact de chaque coup :
+   pour des positions tirées au hasard (parties jouées au hasard),
+   la part des coups de MCTSModel qui sont parmi les meilleurs,
+   et la durée d'un coup, pour plusieurs budgets d'itérations.
+   GameModel.choice (sans table de finales) sert de référence.
+2. Sur une grande grille (7x7, 4 alignés par défaut) : des parties
+   MCTSModel contre l'alpha-beta limité de MNKModel, à temps par
+   coup égal, couleurs alternées ; avec les itérations par seconde
+   et la part des itérations héritées du coup précédent (arbre
+   réutilisé).
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.mcts [--positions N] [--games N] [--time S] [--size L H K]
+"""
+
+import time
+import random
+import statistics
+
+from engine.mcts import MCTSModel
+from engine.model import GameModel, MNKModel, CROSS
+from engine.tablebase import TABLEBASE
+
+SEED = 2018
+BUDGETS = (100, 1000, 5000)
+
+
+def random_positions(n):
+    """ n positions non finies, distinctes, de parties jouées au hasard """
+    model = GameModel()
+    positions = set()
+    while len(positions) < n:
+        model.reset()
+        for move in random.sample(model.empty_cells(), random.randint(0, 7)):
+            if model.play(move):
+                break
+            positions.add((tuple(model.boards), model.player))
+    return sorted(positions)[:n]
+
+def set_position(model, boards, player):
+    model.boards = list(boards)
+    model.player = player
+    model.count()
+
+def best_moves(boards, player):
+    """ Les coups de score maximal, calculés par negamax """
+    model = GameModel()
+    set_position(model, boards, player)
+    scores = {move: model.score_move(move) for move in model.empty_cells()}
+    best = max(scores.values())
+    return {move for move, score in scores.items() if score == best}
+
+
+def quality(positions):
+    print(f'3x3, {len(positions)} positions : coups parmi les meilleurs, durée par coup')
+    optimal = {position: best_moves(*position) for position in positions}
+    engines = [('negamax', GameModel())] + [(f'mcts {budget} it.', MCTSModel(iterations=budget))
+                                            for budget in BUDGETS]
+    for name, model in engines:
+        good, times = 0, []
+        for position in positions:
+            set_position(model, *position)
+            start = time.perf_counter()
+            move = model.choice()
+            times.append(time.perf_counter() - start)
+            good += move in optimal[position]
+        print(f'  {name:18}{100 * good / len(positions):6.1f} %{1000 * statistics.mean(times):9.2f} ms')
+
+
+def match(games, seconds, width, height, k):
+    print(f'{width}x{height}, {k} alignés : MCTS contre alpha-beta (profondeur '
+          f'{MNKModel.DEPTH}), {seconds} s par coup, {games} parties')
+    mcts = MCTSModel(width, height, k, time_limit=seconds)
+    alphabeta = MNKModel(width, height, k, time_limit=seconds)
+    results = {'mcts': 0, 'alpha-beta': 0, 'nulle': 0}
+    iterations = reused = 0
+    durations = {'mcts': [], 'alpha-beta': []}
+    for game in range(games):
+        mcts.reset()
+        alphabeta.reset()
+        players = {CROSS: 'mcts', 3 - CROSS: 'alpha-beta'} if game % 2 == 0 else \
+                  {CROSS: 'alpha-beta', 3 - CROSS: 'mcts'}
+        over = False
+        while not over:
+            name = players[mcts.player]
+            start = time.perf_counter()
+            if name == 'mcts':
+                move = mcts.choice()
+                elapsed = time.perf_counter() - start
+                iterations += mcts.tree.visits[mcts.tree.root] - mcts.reused
+                reused += mcts.reused
+            else:
+                move = alphabeta.choice()
+                elapsed = time.perf_counter() - start
+            durations[name].append(elapsed)
+            over = mcts.play(move)
+            alphabeta.play(move)
+        results[players[mcts.winner] if mcts.winner else 'nulle'] += 1
+    print(f'  victoires MCTS {results["mcts"]}, alpha-beta {results["alpha-beta"]}, '
+          f'nulles {results["nulle"]}')
+    for name, times in durations.items():
+        print(f'  {name:12}{1000 * statistics.mean(times):8.1f} ms par coup (max {1000 * max(times):.1f})')
+    print(f'  MCTS : {iterations / sum(durations["mcts"]):.0f} itérations/s, '
+          f'{100 * reused / (iterations + reused):.1f} % des visites héritées du coup précédent')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='MCTS contre negamax')
+    parser.add_argument('--positions', type=int, default=100)
+    parser.add_argument('--games', type=int, default=6)
+    parser.add_argument('--time', type=float, default=0.2, help='secondes par coup (grande grille)')
+    parser.add_argument('--size', type=int, nargs=3, default=(7, 7, 4), metavar=('L', 'H', 'K'))
+    args = parser.parse_args()
+
+    TABLEBASE.missing = True    # negamax cherche vraiment
+    random.seed(SEED)
+    quality(random_positions(args.positions))
+    match(args.games, args.time, *args.size)
+
+
+if __name__ == '__main__':
+    main()
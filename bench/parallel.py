@@ -0,0 +1,86 @@
+"""
+Passage à l'échelle de la recherche parallèle à la racine
+
+Chronomètre choice() sur quelques positions de grilles plus grandes
+(MNKModel) en faisant varier le nombre de processus. La première
+mesure de chaque pool, qui inclut le démarrage des processus, est
+écartée. Sans table de finales, le 3x3 en version fonctions est
+aussi mesuré depuis la grille vide (les processus gardent leur table
+de transposition d'un appel à l'autre, pas le processus principal).
+
+Chaque processus évalue ses coups avec une fenêtre complète : sur
+un seul cœur, le mode parallèle est donc plus lent que la recherche
+séquentielle, qui resserre sa fenêtre d'un coup à l'autre.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.parallel [nombre maximal de processus]
+"""
+
+import sys
+import time
+import random
+import statistics
+
+from engine import parallel, grid as fonctions
+from engine.model import MNKModel
+
+# (largeur, hauteur, k, profondeur, nombre de coups déjà joués)
+POSITIONS = [
+    (5, 5, 4, 4, 4),
+    (7, 7, 5, 3, 6),
+    (15, 15, 5, 2, 8),
+]
+REPEAT = 3
+
+
+def position(width, height, k, depth, nb_moves, seed=0):
+    """ Une position obtenue par nb_moves coups de la stratégie faible """
+    random.seed(seed)
+    model = MNKModel(width, height, k, depth=depth, time_limit=600)
+    for _ in range(nb_moves):
+        model.play(model.faible())
+    return model
+
+
+def timing(fct):
+    fct()       # échauffement : démarrage du pool, tables de transposition
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fct()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def cell(elapsed, base):
+    return f'{elapsed:.3f}s x{base / elapsed:.1f}'.rjust(15)
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else parallel.cpu_count()
+    counts = [None] + [n for n in (2, 4, 8, 16) if n <= max_workers]
+    print(f'{parallel.cpu_count()} processeurs, seuil de {parallel.CUTOFF} coups')
+    print(f'{"position":30}' + ''.join(f'{n or 1:>9} proc.' for n in counts))
+    for width, height, k, depth, nb_moves in POSITIONS:
+        model = position(width, height, k, depth, nb_moves)
+        line = f'{width}x{height} k={k} prof. {depth}, {nb_moves} coups'.ljust(30)
+        base = None
+        for workers in counts:
+            model.workers = workers
+            elapsed = timing(model.choice)
+            base = base or elapsed
+            line += cell(elapsed, base)
+        print(line)
+    fonctions.TABLEBASE.missing = True      # on veut mesurer la recherche
+    grid = fonctions.init_grid()
+    line = '3x3 fonctions, grille vide'.ljust(30)
+    base = None
+    for workers in counts:
+        elapsed = timing(lambda: fonctions.choice(grid, fonctions.CROIX,
+                                                  fonctions.TranspositionTable(), workers))
+        base = base or elapsed
+        line += cell(elapsed, base)
+    print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Rendu sans écran (engine/render.py) : images par seconde
+
+Des parties jouées au hasard (3x3, et une grande grille) sont écrites
+sur disque, dans un dossier temporaire, par export() : position finale
+en SVG et en PNG, une image par position, animation SVG. Pour chaque
+cas : le nombre d'images, les images par seconde et la taille moyenne
+d'un fichier.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.render [--games N] [--scale S]
+"""
+
+import os
+import time
+import random
+import tempfile
+
+from engine.records import Record
+from engine.render import export
+
+SEED = 2021
+CASES = (('SVG, position finale', 'svg', False, False),
+         ('SVG animé', 'svg', False, True),
+         ('SVG, chaque position', 'svg', True, False),
+         ('PNG, position finale', 'png', False, False),
+         ('PNG, chaque position', 'png', True, False))
+
+
+def random_games(n, width=3, height=3, k=3):
+    """ n parties aux coups tirés au hasard (jusqu'à remplir la grille) """
+    cells = [(row, col) for row in range(height) for col in range(width)]
+    return [Record(width, height, k, ('hasard', 'hasard'), None,
+                   tuple(random.sample(cells, random.randint(1, len(cells)))))
+            for _ in range(n)]
+
+
+def measure(games, scale):
+    name = '{}x{}'.format(games[0].width, games[0].height)
+    print(f'{len(games)} parties {name}, échelle {scale}')
+    for label, fmt, plies, animate in CASES:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            count = export(games, directory, fmt, plies, animate, scale)
+            elapsed = time.perf_counter() - start
+            size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        print(f'  {label:24}{count:8} images{count / elapsed:10.0f} images/s'
+              f'{size / count / 1024:8.1f} Ko')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rendu SVG/PNG sans écran')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--scale', type=float, default=1.0)
+    args = parser.parse_args()
+    random.seed(SEED)
+    measure(random_games(args.games), args.scale)
+    measure(random_games(args.games // 10, 9, 9, 5), args.scale)
+
+
+if __name__ == '__main__':
+    main()
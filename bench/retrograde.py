@@ -0,0 +1,70 @@
+"""
+Résolution rétrograde (engine/retrograde.py) : durée et mémoire par grille
+
+Chaque grille est résolue dans un processus neuf, qui écrit son fichier
+dans un dossier temporaire : le pic de mémoire mesuré est le sien. Pour
+chaque grille : positions atteignables, valeur de la grille vide, durée
+des passes en avant et en arrière, taille du fichier, pic de mémoire,
+puis la durée d'un coup de MNKModel.choice qui lit le fichier.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.retrograde [--sizes 3x3x3 4x4x4 ...] [--workers N]
+"""
+
+import os
+import time
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from engine.model import MNKModel
+from engine import retrograde
+from engine.retrograde import build, solution
+
+SEED = 2025
+SIZES = ('3x3x3', '3x4x3', '4x4x3', '4x4x4')
+OUTCOMES = ('perdue', 'nulle', 'gagnée')
+
+
+def query_time(config, path, moves=200):
+    """ Durée moyenne d'un choice() sur des positions de parties au hasard """
+    solution(*config, path)     # le fichier du dossier temporaire, le temps de la mesure
+    try:
+        model = MNKModel(*config)
+        elapsed = 0
+        for _ in range(moves):
+            if model.end_game():
+                model.reset()
+            start = time.perf_counter()
+            model.choice()
+            elapsed += time.perf_counter() - start
+            model.play(random.choice(model.empty_cells()))
+    finally:
+        retrograde._solutions.pop(config, None)
+    return elapsed / moves
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Résolution rétrograde : durée et mémoire')
+    parser.add_argument('--sizes', nargs='+', default=SIZES, help='largeurxhauteurxk')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    random.seed(SEED)
+    print(f'{"grille":10}{"positions":>11}{"vide":>8}{"avant":>8}{"arrière":>9}'
+          f'{"fichier":>9}{"mémoire":>9}{"choice":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            config = tuple(int(value) for value in size.split('x'))
+            path = os.path.join(directory, f'{size}.bin')
+            with ProcessPoolExecutor(1) as pool:
+                stats = pool.submit(build, *config, path, args.workers).result()
+            memory = f'{stats["memory"] / 1e6:7.0f} Mo' if stats['memory'] else '      ?'
+            print(f'{size:10}{stats["positions"]:11}{OUTCOMES[stats["root"]]:>8}'
+                  f'{stats["forward"]:7.1f}s{stats["backward"]:8.1f}s'
+                  f'{stats["size"] / 1e6:6.1f} Mo{memory}{1000 * query_time(config, path):7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Test de charge du serveur de coups (engine/server.py)
+
+Des clients asyncio, chacun sur sa connexion persistante, envoient
+leurs requêtes les unes après les autres : des positions tirées de
+parties jouées au hasard, /move, /scores et /play mélangés. Sans
+--port, un serveur est lancé dans un processus à part, sur un port
+libre de localhost, puis arrêté à la fin.
+
+Affiche les requêtes par seconde, les percentiles de latence (par
+type de requête et en tout) et l'état du cache du serveur.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.server [--requests N] [--clients N] [--port P]
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import subprocess
+
+from engine.model import GameModel
+from engine.server import HOST
+
+SEED = 2019
+PERCENTILES = (50, 90, 99)
+ROUTES = ('/move', '/scores', '/play')
+
+
+def random_positions(n):
+    """ n grilles JSON non finies, de parties jouées au hasard """
+    model = GameModel()
+    grids = []
+    while len(grids) < n:
+        model.reset()
+        for move in random.sample(model.empty_cells(), random.randint(0, 7)):
+            if model.play(move):
+                break
+            grids.append(model.grid)
+    return grids[:n]
+
+def random_request(grids):
+    grid = random.choice(grids)
+    path = random.choice(ROUTES)
+    body = {'grid': grid}
+    if path == '/play':
+        body['move'] = random.choice([[row, col] for row in range(3) for col in range(3)
+                                      if not grid[row][col]])
+    return path, json.dumps(body).encode()
+
+
+async def exchange(reader, writer, method, path, body=b''):
+    """ Une requête sur la connexion ; retourne (code, réponse) """
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: {HOST}\r\n'
+                 f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+                 .encode('latin-1') + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def client(port, requests, latencies):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    for path, body in requests:
+        start = time.perf_counter()
+        status, _ = await exchange(reader, writer, 'POST', path, body)
+        latencies[path].append(time.perf_counter() - start)
+        if status != 200:
+            raise RuntimeError(f'{path} : code {status}')
+    writer.close()
+
+async def load(port, requests, clients):
+    latencies = {path: [] for path in ROUTES}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests[i::clients], latencies) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection(HOST, port)
+    _, stats = await exchange(reader, writer, 'GET', '/stats')
+    writer.close()
+    return elapsed, latencies, stats
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, len(values) * p // 100)]
+
+def report(elapsed, latencies, stats, clients):
+    total = sum(len(values) for values in latencies.values())
+    print(f'{total} requêtes, {clients} clients : {elapsed:.2f} s, {total / elapsed:.0f} requêtes/s')
+    print('  latence (ms)' + ''.join(f'{"p" + str(p):>9}' for p in PERCENTILES) + f'{"max":>9}')
+    everything = sorted(value for values in latencies.values() for value in values)
+    for name, values in list(latencies.items()) + [('tout', everything)]:
+        values = sorted(values)
+        print(f'  {name:12}' + ''.join(f'{1000 * percentile(values, p):9.2f}' for p in PERCENTILES)
+              + f'{1000 * values[-1]:9.2f}')
+    print(f'  cache : {stats["cache"]} positions, {stats["hits"]} succès, {stats["misses"]} échecs ; '
+          f'{stats["batches"]} lots de {stats["batch_size"]} positions en moyenne')
+
+
+def start_server():
+    """ Le serveur dans un autre processus, et son port """
+    process = subprocess.Popen([sys.executable, '-m', 'engine.server', '--port', '0'],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()    # à l'écoute sur http://host:port
+    if not line:
+        raise RuntimeError('le serveur n\'a pas démarré')
+    return process, int(line.rsplit(':', 1)[1])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Test de charge du serveur de coups')
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--clients', type=int, default=50, help='connexions simultanées')
+    parser.add_argument('--port', type=int, default=None, help='serveur déjà lancé sur ce port')
+    args = parser.parse_args()
+
+    random.seed(SEED)
+    grids = random_positions(1000)
+    requests = [random_request(grids) for _ in range(args.requests)]
+    process, port = (None, args.port) if args.port else start_server()
+    try:
+        report(*asyncio.run(load(port, requests, args.clients)), args.clients)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
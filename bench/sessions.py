@@ -0,0 +1,108 @@
+"""
+SessionManager : mémoire par session et coups par seconde
+
+1. Mémoire : tracemalloc mesure n sessions ouvertes, comparées à
+   n GameModel (un par partie, comme GameController).
+2. Débit : n parties humain (coups au hasard) contre machine, jouées
+   de front ; les coups de la machine sont joués
+     - par lots : un step() après le coup de toutes les sessions,
+     - un à un : un step() après chaque coup humain,
+     - par GameModel.choice, un modèle par partie.
+3. Éviction : durée de evict() sur toutes les sessions.
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.sessions [--sessions N] [--no-tablebase]
+"""
+
+import time
+import random
+import tracemalloc
+
+from engine.model import GameModel, ROUND
+from engine.sessions import SessionManager
+from engine.tablebase import TABLEBASE
+
+SEED = 2020
+
+
+def memory(n):
+    print(f'mémoire pour {n} parties')
+    for name, create in (('SessionManager', lambda: [sessions.open() for _ in range(n)]),
+                         ('GameModel', lambda: [GameModel() for _ in range(n)])):
+        sessions = SessionManager()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = create()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(f'  {name:16}{used / n:8.0f} octets par partie')
+        del kept
+
+
+def free_cell(x, o):
+    return random.choice([divmod(i, 3) for i in range(9) if not (x | o) >> i & 1])
+
+def play_sessions(n, batched):
+    """ n parties de front ; retourne (coups joués, durée, gestionnaire) """
+    sessions = SessionManager()
+    games = [sessions.open(machine=ROUND) for _ in range(n)]
+    moves = 0
+    start = time.perf_counter()
+    while games:
+        for session in games:
+            x, o = sessions.state(session)[:2]
+            sessions.play(session, free_cell(x, o))
+            moves += 1
+            if not batched:
+                moves += len(sessions.step())
+        if batched:
+            moves += len(sessions.step())
+        games = [session for session in games if not sessions.over(session)]
+    return moves, time.perf_counter() - start, sessions
+
+def play_models(n):
+    """ Les mêmes parties, un GameModel par partie ; retourne (coups joués, durée) """
+    models = [GameModel() for _ in range(n)]
+    moves = 0
+    start = time.perf_counter()
+    while models:
+        for model in models:
+            if not model.play(free_cell(model.boards[1], model.boards[2])):
+                model.play(model.choice())
+                moves += 1
+            moves += 1
+        models = [model for model in models if not model.winner and model.empty]
+    return moves, time.perf_counter() - start
+
+
+def throughput(n):
+    print(f'{n} parties humain (au hasard) contre machine, de front')
+    for name, batched in (('par lots', True), ('un à un', False)):
+        random.seed(SEED)
+        moves, elapsed, sessions = play_sessions(n, batched)
+        stats = sessions.stats()
+        print(f'  {name:16}{moves / elapsed:10.0f} coups/s   {stats["batches"]} lots, '
+              f'{stats["searched"]} positions cherchées pour {stats["machine_moves"]} coups de la machine')
+    random.seed(SEED)
+    moves, elapsed = play_models(n)
+    print(f'  {"GameModel.choice":16}{moves / elapsed:10.0f} coups/s')
+    start = time.perf_counter()
+    evicted = sessions.evict(now=time.monotonic() + sessions.idle)
+    print(f'éviction de {evicted} sessions : {1000 * (time.perf_counter() - start):.1f} ms')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mémoire et débit du gestionnaire de sessions')
+    parser.add_argument('--sessions', type=int, default=10_000)
+    parser.add_argument('--no-tablebase', action='store_true', help='chercher sans la table de finales')
+    args = parser.parse_args()
+    if args.no_tablebase:
+        TABLEBASE.missing = True
+    memory(args.sessions)
+    throughput(args.sessions)
+
+
+if __name__ == '__main__':
+    main()
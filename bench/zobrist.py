@@ -0,0 +1,116 @@
+"""
+Clés de Zobrist (engine/zobrist.py) : coût d'une clé selon la taille
+
+Pour des positions tirées au hasard, sur des grilles de plus en plus
+grandes, la durée moyenne d'une clé :
+  - tuple      : (plateau X, plateau O, trait) haché par un dict,
+                 l'ancienne clé de MNKModel, sans symétrie ;
+  - images     : la plus petite image des plateaux par les isométries,
+                 recalculée cellule par cellule (la clé canonique sans
+                 Zobrist) ;
+  - key()      : la clé canonique de Zobrist, tenue à jour par le modèle ;
+  - put+remove : un coup joué puis annulé, mise à jour des clés comprise.
+
+Sur le 3x3, on compare aussi la recherche complète (alphabeta, table de
+transposition vidée) avec l'ancienne clé position_key et avec key().
+
+Lancement, depuis la racine du dépôt :
+    python -m bench.zobrist [--positions N]
+"""
+
+import time
+import random
+
+from engine.model import GameModel, MNKModel, CROSS, ROUND
+from engine.transposition import position_key
+from engine.zobrist import symmetries
+
+SEED = 2023
+SIZES = ((3, 3), (4, 4), (7, 7), (15, 15), (19, 19))
+REPEAT = 20
+
+
+class ExactKeyModel(GameModel):
+    """ GameModel avec l'ancienne clé canonique exacte """
+
+    def key(self):
+        return position_key(self.boards[CROSS], self.boards[ROUND], self.player)
+
+
+def random_models(width, height, n):
+    """ n positions, de 0 à la moitié des cellules remplies au hasard """
+    models = []
+    for _ in range(n):
+        model = MNKModel(width, height, 3)
+        for i in random.sample(range(model.nb_cells), random.randint(0, model.nb_cells // 2)):
+            model.put(model.bits[i])
+        models.append(model)
+    return models
+
+def images_key(model, perms):
+    x, o = model.boards[CROSS], model.boards[ROUND]
+    cells = [(i, x >> i & 1, o >> i & 1) for i in range(model.nb_cells)]
+    return min((sum(xi << perm[i] for i, xi, _ in cells), sum(oi << perm[i] for i, _, oi in cells))
+               for perm in perms), model.player
+
+def per_call(run, calls):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        run()
+    return 1e6 * (time.perf_counter() - start) / (REPEAT * calls)
+
+
+def key_costs(n):
+    print(f'{"grille":10}{"tuple":>10}{"images":>10}{"key()":>10}{"put+remove":>12}   (µs par clé)')
+    for width, height in SIZES:
+        models = random_models(width, height, n)
+        perms = symmetries(width, height)
+        cache = {}
+
+        def tuples():
+            for model in models:
+                cache.get((model.boards[CROSS], model.boards[ROUND], model.player))
+
+        def images():
+            for model in models:
+                images_key(model, perms)
+
+        def zobrist():
+            for model in models:
+                cache.get(model.key())
+
+        free = [next(bit for bit in model.bits if not model.occupied() & bit) for model in models]
+
+        def moves():
+            for model, bit in zip(models, free):
+                model.put(bit)
+                model.remove(bit)
+
+        print(f'{f"{width}x{height}":10}{per_call(tuples, n):10.2f}{per_call(images, n):10.2f}'
+              f'{per_call(zobrist, n):10.2f}{per_call(moves, n):12.2f}')
+
+
+def search_costs():
+    print('3x3, alphabeta depuis la grille vide')
+    for name, model in (('position_key', ExactKeyModel()), ('key()', GameModel())):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            model.table.clear()
+            score = model.alphabeta()
+        elapsed = (time.perf_counter() - start) / REPEAT
+        print(f'  {name:14}{1000 * elapsed:8.2f} ms   score {score}, {len(model.table)} entrées')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Coût des clés de position')
+    parser.add_argument('--positions', type=int, default=1000)
+    args = parser.parse_args()
+    random.seed(SEED)
+    key_costs(args.positions)
+    search_costs()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+Le moteur du TicTacToe : les règles et l'IA, sans affichage
+
+Aucun module du paquet n'importe turtle : on peut s'en servir
+depuis un processus de calcul, un serveur ou un test.
+
+    engine.grid          version fonctions (grille liste de listes)
+    engine.model         version objet : GameModel (3x3), MNKModel
+    engine.mcts          MCTSModel : recherche Monte-Carlo pour les grandes grilles
+    engine.transposition table de transposition, formes canoniques
+    engine.zobrist       clés de Zobrist incrémentales, communes aux positions symétriques
+    engine.tablebase     table de finales précalculée
+    engine.retrograde    résolution complète des petites grilles MNK (4x4, ...)
+    engine.parallel      recherche parallèle à la racine
+    engine.simulation    parties machine contre machine
+    engine.tournament    tournoi entre stratégies, classement Elo
+    engine.batch         évaluation vectorisée (nécessite NumPy)
+    engine.background    recherche de l'IA dans un thread (pour les GUI)
+    engine.stats         mesures de la recherche (nœuds, durée, ...)
+    engine.records       enregistrement des parties jouées
+    engine.server        serveur de coups HTTP/JSON, cache des positions
+    engine.sessions      milliers de parties simultanées, coups de la machine par lots
+    engine.render        géométrie de la vue, images SVG / PNG sans écran
+
+python -m engine lance une partie en mode texte (voir __main__.py).
+"""
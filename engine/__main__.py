@@ -0,0 +1,80 @@
+"""
+Point d'entrée sans affichage
+
+    python -m engine [jouer] [1-4]        partie en mode texte
+    python -m engine simulation ...       voir engine/simulation.py
+    python -m engine tablebase ...        voir engine/tablebase.py
+    python -m engine records ...          voir engine/records.py
+    python -m engine tournament ...       voir engine/tournament.py
+    python -m engine server ...           voir engine/server.py
+    python -m engine render ...           voir engine/render.py
+    python -m engine retrograde ...       voir engine/retrograde.py
+
+Pour jouer, le choix des joueurs est celui de l'écran d'accueil
+du jeu graphique : 1. Humain / Humain, 2. Humain / Machine,
+3. Machine / Humain, 4. Machine / Machine. Un coup se saisit
+sous la forme « ligne colonne », de 1 1 à 3 3.
+"""
+
+import sys
+import importlib
+
+from .model import GameModel
+
+TOKEN = ['.', 'X', 'O']
+PLAYERS = {'1': (None, GameModel.HUMAIN, GameModel.HUMAIN),
+           '2': (None, GameModel.HUMAIN, GameModel.MACHINE),
+           '3': (None, GameModel.MACHINE, GameModel.HUMAIN),
+           '4': (None, GameModel.MACHINE, GameModel.MACHINE)}
+
+
+def show(model):
+    # la ligne 0 est en bas de la grille graphique
+    for row in range(2, -1, -1):
+        print(row + 1, ' '.join(TOKEN[value] for value in model.grid[row]))
+    print('  1 2 3')
+
+def ask(model):
+    while True:
+        answer = input(f'{TOKEN[model.player]} joue (ligne colonne) : ').split()
+        try:
+            row, col = (int(value) - 1 for value in answer)
+        except ValueError:
+            continue
+        if 0 <= row < 3 and 0 <= col < 3 and model.valid_move(row, col):
+            return row, col
+
+
+def jouer(key='2'):
+    players = PLAYERS[key]
+    model = GameModel()
+    gameover = False
+    show(model)
+    while not gameover:
+        if players[model.player] == GameModel.HUMAIN:
+            move = ask(model)
+        else:
+            move = model.choice()
+            print(f'{TOKEN[model.player]} joue {move[0] + 1} {move[1] + 1}')
+        gameover = model.play(move)
+        show(model)
+    print(f'{TOKEN[model.winner]} GAGNE' if model.winner else 'PARTIE NULLE')
+
+
+def main(args):
+    command = args[0] if args else 'jouer'
+    if command in PLAYERS:
+        command, args = 'jouer', ['jouer'] + args
+    if command == 'jouer':
+        jouer(*args[1:2])
+    elif command in ('simulation', 'tablebase', 'records', 'tournament', 'server', 'render',
+                     'retrograde'):
+        module = importlib.import_module(f'engine.{command}')
+        sys.argv = [f'python -m engine {command}'] + args[1:]
+        module.main()
+    else:
+        sys.exit(__doc__)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
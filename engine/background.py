@@ -0,0 +1,65 @@
+"""
+Recherche de l'IA en tâche de fond
+
+L'interface graphique ne doit pas rester figée pendant que la machine
+réfléchit : la recherche est lancée dans un thread et le contrôleur
+vient régulièrement demander si elle est terminée (avec ontimer pour
+turtle). Rien ici ne dépend de turtle.
+"""
+
+import time
+import threading
+
+
+class BackgroundSearch:
+    """
+    Exécute fct(*args) dans un thread
+
+    stop, s'il est donné, est appelé par cancel() pour interrompre
+    la recherche au plus tôt, et cancel() attend la fin du thread ;
+    une recherche annulée ne livre pas de résultat.
+    """
+
+    STOP_DELAY = 0.01   # secondes entre 2 appels de stop par cancel()
+
+    def __init__(self, fct, *args, stop=None):
+        self.stop = stop
+        self.cancelled = False
+        self.move = None
+        self.error = None
+        self.start = time.perf_counter()
+        self.end = None
+        self.thread = threading.Thread(target=self.run, args=(fct, args), daemon=True)
+        self.thread.start()
+
+    def run(self, fct, args):
+        try:
+            self.move = fct(*args)
+        except Exception as error:
+            self.error = error
+        self.end = time.perf_counter()
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def elapsed(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    def result(self):
+        """ Le coup trouvé ; à n'appeler qu'une fois done() vrai """
+        if self.error is not None:
+            raise self.error
+        return self.move
+
+    def cancel(self):
+        self.cancelled = True
+        if self.stop is not None:
+            # la recherche s'arrête au nœud suivant : on l'attend, pour
+            # qu'elle ne touche plus aux données qu'elle partage (la table
+            # de transposition) quand la suivante commence. stop() est
+            # répété : le thread à peine lancé n'a peut-être pas encore
+            # commencé sa recherche, qui effacerait un premier stop()
+            while self.thread.is_alive():
+                self.stop()
+                self.thread.join(BackgroundSearch.STOP_DELAY)
@@ -0,0 +1,135 @@
+"""
+Évaluation vectorisée (NumPy) de lots de positions
+
+Un lot de N positions est un tableau (N, 9) d'int8 : la cellule
+(row, col) est en colonne 3 * row + col et vaut 0 (vide), 1 (X)
+ou 2 (O). Le joueur qui a le trait se déduit du nombre de marques,
+X commençant toujours.
+
+Toutes les fonctions traitent le lot entier en quelques opérations
+sur des tableaux, à l'aide de la table des alignements LINES et
+de la matrice d'appartenance cellules / alignements MEMBERS :
+
+    winner, terminal, legal = evaluate(boards)
+    moves = faible(boards, rng)
+
+Nécessite NumPy, qui n'est pas utile au reste du jeu.
+    python -m engine.batch     # mesure du débit
+"""
+
+import numpy as np
+
+NB_CELLS = 9
+EMPTY = 0
+CROSS = 1
+ROUND = 2
+
+LINES = np.array([(0, 1, 2), (3, 4, 5), (6, 7, 8),
+                  (0, 3, 6), (1, 4, 7), (2, 5, 8),
+                  (0, 4, 8), (2, 4, 6)], dtype=np.intp)
+
+# MEMBERS[l, i] vaut 1 si la cellule i appartient à l'alignement l
+MEMBERS = np.zeros((len(LINES), NB_CELLS), dtype=np.float32)
+MEMBERS[np.arange(len(LINES))[:, None], LINES] = 1
+
+# chaque alignement est résumé par la somme des poids de ses
+# 3 cellules : 1 par X, 4 par O. La somme 3 signifie XXX, 12 OOO,
+# 2 deux X et une case vide, 8 deux O et une case vide.
+WEIGHTS = np.array([0, 1, 4], dtype=np.int8)
+ALIGNED = {CROSS: 3, ROUND: 12}
+ALMOST = {CROSS: 2, ROUND: 8}
+
+# poids des cellules dans le codage base 3 (celui de engine/tablebase.py)
+POWERS = 3 ** np.arange(NB_CELLS)
+
+
+def from_indices(indices):
+    """ Le lot des positions de codages base 3 indices """
+    indices = np.asarray(indices)
+    return (indices[:, None] // POWERS % 3).astype(np.int8)
+
+def to_indices(boards):
+    return boards.astype(np.int64) @ POWERS
+
+def from_grids(grids):
+    """ Le lot des grilles listes de listes de engine/grid.py """
+    return np.array([[value for row in grid for value in row] for grid in grids],
+                    dtype=np.int8).reshape(-1, NB_CELLS)
+
+
+def line_sums(boards):
+    """ (N, 8) : la somme des poids de chaque alignement """
+    return WEIGHTS[boards][:, LINES].sum(axis=2, dtype=np.int8)
+
+def side_to_move(boards):
+    """ (N,) : CROSS ou ROUND selon le nombre de marques posées """
+    crosses = (boards == CROSS).sum(axis=1)
+    rounds = (boards == ROUND).sum(axis=1)
+    return np.where(crosses > rounds, ROUND, CROSS).astype(np.int8)
+
+def winners(boards, sums=None):
+    """ (N,) : CROSS ou ROUND s'il a 3 marques alignées, 0 sinon """
+    if sums is None:
+        sums = line_sums(boards)
+    crosses = (sums == ALIGNED[CROSS]).any(axis=1)
+    rounds = (sums == ALIGNED[ROUND]).any(axis=1)
+    return np.where(crosses, CROSS, np.where(rounds, ROUND, EMPTY)).astype(np.int8)
+
+
+def evaluate(boards, sums=None):
+    """
+    Pour tout le lot : le gagnant (N,), partie terminée (N,)
+    et les coups légaux (N, 9)
+    """
+    winner = winners(boards, sums)
+    empty = boards == EMPTY
+    terminal = (winner != EMPTY) | ~empty.any(axis=1)
+    legal = empty & ~terminal[:, None]
+    return winner, terminal, legal
+
+
+def completing(sums, player, legal):
+    """
+    (N, 9) : les cellules légales où player (un par position)
+    complète un alignement
+    """
+    target = np.where(player == CROSS, ALMOST[CROSS], ALMOST[ROUND])
+    open_lines = (sums == target[:, None]).astype(np.float32)
+    return legal & (open_lines @ MEMBERS > 0)
+
+
+def faible(boards, rng=None):
+    """
+    La stratégie faible sur tout le lot : le premier coup gagnant,
+    sinon le premier coup qui bloque l'adversaire, sinon un coup au
+    hasard. Retourne (N,) indices de cellule, -1 si la partie est finie.
+    """
+    rng = np.random.default_rng(rng)
+    sums = line_sums(boards)
+    winner, terminal, legal = evaluate(boards, sums)
+    player = side_to_move(boards)
+    wins = completing(sums, player, legal)
+    blocks = completing(sums, 3 - player, legal)
+    noise = rng.random(boards.shape, dtype=np.float32)
+    noise[~legal] = -1
+    moves = np.where(wins.any(axis=1), wins.argmax(axis=1),
+                np.where(blocks.any(axis=1), blocks.argmax(axis=1),
+                    noise.argmax(axis=1)))
+    return np.where(terminal, -1, moves).astype(np.int8)
+
+
+def main():
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    boards = from_indices(rng.integers(0, 3 ** NB_CELLS, n))
+    for name, fct in (('evaluate', evaluate), ('faible', lambda b: faible(b, rng))):
+        start = time.perf_counter()
+        fct(boards)
+        elapsed = time.perf_counter() - start
+        print(f'{name:10} {n} positions en {elapsed:.3f} s : {n / elapsed:,.0f} positions/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""
+Le TicTacToe version non objet : règles et IA
+
+La grille est une liste de 3 listes de 3 entiers :
+EMPTY pour une cellule vide, CROIX ou ROND sinon.
+Ce module n'importe pas turtle ; l'affichage et le
+contrôleur sont dans tictactoe.py.
+"""
+
+import random
+
+from .transposition import TranspositionTable, position_key, bound, EXACT, LOWER, UPPER
+from .tablebase import TABLEBASE, index_from_grid
+from . import parallel
+
+# ---------------------------------
+# LES CONSTANTES
+# ---------------------------------
+
+EMPTY = 0
+CROIX = 1
+ROND = 2
+
+WORKERS = None      # nombre de processus pour évaluer les coups de l'IA
+                    # None : tout se passe dans le processus du jeu
+
+# ---------------------------------
+# LE MODELE
+# ---------------------------------
+
+# le jeu se compose d'une grille 3x3
+# contenant 3 entiers :
+# 0 = cellule vide
+# 1 = cellule jouée par le joueur 1
+# 2 = cellule jouée par le joueur 2
+
+def init_grid():
+    return [[EMPTY] * 3 for _ in range(3)]
+
+
+# les 8 alignements : 3 lignes, 3 colonnes, 2 diagonales
+LINES = [[(row, col) for col in range(3)] for row in range(3)] +\
+        [[(row, col) for row in range(3)] for col in range(3)] +\
+        [[(i, i) for i in range(3)], [(i, 2 - i) for i in range(3)]]
+
+# LINES_THROUGH[row][col] : les numéros des alignements passant par (row, col)
+LINES_THROUGH = [[[i for i, line in enumerate(LINES) if (row, col) in line]
+                    for col in range(3)] for row in range(3)]
+
+def init_counts():
+    """
+    Les compteurs de la grille vide :
+    counts[EMPTY] est le nombre de cellules libres,
+    counts[player][i] le nombre de marques de player
+    sur l'alignement LINES[i]
+    """
+    return [9, [0] * 8, [0] * 8]
+
+def count_move(counts, row, col, player, step=1):
+    """ Met à jour counts quand player joue (row, col), ou l'annule si step vaut -1 """
+    counts[EMPTY] -= step
+    for i in LINES_THROUGH[row][col]:
+        counts[player][i] += step
+
+def grid_counts(grid):
+    """ Les compteurs (voir init_counts) d'une grille quelconque """
+    counts = init_counts()
+    for row in range(3):
+        for col in range(3):
+            if grid[row][col] != EMPTY:
+                count_move(counts, row, col, grid[row][col])
+    return counts
+
+
+# -- La pile des coups
+# -- push_move joue un coup et le mémorise dans stack, pop_move
+# -- l'annule : la recherche de l'IA explore ainsi les coups sur
+# -- la grille elle-même, sans en faire de copie, et l'interface
+# -- s'en sert pour annuler / refaire
+
+def push_move(grid, counts, stack, row, col, player):
+    grid[row][col] = player
+    count_move(counts, row, col, player)
+    stack.append((row, col))
+
+def pop_move(grid, counts, stack):
+    """ Annule le dernier coup de stack et le retourne """
+    row, col = stack.pop()
+    count_move(counts, row, col, grid[row][col], -1)
+    grid[row][col] = EMPTY
+    return row, col
+
+def last_winner(grid, counts, stack, player):
+    """
+    Retourne player s'il vient de gagner, 0 sinon : seuls les
+    alignements passant par son dernier coup sont examinés
+    (toute la grille si stack est vide)
+    """
+    if not stack:
+        return check_winner(grid, player)
+    row, col = stack[-1]
+    for i in LINES_THROUGH[row][col]:
+        if counts[player][i] == 3:
+            return player
+    return 0
+
+def play_move(grid, counts, stack, row, col, player):
+    """
+    Joue le coup et retourne (gagnant, fin de partie) : seuls
+    les alignements passant par (row, col) sont examinés
+    """
+    push_move(grid, counts, stack, row, col, player)
+    winner = last_winner(grid, counts, stack, player)
+    end = check_end(counts, winner)
+    return winner, end
+
+def valid_move(grid, row, col):
+    return row is not None and grid[row][col] == EMPTY
+
+
+def one_line(grid, player):
+    for row in range(3):
+        if grid[row] == [player] * 3:
+            return player
+    return 0
+
+def one_diag(grid, player):
+    if [grid[row][row] for row in range(3)] == [player] * 3:
+        return player
+    if [grid[row][2 - row] for row in range(3)] == [player] * 3:
+        return player
+    return 0
+
+def one_col(grid, player):
+    for col in range(3):
+        if [grid[row][col] for row in range(3)] == [player] * 3:
+            return player
+    return 0
+
+
+def check_winner(grid, player):
+    """ 
+    Si grid correspond à une configuration gagnante
+    pour player retourne player
+    Sinon retourne 0
+    """
+    return one_line(grid, player) or\
+            one_col(grid, player) or\
+            one_diag(grid, player)
+
+
+def full(grid):
+    return all(grid[r][c] != EMPTY for r in range(3) for c in range(3)) 
+
+def check_end(counts, winner):
+    return winner or counts[EMPTY] == 0
+
+
+# -- IA
+# --
+
+def empty_cells(grid):
+    return [(r,c) for r in range(3) for c in range(3)
+                if grid[r][c] == EMPTY]
+
+TABLE = TranspositionTable()   # partagée par toutes les recherches
+
+def grid_key(grid, player):
+    """
+    Clé canonique de la position, identique pour
+    les 8 rotations / symétries de la grille
+    """
+    bits = [0, 0, 0]
+    for r in range(3):
+        for c in range(3):
+            bits[grid[r][c]] |= 1 << (3 * r + c)
+    return position_key(bits[CROIX], bits[ROND], player)
+
+
+def winning_moves(grid, player, counts):
+    """
+    Les cellules vides où player aligne 3 marques : celles
+    qui complètent un alignement où il en a déjà 2
+    """
+    moves = []
+    for r, c in empty_cells(grid):
+        for i in LINES_THROUGH[r][c]:
+            if counts[player][i] == 2:
+                moves.append((r, c))
+                break
+    return moves
+
+
+def faible(grid, player, counts=None):
+    """
+    Stratégie minimaliste : si un coup gagnant on 
+    le joue, sinon, si un coup perdant on joue
+    à cet endroit pour bloquer, sinon au hasard
+    """
+    if counts is None:
+        counts = grid_counts(grid)
+    for r, c in winning_moves(grid, player, counts):
+        return r, c
+    for r, c in winning_moves(grid, 3 - player, counts):
+        return r, c
+    return random.choice(empty_cells(grid))
+
+
+def negamax(grid, player, table=TABLE, counts=None, stack=None):
+    """
+    Calcule le meilleur score pour le joueur courant
+    Au TicTacToe, on va pouvoir explorer toutes les
+    configurations et retourner le vrai score des configurations
+    finales : 1 si le joueur gagne, -1 s'il perd et 0 pour un nul
+    Les scores déjà calculés sont conservés dans table
+    Les coups sont joués puis annulés sur grid (push_move / pop_move) ;
+    counts et stack sont créés au premier appel
+    """
+    if counts is None:
+        counts, stack = grid_counts(grid), []
+    if last_winner(grid, counts, stack, 3 - player):
+        return -1       # l'adversaire vient de gagner
+    elif counts[EMPTY] == 0:
+        return 0
+    key = grid_key(grid, player)
+    entry = table.get(key)
+    if entry is not None and entry[1] == EXACT:
+        return entry[0]
+    bestScore = -10
+    for r, c in empty_cells(grid):
+        push_move(grid, counts, stack, r, c, player)
+        score = -negamax(grid, 3 - player, table, counts, stack)
+        pop_move(grid, counts, stack)
+        if score > bestScore:
+             bestScore = score
+    table.store(key, (bestScore, EXACT))
+    return bestScore
+
+
+# ordre d'essai des coups : le centre, les coins puis les bords
+PREFERRED = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+def ordered_moves(grid, player, counts):
+    """
+    Les cellules vides dans l'ordre où alphabeta les essaie :
+    les coups gagnants, puis ceux qui bloquent l'adversaire,
+    puis le centre, les coins et les bords
+    """
+    moves = winning_moves(grid, player, counts) + winning_moves(grid, 3 - player, counts)
+    for r, c in PREFERRED:
+        if grid[r][c] == EMPTY and (r, c) not in moves:
+            moves.append((r, c))
+    return moves
+
+
+def alphabeta(grid, player, alpha=-1, beta=1, table=TABLE, counts=None, stack=None):
+    """
+    Même score que negamax lorsqu'il est dans la fenêtre
+    ]alpha, beta[ ; sinon un majorant (score <= alpha)
+    ou un minorant (score >= beta), suffisant pour couper
+    """
+    if counts is None:
+        counts, stack = grid_counts(grid), []
+    if last_winner(grid, counts, stack, 3 - player):
+        return -1
+    elif counts[EMPTY] == 0:
+        return 0
+    key = grid_key(grid, player)
+    entry = table.get(key)
+    if entry is not None:
+        score, flag = entry
+        if flag == EXACT or (flag == LOWER and score >= beta)\
+                or (flag == UPPER and score <= alpha):
+            return score
+    alpha0 = alpha
+    bestScore = -10
+    for r, c in ordered_moves(grid, player, counts):
+        push_move(grid, counts, stack, r, c, player)
+        score = -alphabeta(grid, 3 - player, -beta, -alpha, table, counts, stack)
+        pop_move(grid, counts, stack)
+        if score > bestScore:
+            bestScore = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break       # inutile de chercher plus : coupure
+    table.store(key, (bestScore, bound(bestScore, alpha0, beta)))
+    return bestScore
+
+
+def root_score(grid, player, row, col, floor=-1):
+    """
+    Score du coup (row, col) pour player : exact s'il atteint floor,
+    sinon un majorant inférieur à floor ;
+    c'est la tâche confiée à chaque processus en mode parallèle
+    """
+    counts, stack = grid_counts(grid), []
+    push_move(grid, counts, stack, row, col, player)
+    score = -alphabeta(grid, 3 - player, -1, 1 - max(floor, -1), TABLE, counts, stack)
+    pop_move(grid, counts, stack)
+    return score
+
+
+def choice(grid, player, table=TABLE, workers=WORKERS):
+    # return faible(grid, player)
+    # La table de finales, si elle a été construite, connaît déjà
+    # les meilleurs coups : une seule lecture suffit
+    bestPos = TABLEBASE.best_moves(index_from_grid(grid), player)
+    if bestPos:
+        return random.choice(bestPos)
+    counts, stack = grid_counts(grid), []
+    if parallel.worth_it(workers, counts[EMPTY]):
+        # le coup le plus prometteur est évalué ici, son score
+        # sert de plancher aux autres, répartis entre les processus
+        moves = ordered_moves(grid, player, counts)
+        first = root_score(grid, player, *moves[0])
+        tasks = [(grid, player, r, c, first) for r, c in moves[1:]]
+        scores = dict(zip(moves, [first] + parallel.run(root_score, tasks, workers)))
+        bestScore = max(scores.values())
+        return random.choice([cell for cell in empty_cells(grid)
+                                if scores[cell] == bestScore])
+    # Chaque coup est évalué par alphabeta avec une fenêtre qui ne
+    # garantit le score exact que des coups au moins aussi bons que
+    # le meilleur déjà trouvé. On tire ensuite au hasard parmi les
+    # meilleurs, dans l'ordre de empty_cells.
+    bestScore = -10
+    scores = {}     # les coups symétriques ne sont évalués qu'une fois
+    results = {}
+    for r, c in ordered_moves(grid, player, counts):
+        push_move(grid, counts, stack, r, c, player)
+        key = grid_key(grid, 3 - player)
+        if key not in scores:
+            scores[key] = -alphabeta(grid, 3 - player, -1, 1 - max(bestScore, -1),
+                                     table, counts, stack)
+        pop_move(grid, counts, stack)
+        results[r, c] = scores[key]
+        if results[r, c] > bestScore:
+            bestScore = results[r, c]
+    bestPos = [(r, c) for r, c in empty_cells(grid) if results[r, c] == bestScore]
+    return random.choice(bestPos)
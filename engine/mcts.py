@@ -0,0 +1,278 @@
+"""
+Recherche arborescente Monte-Carlo (MCTS, sélection UCT)
+
+Pour les grilles où même l'alpha-beta limité de MNKModel voit trop
+court : MCTSModel garde l'interface de MNKModel (choice() retourne
+le coup (row, col)), mais construit un arbre des coups en jouant
+des fins de parties au hasard, tant que le budget le permet
+(time_limit secondes, ou iterations itérations si ce nombre est
+donné). Le coup joué est le plus visité. La recherche peut être
+interrompue à tout moment (stop(), depuis un autre thread) : le
+meilleur coup trouvé jusque-là est retourné.
+
+Les nœuds sont rangés dans des tableaux (NodeStore), les enfants
+d'un nœud à la suite les uns des autres : un nœud n'est qu'un
+indice. L'arbre est gardé d'un coup à l'autre : au coup suivant,
+on redescend depuis l'ancienne racine par les coups joués depuis,
+et seul le sous-arbre atteint est conservé.
+
+    model = MCTSModel(9, 9, 5, time_limit=1.0)
+    model = MCTSModel(iterations=5000)      # 3x3, budget fixe
+"""
+
+import math
+import time
+import random
+from array import array
+
+from .model import MNKModel, CROSS, ROUND
+
+UNEXPANDED = -1
+
+
+class NodeStore:
+    """
+    L'arbre : pour le nœud d'indice n, move[n] est le coup (indice de
+    cellule) qui y mène, ses enfants sont les nœuds first[n] à
+    first[n] + count[n] - 1 ; visits[n] et wins[n] comptent les
+    parties passées par n et les points qu'y a marqués le joueur
+    qui a joué move[n] (1 par victoire, 1/2 par nulle)
+    """
+
+    __slots__ = ('move', 'first', 'count', 'visits', 'wins', 'root', 'position')
+
+    def __init__(self):
+        self.move = array('i')
+        self.first = array('i')
+        self.count = array('i')
+        self.visits = array('i')
+        self.wins = array('d')
+        self.root = None
+        self.position = None    # (plateau X, plateau O, joueur) à la racine
+
+    def __len__(self):
+        return len(self.move)
+
+    def clear(self, position):
+        """ Un arbre réduit à sa racine, la position position """
+        self.move = array('i')
+        self.first = array('i')
+        self.count = array('i')
+        self.visits = array('i')
+        self.wins = array('d')
+        self.root = self.add(UNEXPANDED)
+        self.position = position
+
+    def add(self, move):
+        self.move.append(move)
+        self.first.append(UNEXPANDED)
+        self.count.append(0)
+        self.visits.append(0)
+        self.wins.append(0.0)
+        return len(self.move) - 1
+
+    def expand(self, node, moves):
+        """ Les enfants de node, un par coup de moves, à la suite """
+        self.first[node] = len(self.move)
+        self.count[node] = len(moves)
+        for move in moves:
+            self.add(move)
+
+    def child(self, node, move):
+        """ L'enfant de node atteint par move, None s'il n'existe pas """
+        first = self.first[node]
+        for child in range(first, first + self.count[node]):
+            if self.move[child] == move:
+                return child
+        return None
+
+    def reroot(self, node, position):
+        """
+        Ne garde que le sous-arbre de node, qui devient la racine :
+        il est recopié dans des tableaux neufs (les enfants d'un nœud
+        toujours à la suite), les autres branches sont libérées
+        """
+        move, first, count, visits, wins = self.move, self.first, self.count, self.visits, self.wins
+        self.clear(position)
+        self.visits[0], self.wins[0] = visits[node], wins[node]
+        pending = [(node, self.root)]     # (ancien nœud, nouveau) à recopier
+        while pending:
+            old, new = pending.pop()
+            if first[old] == UNEXPANDED:
+                continue
+            self.first[new] = len(self.move)
+            self.count[new] = count[old]
+            for child in range(first[old], first[old] + count[old]):
+                copy = self.add(move[child])
+                self.visits[copy], self.wins[copy] = visits[child], wins[child]
+                pending.append((child, copy))
+
+
+class MCTSModel(MNKModel):
+    """ LE MODÈLE MONTE-CARLO (voir le début du module) """
+
+    strategy = 'mcts'
+    EXPLORATION = math.sqrt(2)  # constante de l'UCT
+    MAX_NODES = 1_000_000       # au-delà, l'arbre ne grandit plus
+
+    def __init__(self, width=3, height=3, k=3, time_limit=MNKModel.TIME_LIMIT,
+                 iterations=None, exploration=EXPLORATION):
+        MNKModel.__init__(self, width, height, k, time_limit=time_limit)
+        self.iterations = iterations
+        self.exploration = exploration
+        self.tree = NodeStore()
+        self.reused = 0     # les visites de la racine héritées du coup précédent
+
+    def config(self):
+        return self.width, self.height, self.k, self.time_limit, self.iterations, self.exploration
+
+    def position(self):
+        return self.boards[CROSS], self.boards[ROUND], self.player
+
+    def reuse(self):
+        """
+        Place la racine de l'arbre sur la position courante, en
+        descendant par les coups joués depuis la dernière recherche
+        (au plus un par joueur) ; sinon l'arbre repart de zéro
+        """
+        tree = self.tree
+        position = self.position()
+        if tree.position is not None:
+            x, o, player = tree.position
+            new = [None, self.boards[CROSS] & ~x, self.boards[ROUND] & ~o]
+            if (x & ~self.boards[CROSS] or o & ~self.boards[ROUND]
+                    or new[CROSS].bit_count() > 1 or new[ROUND].bit_count() > 1):
+                new = None      # autre partie, ou trop de coups depuis
+            node = tree.root
+            while new is not None and node is not None and (new[CROSS] or new[ROUND]):
+                bit, new[player] = new[player], 0
+                node = tree.child(node, bit.bit_length() - 1) if bit else None
+                player = 3 - player
+            if new is not None and node is not None and player == self.player:
+                # les branches des coups non joués ne servent plus
+                tree.reroot(node, position)
+                return
+        tree.clear(position)
+
+    def children(self):
+        """
+        Les coups d'un nœud : un coup gagnant s'il y en a, sinon les
+        coups qui bloquent l'adversaire s'il menace, sinon les cellules
+        candidates de MNKModel
+        """
+        blocks, others = [], []
+        for i in self.candidates(self.occupied()):
+            if self.threatens(self.player, i):
+                return [i]
+            if self.threatens(3 - self.player, i):
+                blocks.append(i)
+            else:
+                others.append(i)
+        return blocks or others
+
+    def select(self, node):
+        """ L'enfant de node qui maximise le score UCT """
+        tree = self.tree
+        visits, wins = tree.visits, tree.wins
+        first = tree.first[node]
+        log_n = math.log(visits[node] or 1)
+        bestChild, bestValue = first, -1.0
+        for child in range(first, first + tree.count[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            value = wins[child] / n + self.exploration * math.sqrt(log_n / n)
+            if value > bestValue:
+                bestChild, bestValue = child, value
+        return bestChild
+
+    def play_bit(self, i):
+        """ Le joueur courant joue la cellule i ; retourne le gagnant, 0 (nulle) ou None """
+        player = self.player
+        self.put(self.bits[i])
+        if self.completes(player, i):
+            return player
+        return None if self.empty else 0
+
+    def playout(self):
+        """
+        Fin de partie au hasard parmi les cellules libres ; retourne
+        le gagnant (0 : nulle). Seuls les compteurs des alignements
+        sont tenus à jour : iterate remet ensuite tout en place
+        """
+        occupied = self.occupied()
+        cells = [i for i in range(self.nb_cells) if not occupied >> i & 1]
+        random.shuffle(cells)
+        counts, line_ids, k = self.counts, self.line_ids, self.k
+        player = self.player
+        for i in cells:
+            own = counts[player]
+            for line in line_ids[i]:
+                count = own[line] + 1
+                own[line] = count
+                if count == k:
+                    return player
+            player = 3 - player
+        return 0
+
+    def iterate(self):
+        """ Une itération : sélection, expansion, partie au hasard, rétropropagation """
+        tree = self.tree
+        node = tree.root
+        path = [(node, 3 - self.player)]
+        winner = None
+        while winner is None:
+            if tree.first[node] == UNEXPANDED:
+                if node != tree.root and tree.visits[node] == 0:
+                    break   # un nœud est développé à sa 2e visite
+                if len(tree) >= MCTSModel.MAX_NODES:
+                    break
+                tree.expand(node, self.children())
+            player = self.player
+            node = self.select(node)
+            winner = self.play_bit(tree.move[node])
+            path.append((node, player))
+        if winner is None:
+            winner = self.playout()
+        for node, player in path:
+            tree.visits[node] += 1
+            if winner == player:
+                tree.wins[node] += 1
+            elif not winner:
+                tree.wins[node] += 0.5
+
+    def choice(self):
+        """
+        Le coup le plus visité de la racine, après time_limit
+        secondes ou iterations itérations de recherche ; un coup
+        forcé (gagnant, ou seul blocage) est joué sans chercher
+        """
+        self.stopped = False
+        self.deadline = time.monotonic() + self.time_limit
+        self.reuse()
+        tree = self.tree
+        self.reused = tree.visits[tree.root]
+        moves = self.children()
+        if len(moves) == 1:     # coup forcé : inutile de chercher
+            return divmod(moves[0], self.width)
+        saved = self.boards.copy(), self.player, self.empty, self.counts, self.hashes
+        budget = self.iterations
+        while budget is None or budget > 0:
+            self.counts = [None, saved[3][CROSS].copy(), saved[3][ROUND].copy()]
+            self.iterate()
+            self.boards, self.player, self.empty = saved[0].copy(), saved[1], saved[2]
+            self.hashes = saved[4]
+            if budget is not None:
+                budget -= 1
+            elif time.monotonic() > self.deadline:
+                break
+            if self.stopped:
+                break
+        self.counts = saved[3]
+        first, count = tree.first[tree.root], tree.count[tree.root]
+        if count == 0:      # pas même une itération
+            return divmod(moves[0], self.width)
+        most = max(tree.visits[child] for child in range(first, first + count))
+        bestPos = [divmod(tree.move[child], self.width) for child in range(first, first + count)
+                        if tree.visits[child] == most]
+        return random.choice(sorted(bestPos))
@@ -0,0 +1,835 @@
+"""
+Le modèle du TicTacToe version objet : règles et IA
+
+GameModel joue sur la grille 3x3, MNKModel sur une grille
+width x height où il faut aligner k marques. Ce module
+n'importe pas turtle ; la vue et le contrôleur sont dans
+tictactoe_oo.py.
+"""
+
+import copy
+import math
+import time
+import random
+
+from .transposition import TranspositionTable, bound, EXACT, LOWER, UPPER
+from .tablebase import TABLEBASE, index_from_bits
+from .zobrist import zobrist_table, KEY_MASK
+from .retrograde import solution
+from . import parallel
+
+CROSS = 1
+ROUND = 2
+
+
+# -- LES TABLES PRÉCALCULÉES DU MODÈLE
+# --
+# La cellule (row, col) est codée par le bit 3 * row + col
+
+BITS = [[1 << (3 * row + col) for col in range(3)] for row in range(3)]
+FULL_MASK = (1 << 9) - 1
+
+LINE_MASKS = tuple(sum(BITS[row]) for row in range(3))
+COL_MASKS = tuple(sum(BITS[row][col] for row in range(3)) for col in range(3))
+DIAG_MASKS = (sum(BITS[i][i] for i in range(3)),
+              sum(BITS[i][2 - i] for i in range(3)))
+WIN_MASKS = LINE_MASKS + COL_MASKS + DIAG_MASKS
+
+# pour chacune des 512 valeurs possibles d'un plateau de 9 bits :
+# WINNING[board] : le plateau contient-il un alignement ?
+# EMPTY_CELLS[occupied] : les cellules (row, col) libres
+# FREE_BITS[occupied] : les mêmes cellules, sous forme de bits
+# ORDERED_BITS[occupied] : les mêmes, dans l'ordre d'essai d'alpha-beta
+#   (le centre, puis les coins, puis les bords)
+# Chaque table est construite en une passe, à partir des valeurs
+# déjà calculées : l'import du module reste rapide.
+
+def build_winning():
+    winning = [False] * (FULL_MASK + 1)
+    for mask in WIN_MASKS:
+        free = FULL_MASK ^ mask
+        others = free
+        while True:     # tous les plateaux qui contiennent mask
+            winning[mask | others] = True
+            if not others:
+                break
+            others = (others - 1) & free
+    return tuple(winning)
+
+def build_free(order):
+    """
+    Pour chaque plateau occupied, les cellules libres dans l'ordre
+    order : la première, puis celles de occupied augmenté de celle-ci
+    """
+    cells = [()] * (FULL_MASK + 1)
+    for occupied in range(FULL_MASK - 1, -1, -1):
+        first = next(bit for bit in order if not occupied & bit)
+        cells[occupied] = (first,) + cells[occupied | first]
+    return tuple(cells)
+
+WINNING = build_winning()
+FREE_BITS = build_free([1 << i for i in range(9)])
+CELLS = {BITS[row][col]: (row, col) for row in range(3) for col in range(3)}
+EMPTY_CELLS = tuple(tuple(map(CELLS.__getitem__, bits)) for bits in FREE_BITS)
+
+PREFERRED = (BITS[1][1], BITS[0][0], BITS[0][2], BITS[2][0], BITS[2][2],
+             BITS[0][1], BITS[1][0], BITS[1][2], BITS[2][1])
+ORDERED_BITS = build_free(PREFERRED)
+
+# LINE_IDS[i] : les numéros (dans WIN_MASKS) des alignements
+# qui passent par la cellule de bit 1 << i
+LINE_IDS = tuple(tuple(line for line, mask in enumerate(WIN_MASKS) if mask >> i & 1)
+                    for i in range(9))
+
+class GameModel:
+    """ LE MODÈLE
+
+    La grille est codée par deux entiers de 9 bits, un par joueur :
+    la cellule (row, col) correspond au bit 3 * row + col.
+    Jouer, tester un alignement ou une grille pleine se résume
+    alors à quelques opérations bit à bit et à des lectures dans
+    des tables précalculées.
+
+    Le modèle tient aussi à jour, coup après coup, le nombre de
+    marques de chaque joueur sur chaque alignement (counts) et
+    le nombre de cellules libres (empty) : après un coup, seuls
+    les alignements qui passent par la cellule jouée sont testés.
+
+    Les clés de Zobrist de la position et de ses images par les
+    isométries de la grille (hashes, voir zobrist.py) suivent de
+    même, d'un XOR par coup : key() en déduit la clé canonique
+    sans relire les plateaux.
+    """
+
+    EMPTY = 0
+    HUMAIN = 0
+    MACHINE = 1
+    strategy = 'negamax'    # le nom de choice() dans les parties enregistrées
+
+    FULL = FULL_MASK
+    width = height = k = 3
+    nb_cells = 9
+    bits = tuple(1 << i for i in range(9))
+    win_masks = WIN_MASKS
+    line_ids = LINE_IDS
+    zobrist = zobrist_table(3, 3)
+
+    def __init__(self):
+        self.boards = [0, 0, 0]     # boards[CROSS] et boards[ROUND]
+        self.player = CROSS
+        self.winner = 0
+        self.count()
+        self.table = TranspositionTable()
+        self.shallow_moves = {}     # les meilleurs coups de shallow, par position et profondeur
+        self.workers = None     # processus pour la recherche (None : un seul)
+        self.deadline = None    # fin du temps de recherche, en time.monotonic()
+        self.stopped = False    # stop() a été appelé depuis le début de la recherche
+
+    def config(self):
+        """ Les arguments du constructeur, pour recréer le modèle ailleurs """
+        return ()
+
+    def reset(self):
+        """ Nouvelle partie, en conservant la table de transposition """
+        self.boards = [0, 0, 0]
+        self.player = CROSS
+        self.winner = 0
+        self.count()
+
+    def count(self):
+        """ Recalcule counts, empty et hashes d'après les plateaux et le trait """
+        self.counts = [None] + [[(board & mask).bit_count() for mask in self.win_masks]
+                                    for board in self.boards[1:]]
+        self.empty = self.nb_cells - self.occupied().bit_count()
+        self.hashes = self.zobrist.keys(self.boards, self.player)
+
+    def clone(self):
+        """ Copie de la position, qui partage la table de transposition """
+        other = copy.copy(self)
+        other.boards = self.boards.copy()
+        other.counts = [None, self.counts[CROSS].copy(), self.counts[ROUND].copy()]
+        return other
+
+    def stop(self):
+        """
+        Interrompt au plus tôt la recherche en cours (depuis un autre
+        thread) : au nœud suivant, elle lève SearchTimeout. Seul le
+        début d'une nouvelle recherche (choice) lève l'interdiction
+        """
+        self.stopped = True
+
+    @property
+    def grid(self):
+        """ La grille sous forme de liste de listes (lecture seule) """
+        return [[self.cell(row, col) for col in range(3)] for row in range(3)]
+
+    def cell(self, row, col):
+        bit = BITS[row][col]
+        if self.boards[CROSS] & bit:
+            return CROSS
+        if self.boards[ROUND] & bit:
+            return ROUND
+        return GameModel.EMPTY
+
+    def occupied(self):
+        return self.boards[CROSS] | self.boards[ROUND]
+
+    def valid_move(self, row, col):
+        return not self.occupied() & BITS[row][col]
+
+    def empty_cells(self):
+        return EMPTY_CELLS[self.occupied()]
+
+    def put(self, bit):
+        """ Le joueur courant occupe la cellule bit, puis on change de joueur """
+        player = self.player
+        index = bit.bit_length() - 1
+        counts = self.counts[player]
+        for line in self.line_ids[index]:
+            counts[line] += 1
+        self.empty -= 1
+        self.boards[player] |= bit
+        self.hashes ^= self.zobrist.moves[player][index]
+        self.player = 3 - player
+
+    def remove(self, bit):
+        """ Annule put(bit) """
+        player = self.player = 3 - self.player
+        index = bit.bit_length() - 1
+        counts = self.counts[player]
+        for line in self.line_ids[index]:
+            counts[line] -= 1
+        self.empty += 1
+        self.boards[player] &= ~bit
+        self.hashes ^= self.zobrist.moves[player][index]
+
+    def completes(self, player, index):
+        """ player a-t-il un alignement passant par la cellule index ? """
+        counts = self.counts[player]
+        for line in self.line_ids[index]:
+            if counts[line] == self.k:
+                return True
+        return False
+
+    def threatens(self, player, index):
+        """ En jouant la cellule libre index, player alignerait-il k marques ? """
+        counts = self.counts[player]
+        for line in self.line_ids[index]:
+            if counts[line] == self.k - 1:
+                return True
+        return False
+
+    def index(self):
+        """ Codage base 3 de la position (table de finales) """
+        return index_from_bits(self.boards[CROSS], self.boards[ROUND])
+
+    def key(self):
+        """
+        Clé de Zobrist canonique de la position, commune à ses
+        images par symétrie (tables de transposition, caches)
+        """
+        return self.zobrist.canonical(self.hashes)
+
+    def zobrist_key(self):
+        """ Clé de Zobrist de la position elle-même, sans symétrie """
+        return self.hashes & KEY_MASK
+
+    def negamax(self):
+        """
+        Calcule le meilleur score pour le joueur courant
+        Au TicTacToe, on va pouvoir explorer toutes les
+        configurations et retourner le vrai score des configurations
+        finales : 1 si le joueur gagne, -1 s'il perd et 0 pour un nul
+        """
+        if WINNING[self.boards[3 - self.player]]:
+            return -1       # l'adversaire vient d'aligner 3 marques
+        occupied = self.occupied()
+        if occupied == GameModel.FULL:
+            return 0
+        if self.stopped:
+            raise SearchTimeout
+        key = self.key()
+        entry = self.table.get(key)
+        if entry is not None and entry[1] == EXACT:
+            return entry[0]
+        bestScore = -10
+        for bit in FREE_BITS[occupied]:
+            self.put(bit)
+            score = -self.negamax()
+            self.remove(bit)
+            if score > bestScore:
+                bestScore = score
+        self.table.store(key, (bestScore, EXACT))
+        return bestScore
+
+    def ordered_moves(self, occupied):
+        """
+        Les coups libres dans l'ordre où alpha-beta les essaie :
+        ceux qui bloquent un alignement adverse d'abord, puis
+        le centre, les coins et les bords
+        (un coup gagnant est traité avant par alphabeta)
+        """
+        opponent = self.boards[3 - self.player]
+        moves = ORDERED_BITS[occupied]
+        blocks = [bit for bit in moves if WINNING[opponent | bit]]
+        if blocks:
+            return blocks + [bit for bit in moves if bit not in blocks]
+        return moves
+
+    def alphabeta(self, alpha=-1, beta=1):
+        """
+        Même score que negamax lorsqu'il est dans la fenêtre
+        ]alpha, beta[ ; sinon un majorant (score <= alpha)
+        ou un minorant (score >= beta) suffisant pour couper
+        """
+        if WINNING[self.boards[3 - self.player]]:
+            return -1
+        occupied = self.occupied()
+        if occupied == GameModel.FULL:
+            return 0
+        own = self.boards[self.player]
+        for bit in FREE_BITS[occupied]:
+            if WINNING[own | bit]:
+                return 1        # victoire immédiate : inutile de chercher plus
+        if self.stopped:
+            raise SearchTimeout
+        key = self.key()
+        entry = self.table.get(key)
+        if entry is not None:
+            score, flag = entry
+            if flag == EXACT or (flag == LOWER and score >= beta)\
+                    or (flag == UPPER and score <= alpha):
+                return score
+        alpha0 = alpha
+        bestScore = -10
+        for bit in self.ordered_moves(occupied):
+            self.put(bit)
+            score = -self.alphabeta(-beta, -alpha)
+            self.remove(bit)
+            if score > bestScore:
+                bestScore = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.table.store(key, (bestScore, bound(bestScore, alpha0, beta)))
+        return bestScore
+
+
+    def choice(self):
+        # return faible(grid, player)
+        self.stopped = False
+        # La table de finales, si elle a été construite, connaît déjà
+        # les meilleurs coups : une seule lecture suffit
+        bestPos = TABLEBASE.best_moves(self.index(), self.player)
+        if bestPos:
+            return random.choice(bestPos)
+        occupied = self.occupied()
+        if parallel.worth_it(self.workers, len(FREE_BITS[occupied])):
+            return self.parallel_choice([divmod(bit.bit_length() - 1, 3)
+                                            for bit in self.ordered_moves(occupied)])
+        # Les coups sont essayés dans l'ordre d'alphabeta, avec une
+        # fenêtre qui ne garantit le score exact que des coups au moins
+        # aussi bons que le meilleur trouvé : ce sont les seuls candidats.
+        # Le tirage final se fait dans l'ordre de empty_cells, comme
+        # lorsque tous les coups étaient évalués par negamax.
+        bestScore = -10
+        scores = {}     # les coups symétriques ne sont évalués qu'une fois
+        results = {}
+        for bit in self.ordered_moves(self.occupied()):
+            self.put(bit)
+            key = self.key()
+            if key not in scores:
+                scores[key] = -self.alphabeta(-1, 1 - max(bestScore, -1))
+            results[bit] = scores[key]
+            self.remove(bit)
+            if results[bit] > bestScore:
+                bestScore = results[bit]
+        bestPos = [(r, c) for r, c in self.empty_cells()
+                        if results[BITS[r][c]] == bestScore]
+        return random.choice(bestPos)
+
+    def score_move(self, move, deadline=None, floor=None):
+        """
+        Score du coup move pour le joueur courant : exact s'il
+        atteint floor, sinon seulement un majorant inférieur à floor
+        """
+        floor = -1 if floor is None else max(floor, -1)
+        bit = BITS[move[0]][move[1]]
+        self.put(bit)
+        score = -self.alphabeta(-1, 1 - floor)
+        self.remove(bit)
+        return score
+
+    def parallel_choice(self, moves):
+        """
+        Le premier coup de moves (le plus prometteur) est évalué ici ;
+        son score sert de plancher aux autres, évalués par score_move
+        dans les processus de parallel. On tire ensuite au hasard parmi
+        les meilleurs, dans l'ordre des cellules. Un score None signale
+        un coup dont l'évaluation n'a pu aboutir à temps.
+        """
+        first = self.score_move(moves[0], self.deadline)
+        state = type(self), self.config(), tuple(self.boards), self.player
+        tasks = [state + (move, self.deadline, first) for move in moves[1:]]
+        scores = [first] + parallel.run(root_score, tasks, self.workers)
+        known = [score for score in scores if score is not None]
+        if not known:
+            return moves[0]
+        bestScore = max(known)
+        return random.choice(sorted(move for move, score in zip(moves, scores)
+                                        if score == bestScore))
+
+    def limited(self, depth, alpha=-1, beta=1):
+        """
+        alphabeta qui ne regarde que depth coups plus loin : une
+        position non finie à cette profondeur vaut 0. Pas de table
+        de transposition, ses scores sont exacts
+        """
+        if WINNING[self.boards[3 - self.player]]:
+            return -1
+        occupied = self.occupied()
+        if occupied == GameModel.FULL or depth == 0:
+            return 0
+        bestScore = -10
+        for bit in self.ordered_moves(occupied):
+            self.put(bit)
+            score = -self.limited(depth - 1, -beta, -alpha)
+            self.remove(bit)
+            if score > bestScore:
+                bestScore = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return bestScore
+
+    def shallow(self, depth):
+        """
+        La machine ne voit qu'à depth coups (le sien compris) : un
+        des meilleurs coups à cette profondeur, au hasard. Les coups
+        retenus sont gardés pour chaque position
+        """
+        key = self.zobrist_key(), depth
+        bestPos = self.shallow_moves.get(key)
+        if bestPos is None:
+            bestScore = -10
+            results = {}
+            for r, c in self.empty_cells():
+                bit = BITS[r][c]
+                self.put(bit)
+                results[r, c] = -self.limited(depth - 1, -1, 1 - max(bestScore, -1))
+                self.remove(bit)
+                bestScore = max(bestScore, results[r, c])
+            bestPos = self.shallow_moves[key] = [move for move, score in results.items()
+                                                    if score == bestScore]
+        return random.choice(bestPos)
+
+    def hasard(self):
+        """ La machine joue au hasard """
+        return random.choice(self.empty_cells())
+
+    def faible(self):
+        """
+        Stratégie minimaliste : si un coup gagnant on 
+        le joue, sinon, si un coup perdant on joue
+        à cet endroit pour bloquer, sinon au hasard
+        """
+        cells = self.empty_cells()
+        for board in (self.boards[self.player], self.boards[3 - self.player]):
+            for r, c in cells:
+                if WINNING[board | BITS[r][c]]:
+                    return r, c
+        return random.choice(cells)
+
+    def next_player(self):
+        self.player = 3 - self.player
+
+
+    def aligned(self, masks):
+        """
+        Retourne l'ID du joueur courant si l'un des masques
+        est entièrement occupé par lui, 0 sinon
+        """
+        board = self.boards[self.player]
+        for mask in masks:
+            if board & mask == mask:
+                return self.player
+        return 0
+
+    def one_line(self):
+        """
+        Retourne l'ID du joueur courant si celui-ci à 3
+        aligné sur une ligne, 0 sinon
+        """
+        return self.aligned(LINE_MASKS)
+
+    def one_diag(self):
+        """
+        Retourne l'ID du joueur courant s'il en a 3
+        alignés sur une deux diagonales, 0 sinon
+        """
+        return self.aligned(DIAG_MASKS)
+
+    def one_col(self):
+        """
+        Retourne l'ID du joueur courant s'il en a 3
+        alignés sur une des colonnes, 0 sinon
+        """
+        return self.aligned(COL_MASKS)
+
+
+    def full(self):
+        return self.empty == 0
+
+    def check_winner(self):
+        """
+        Retourne l'ID du joueur courant s'il a 3 marques
+        alignées, 0 sinon (une lecture dans WINNING)
+        """
+        return self.player if WINNING[self.boards[self.player]] else 0
+
+    def end_game(self):
+        return self.winner != 0 or self.full()
+
+    def play(self, move):
+        """
+        Joue move pour le joueur courant ; seuls les alignements
+        passant par move peuvent être devenus gagnants
+        """
+        row, col = move
+        index = row * self.width + col
+        player = self.player
+        self.put(self.bits[index])
+        if self.completes(player, index):
+            self.winner = player
+        return self.end_game()
+
+
+
+
+class SearchTimeout(Exception):
+    """ Le temps accordé à la recherche est écoulé """
+
+
+class MNKModel(GameModel):
+    """ LE MODÈLE GÉNÉRALISÉ
+
+    Une grille de width x height cellules sur laquelle il faut
+    aligner k marques : (3, 3, 3) est le TicTacToe, (15, 15, 5)
+    le Gomoku. Les plateaux restent des entiers, de width * height
+    bits : la cellule (row, col) correspond au bit row * width + col.
+    Les alignements passant par chaque cellule sont précalculés,
+    si bien qu'après un coup seuls ceux-là sont testés.
+
+    Une recherche exhaustive est hors de portée dès le 4x4 : choice
+    utilise un alpha-beta limité en profondeur (depth) et en temps
+    (time_limit, en secondes), qui évalue les feuilles par
+    les alignements encore possibles. La profondeur croît d'un coup
+    à chaque itération (approfondissement itératif) ; chaque
+    itération essaie d'abord les meilleurs coups de la précédente
+    (pv_moves). À l'échéance, la recherche s'arrête net et choice
+    joue un des meilleurs coups de la dernière profondeur achevée :
+    le temps par coup ne dépasse time_limit que de l'examen d'un
+    nœud, quelle que soit la taille de la grille. Une petite grille
+    résolue une fois pour toutes (retrograde.py) se passe de recherche.
+    """
+
+    WIN = 1_000_000     # au-delà de toute évaluation heuristique
+    DEPTH = 4
+    TIME_LIMIT = 2.0
+    NEIGHBOURHOOD = 2   # on ne joue qu'à cette distance des marques posées
+
+    def __init__(self, width=3, height=3, k=3, depth=DEPTH, time_limit=TIME_LIMIT):
+        GameModel.__init__(self)
+        self.width = width
+        self.height = height
+        self.k = k
+        self.depth = depth
+        self.time_limit = time_limit
+        self.nb_cells = width * height
+        self.full_mask = (1 << self.nb_cells) - 1
+        self.bits = [1 << i for i in range(self.nb_cells)]
+        self.zobrist = zobrist_table(width, height)
+        self.build_lines()
+        self.build_neighbours()
+        self.count()
+        # plus une cellule est sur de nombreux alignements,
+        # plus elle est intéressante : c'est l'ordre d'essai par défaut
+        self.weights = [len(lines) for lines in self.line_ids]
+        # position (clé de Zobrist) -> le meilleur coup qu'y a trouvé
+        # l'itération précédente : la variation principale et ses variantes
+        self.pv_moves = {}
+        self.completed_depth = 0    # la dernière profondeur achevée par choice
+
+    def build_lines(self):
+        """
+        Les masques des alignements de k cellules, rangés par
+        direction, et pour chaque cellule ceux qui la contiennent
+        """
+        self.lines = {'line': [], 'col': [], 'diag': []}
+        directions = (('line', 0, 1), ('col', 1, 0), ('diag', 1, 1), ('diag', 1, -1))
+        for name, drow, dcol in directions:
+            for row in range(self.height):
+                for col in range(self.width):
+                    end_row = row + (self.k - 1) * drow
+                    end_col = col + (self.k - 1) * dcol
+                    if 0 <= end_row < self.height and 0 <= end_col < self.width:
+                        self.lines[name].append(sum(self.bit(row + i * drow, col + i * dcol)
+                                                        for i in range(self.k)))
+        self.win_masks = self.lines['line'] + self.lines['col'] + self.lines['diag']
+        self.line_ids = [[line for line, mask in enumerate(self.win_masks) if mask & bit]
+                            for bit in self.bits]
+
+    def build_neighbours(self):
+        d = MNKModel.NEIGHBOURHOOD
+        self.neighbours = []
+        for row in range(self.height):
+            for col in range(self.width):
+                self.neighbours.append(sum(self.bit(r, c)
+                        for r in range(max(0, row - d), min(self.height, row + d + 1))
+                        for c in range(max(0, col - d), min(self.width, col + d + 1))))
+
+    def bit(self, row, col):
+        return 1 << (row * self.width + col)
+
+    @property
+    def grid(self):
+        return [[self.cell(row, col) for col in range(self.width)]
+                    for row in range(self.height)]
+
+    def cell(self, row, col):
+        bit = self.bit(row, col)
+        if self.boards[CROSS] & bit:
+            return CROSS
+        if self.boards[ROUND] & bit:
+            return ROUND
+        return GameModel.EMPTY
+
+    def valid_move(self, row, col):
+        return not self.occupied() & self.bit(row, col)
+
+    def empty_cells(self):
+        occupied = self.occupied()
+        return [divmod(i, self.width) for i in range(self.nb_cells)
+                    if not occupied & self.bits[i]]
+
+
+    def aligned(self, masks):
+        board = self.boards[self.player]
+        for mask in masks:
+            if board & mask == mask:
+                return self.player
+        return 0
+
+    def one_line(self):
+        return self.aligned(self.lines['line'])
+
+    def one_col(self):
+        return self.aligned(self.lines['col'])
+
+    def one_diag(self):
+        return self.aligned(self.lines['diag'])
+
+    def check_winner(self):
+        return self.one_line() or self.one_col() or self.one_diag()
+
+    def config(self):
+        return self.width, self.height, self.k, self.depth, self.time_limit
+
+    def faible(self):
+        cells = self.empty_cells()
+        for player in (self.player, 3 - self.player):
+            for r, c in cells:
+                if self.threatens(player, r * self.width + c):
+                    return r, c
+        return random.choice(cells)
+
+    def index(self):
+        return None     # pas de table de finales au-delà du 3x3
+
+
+    def evaluate(self):
+        """
+        Évaluation heuristique pour le joueur courant : chaque
+        alignement encore possible pour un seul des joueurs
+        compte d'autant plus qu'il est rempli
+        """
+        score = 0
+        for mine, theirs in zip(self.counts[self.player], self.counts[3 - self.player]):
+            if not theirs:
+                score += 4 ** mine - 1
+            elif not mine:
+                score -= 4 ** theirs - 1
+        return score
+
+    def candidates(self, occupied):
+        """
+        Les cellules libres proches des marques déjà posées,
+        triées par nombre d'alignements possibles
+        """
+        if not occupied:
+            zone = self.full_mask
+        else:
+            zone = 0
+            for i in range(self.nb_cells):
+                if occupied & self.bits[i]:
+                    zone |= self.neighbours[i]
+        free = zone & ~occupied
+        moves = [i for i in range(self.nb_cells) if free & self.bits[i]]
+        moves.sort(key=lambda i: -self.weights[i])
+        return moves
+
+    def ordered_moves(self, occupied):
+        """
+        Les coups gagnants, puis ceux qui bloquent l'adversaire,
+        puis les autres candidats
+        """
+        wins, blocks, others = [], [], []
+        for i in self.candidates(occupied):
+            if self.threatens(self.player, i):
+                wins.append(i)
+            elif self.threatens(3 - self.player, i):
+                blocks.append(i)
+            else:
+                others.append(i)
+        return wins + blocks + others
+
+    def alphabeta(self, depth, alpha=-WIN, beta=WIN, last=None):
+        """
+        Score de la position pour le joueur courant, à depth coups
+        de profondeur ; last est la cellule jouée par l'adversaire.
+        Une victoire vaut WIN, diminué du nombre de coups pour y
+        parvenir : on préfère gagner vite et perdre tard.
+        """
+        if last is not None and self.completes(3 - self.player, last):
+            return -MNKModel.WIN - depth
+        if not self.empty:
+            return 0
+        if self.stopped or time.monotonic() > self.deadline:
+            raise SearchTimeout
+        if depth == 0:
+            return self.evaluate()
+        moves = self.ordered_moves(self.occupied())
+        key = self.zobrist_key()
+        first = self.pv_moves.get(key)
+        if first is not None and first != moves[0]:
+            moves.remove(first)
+            moves.insert(0, first)
+        bestScore = -2 * MNKModel.WIN
+        for i in moves:
+            self.put(self.bits[i])
+            score = -self.alphabeta(depth - 1, -beta, -alpha, i)
+            self.remove(self.bits[i])
+            if score > bestScore:
+                bestScore = score
+                first = i
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.pv_moves[key] = first
+        return bestScore
+
+    def negamax(self):
+        self.stopped = False
+        self.deadline = math.inf
+        self.pv_moves = {}
+        return self.alphabeta(self.depth)
+
+    def score_move(self, move, deadline=None, floor=None):
+        """
+        Score du coup move à la profondeur depth : exact s'il atteint
+        floor, sinon un majorant inférieur à floor ; None si deadline
+        est dépassée avant la fin
+        """
+        floor = -3 * MNKModel.WIN if floor is None else floor
+        self.deadline = math.inf if deadline is None else deadline
+        self.pv_moves = {}
+        row, col = move
+        index = row * self.width + col
+        saved = self.boards.copy(), self.player
+        self.put(self.bits[index])
+        try:
+            score = -self.alphabeta(self.depth - 1, -3 * MNKModel.WIN,
+                                    1 - floor, index)
+            self.remove(self.bits[index])
+        except SearchTimeout:
+            # la recherche s'est arrêtée n'importe où : on repart des plateaux
+            score = None
+            self.boards, self.player = saved
+            self.count()
+        return score
+
+    def choice(self):
+        """
+        Un des meilleurs coups de la dernière profondeur achevée
+        avant time_limit (au plus depth), tiré au hasard parmi les
+        ex aequo ; si aucune ne l'est, le premier coup de ordered_moves.
+        Si la grille a été résolue (retrograde.py), une lecture suffit
+        """
+        # avant la lecture, parfois longue, du fichier de solution : un
+        # stop() arrivé pendant celle-ci arrête la recherche qui suit
+        self.stopped = False
+        self.completed_depth = 0
+        bestPos = solution(self.width, self.height, self.k).best_moves(self)
+        if bestPos:
+            return random.choice(bestPos)
+        self.deadline = time.monotonic() + self.time_limit
+        moves = self.ordered_moves(self.occupied())
+        if parallel.worth_it(self.workers, len(moves)):
+            return self.parallel_choice([divmod(i, self.width) for i in moves])
+        self.pv_moves = {}
+        bestPos = moves[:1]
+        # un coup gagnant ou un seul coup possible : inutile de chercher
+        if len(moves) > 1 and not self.threatens(self.player, moves[0]):
+            for depth in range(1, self.depth + 1):
+                results = self.search_root(moves, depth)
+                if results is None:
+                    break
+                self.completed_depth = depth
+                bestScore = max(results.values())
+                bestPos = [i for i in sorted(results) if results[i] == bestScore]
+                # la prochaine itération commence par les meilleurs coups
+                moves.sort(key=lambda i: -results[i])
+                if abs(bestScore) >= MNKModel.WIN:
+                    break   # issue forcée : chercher plus loin n'y change rien
+        return divmod(random.choice(bestPos), self.width)
+
+    def search_root(self, moves, depth):
+        """
+        Le score de chaque coup de moves à la profondeur depth : exact
+        pour les meilleurs, un majorant plus petit pour les autres ;
+        None si le temps est écoulé avant la fin
+        """
+        saved = self.boards.copy(), self.player
+        bestScore = -3 * MNKModel.WIN
+        results = {}
+        try:
+            for i in moves:
+                self.put(self.bits[i])
+                results[i] = -self.alphabeta(depth - 1, -3 * MNKModel.WIN,
+                                             1 - bestScore, i)
+                self.remove(self.bits[i])
+                bestScore = max(bestScore, results[i])
+        except SearchTimeout:
+            # la recherche s'est arrêtée n'importe où : on repart des plateaux
+            self.boards, self.player = saved
+            self.count()
+            return None
+        return results
+
+
+# un modèle par configuration dans chaque processus de parallel :
+# sa table de transposition sert d'un coup à l'autre
+_worker_models = {}
+
+def root_score(cls, config, boards, player, move, deadline, floor):
+    """ La tâche d'un processus de parallel : model.score_move(move) """
+    model = _worker_models.get((cls, config))
+    if model is None:
+        model = _worker_models[cls, config] = cls(*config)
+    model.boards = list(boards)
+    model.player = player
+    model.count()
+    return model.score_move(move, deadline, floor)
@@ -0,0 +1,53 @@
+"""
+Répartition des coups de la racine sur un pool de processus
+
+Les coups de la racine sont évalués indépendamment les uns des
+autres : chaque processus reçoit une partie des coups et renvoie
+leur score, choice fusionne et tire au hasard parmi les meilleurs.
+Le mode est optionnel (paramètre workers des moteurs) ; sous le
+seuil CUTOFF de coups à évaluer, on reste dans le processus courant,
+le coût de l'envoi dépassant alors le gain.
+
+Les pools sont créés au premier usage et conservés : les processus
+gardent ainsi leur table de transposition d'un coup à l'autre.
+"""
+
+import os
+import atexit
+
+CUTOFF = 6
+
+_executors = {}
+
+
+def cpu_count():
+    return os.cpu_count() or 1
+
+def executor(workers):
+    """ Le pool de workers processus, créé au premier appel """
+    if workers not in _executors:
+        # import coûteux, fait seulement si le mode parallèle sert
+        from concurrent.futures import ProcessPoolExecutor
+
+        _executors[workers] = ProcessPoolExecutor(workers)
+    return _executors[workers]
+
+@atexit.register
+def shutdown():
+    for pool in _executors.values():
+        pool.shutdown(cancel_futures=True)
+    _executors.clear()
+
+
+def worth_it(workers, nb_moves):
+    """ La recherche parallèle est-elle demandée et utile ? """
+    return bool(workers) and workers > 1 and nb_moves >= CUTOFF
+
+def run(fct, tasks, workers):
+    """
+    Les résultats de fct(*args) pour chaque args de tasks,
+    dans l'ordre de tasks, calculés par workers processus
+    """
+    pool = executor(workers)
+    futures = [pool.submit(fct, *args) for args in tasks]
+    return [future.result() for future in futures]
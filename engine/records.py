@@ -0,0 +1,216 @@
+"""
+Enregistrement des parties jouées
+
+Un fichier de parties commence par l'en-tête MAGIC, suivi des
+parties les unes après les autres. Chacune tient en 4 octets
+d'en-tête, puis ses coups :
+
+    octet 0 : nombre de coups
+    octet 1 : stratégie de X (4 bits de poids faible), de O (4 bits
+              de poids fort), indices dans STRATEGIES
+    octet 2 : largeur - 1, hauteur - 1 (4 bits chacune)
+    octet 3 : k - 1 (4 bits de poids faible), résultat (0 nulle,
+              1 X gagne, 2 O gagne, 3 partie inachevée)
+
+Un coup est l'indice de sa cellule, width * row + col : un demi-octet
+(4 bits de poids faible d'abord) tant que la grille a au plus 16
+cellules, un octet au-delà. Une partie de TicTacToe pèse donc 4 à 9
+octets.
+
+    with RecordWriter('parties.ttr') as writer:     # ajout en fin de fichier
+        writer.write(Record(3, 3, 3, ('humain', 'negamax'), 1, moves))
+    for record in read('parties.ttr'):              # une partie à la fois
+        print(to_text(record))
+
+La notation texte tient en une ligne par partie : les joueurs, la
+grille (largeur x hauteur / k), le résultat comme aux échecs (1-0,
+0-1, 1/2, * pour une partie inachevée) et les coups, colonne en
+lettre et ligne en chiffre depuis le bas (b2 : le centre) :
+
+    X:humain O:negamax 3x3/3 1-0 b2 a1 c3 a3 a2 c1 c2
+
+python -m engine.records parties.ttr affiche les parties en notation
+texte ; --from-text fait l'inverse (voir main).
+"""
+
+import sys
+import struct
+from collections import namedtuple
+
+MAGIC = b'TTR1'
+PATH = 'parties.ttr'
+HEADER = struct.Struct('<4B')
+
+# (ajouts en fin de liste seulement : l'indice est enregistré)
+STRATEGIES = ('humain', 'hasard', 'faible', 'negamax', 'negamax1', 'negamax2', 'negamax3', 'negamax4',
+              'mcts')
+UNFINISHED = 3          # le résultat d'une partie abandonnée
+RESULTS = {0: '1/2', 1: '1-0', 2: '0-1', None: '*'}
+
+# winner : 0 (nulle), 1 ou 2, None si la partie est inachevée ;
+# moves : les coups (row, col) dans l'ordre
+Record = namedtuple('Record', 'width height k players winner moves')
+
+# précalculés pour la lecture : les 2 coups d'un octet, et les coups
+# (row, col) de chaque largeur de grille
+PAIRS = tuple((byte & 15, byte >> 4) for byte in range(256))
+MOVES = {width: tuple(divmod(cell, width) for cell in range(256)) for width in range(1, 17)}
+
+
+# -- LE FORMAT BINAIRE
+# --
+
+def nibbles(width, height):
+    """ Les coups tiennent-ils sur un demi-octet ? """
+    return width * height <= 16
+
+def fits(width, height, k):
+    """
+    Toute partie de la grille width x height, k alignés, tient-elle
+    dans le format ? 16 de côté au plus, et moins de 256 coups
+    """
+    return 1 <= width <= 16 and 1 <= height <= 16 and 1 <= k <= 16 and width * height < 256
+
+def encode(record):
+    """ L'enregistrement binaire d'une partie """
+    width, height, k, (x, o), winner, moves = record
+    if not (1 <= width <= 16 and 1 <= height <= 16 and 1 <= k <= 16 and len(moves) < 256):
+        raise ValueError(f'partie impossible à enregistrer : {width}x{height}/{k}, {len(moves)} coups')
+    result = UNFINISHED if winner is None else winner
+    data = bytearray(HEADER.pack(len(moves),
+                                 STRATEGIES.index(x) | STRATEGIES.index(o) << 4,
+                                 width - 1 | (height - 1) << 4,
+                                 k - 1 | result << 4))
+    cells = [width * row + col for row, col in moves]
+    if nibbles(width, height):
+        cells.append(0)     # nombre impair de coups : dernier demi-octet vide
+        data.extend(cells[i] | cells[i + 1] << 4 for i in range(0, len(moves), 2))
+    else:
+        data.extend(cells)
+    return bytes(data)
+
+def moves_size(header):
+    """ Taille en octets des coups qui suivent l'en-tête header """
+    n, _, size, _ = HEADER.unpack(header)
+    width, height = (size & 15) + 1, (size >> 4) + 1
+    return (n + 1) // 2 if nibbles(width, height) else n
+
+def decode(header, data):
+    """ La partie dont header est l'en-tête et data les coups """
+    n, players, size, end = HEADER.unpack(header)
+    width, height, k = (size & 15) + 1, (size >> 4) + 1, (end & 15) + 1
+    result = end >> 4
+    if nibbles(width, height):
+        cells = [cell for byte in data for cell in PAIRS[byte]][:n]
+    else:
+        cells = data
+    moves = MOVES[width]
+    return Record(width, height, k,
+                  (STRATEGIES[players & 15], STRATEGIES[players >> 4]),
+                  None if result == UNFINISHED else result,
+                  tuple(moves[cell] for cell in cells))
+
+
+class RecordWriter:
+    """
+    Écriture des parties au fil de l'eau : chacune est ajoutée en fin
+    de fichier dès qu'elle est écrite, un arrêt brutal ne perd donc
+    que la partie en cours
+    """
+
+    def __init__(self, path=PATH):
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def write(self, record):
+        self.file.write(encode(record))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read(path=PATH):
+    """
+    Les parties du fichier path, une à une (générateur) : le fichier
+    n'est jamais chargé en entier
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} : fichier de parties invalide')
+        while True:
+            header = f.read(HEADER.size)
+            if not header:
+                return
+            size = moves_size(header) if len(header) == HEADER.size else 0
+            data = f.read(size)
+            if len(header) < HEADER.size or len(data) < size:
+                raise ValueError(f'{path} : dernière partie tronquée')
+            yield decode(header, data)
+
+
+# -- LA NOTATION TEXTE
+# --
+
+def move_text(move):
+    row, col = move
+    return f'{chr(ord("a") + col)}{row + 1}'
+
+def to_text(record):
+    """ La partie en une ligne de texte """
+    width, height, k, (x, o), winner, moves = record
+    return ' '.join([f'X:{x}', f'O:{o}', f'{width}x{height}/{k}', RESULTS[winner]]
+                    + [move_text(move) for move in moves])
+
+def from_text(line):
+    """ La partie décrite par une ligne de texte (voir to_text) """
+    try:
+        x, o, size, result, *moves = line.split()
+        width, _, rest = size.partition('x')
+        height, _, k = rest.partition('/')
+        winner = {text: winner for winner, text in RESULTS.items()}[result]
+        if not (x.startswith('X:') and o.startswith('O:')):
+            raise ValueError
+        return Record(int(width), int(height), int(k), (x[2:], o[2:]), winner,
+                      tuple((int(move[1:]) - 1, ord(move[0]) - ord('a')) for move in moves))
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f'partie illisible : {line!r}') from None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Les parties enregistrées')
+    parser.add_argument('path', nargs='?', default=PATH, help='fichier de parties')
+    parser.add_argument('--from-text', metavar='TEXTE',
+                        help='ajoute à path les parties du fichier TEXTE (une par ligne, - : entrée standard)')
+    parser.add_argument('--summary', action='store_true', help='bilan seulement')
+    args = parser.parse_args()
+
+    if args.from_text:
+        lines = sys.stdin if args.from_text == '-' else open(args.from_text)
+        with lines, RecordWriter(args.path) as writer:
+            for line in lines:
+                if line.strip():
+                    writer.write(from_text(line))
+        return
+
+    results = dict.fromkeys(RESULTS, 0)
+    for record in read(args.path):
+        results[record.winner] += 1
+        if not args.summary:
+            print(to_text(record))
+    print(f'{sum(results.values())} parties : {results[1]} victoires X, {results[0]} nulles, '
+          f'{results[2]} victoires O, {results[None]} inachevées', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,390 @@
+"""
+Images des grilles sans affichage : SVG, ou PNG
+
+BoardGeometry porte la géométrie des vues (GameView, et tictactoe.py
+pour la grille 3x3) : dimensions des cases, des traits, centre des
+cases et forme des marques. Les vues s'en servent pour dessiner avec
+turtle ; SVGRenderer et PNGRenderer pour produire des images sans Tk,
+sur un serveur sans écran. Comme les vues, les deux rendus préparent
+chaque marque une fois pour toutes, puis la « tamponnent » dans les
+cases : une image ne coûte que sa copie.
+
+Le PNG n'a besoin que de la bibliothèque standard (zlib) : une image
+à palette, lissée en sur-échantillonnant les marques.
+
+    svg = SVGRenderer(3, 3).image(model.grid)
+    PNGRenderer(3, 3, scale=0.5).save('partie.png', marks(record.moves))
+
+python -m engine.render parties.ttr -o images écrit une image par
+partie enregistrée (la position finale), au fil de la lecture du
+fichier ; --plies une image par position, --animate une animation
+SVG par partie, --png des PNG (voir main).
+"""
+
+import os
+import math
+import zlib
+import struct
+
+CROSS = 1
+ROUND = 2
+
+# les couleurs nommées de la vue, pour le PNG
+RGB = {'white': (255, 255, 255), 'firebrick': (178, 34, 34), 'darkcyan': (0, 139, 139)}
+
+
+# -- LA GÉOMÉTRIE
+# --
+
+class BoardGeometry:
+    """
+    La géométrie de la grille, dans le repère de turtle : origine au
+    centre, y vers le haut. Les constantes sont celles d'une grille
+    3x3, réduites pour les plus grandes
+    """
+
+    GAME_SIZE = 120     # la dimension d'une croix ou d'un rond
+                        # cette dimension conditionne l'ensemble
+                        # de l'interface
+    MARGIN = 15
+    THICKNESS = 6           # taille du trait des éléments graphiques
+    GRID_SIZE = 3 * GAME_SIZE + 2 * THICKNESS
+
+    CROSS_COLOR = 'firebrick'
+    CIRCLE_COLOR = 'darkcyan'
+    GRID_COLOR = (80, 80, 80)
+    MARK_THICKNESS = THICKNESS * 2
+
+    def __init__(self, width=3, height=3):
+        self.width = width
+        self.height = height
+        n = max(width, height)
+        self.game_size = BoardGeometry.GAME_SIZE * 3 // n
+        self.margin = BoardGeometry.MARGIN * 3 // n
+        self.thickness = max(1, BoardGeometry.THICKNESS * 3 // n)
+        self.mark_thickness = 2 * self.thickness
+        self.step = self.game_size + self.margin    # écart entre 2 centres
+        self.grid_width = width * self.step - self.margin
+        self.grid_height = height * self.step - self.margin
+
+    def center(self, row, col):
+        pixrow = self.step * (row - (self.height - 1) / 2)
+        pixcol = self.step * (col - (self.width - 1) / 2)
+        return (pixcol, pixrow)
+
+    def grid_lines(self):
+        """ Les traits de la grille, en segments ((x0, y0), (x1, y1)) """
+        lines = []
+        for row in range(1, self.height):
+            y = int(self.step * (row - self.height / 2))
+            lines.append(((-self.grid_width // 2, y), (-self.grid_width // 2 + self.grid_width, y)))
+        for col in range(1, self.width):
+            x = int(self.step * (col - self.width / 2))
+            lines.append(((x, -self.grid_height // 2), (x, -self.grid_height // 2 + self.grid_height)))
+        return lines
+
+    def cross_size(self, small=False):
+        """ (d, w) : chaque barre de la croix va de -d à d, sur une demi-épaisseur w """
+        d = round(2*self.game_size / (3*math.sqrt(2)))
+        if small:
+            d = round(d/1.5)
+        return d, self.mark_thickness / 2
+
+    def round_size(self, small=False):
+        """ (dy, r, w) : l'anneau du rond, centré en (0, dy), de rayon r et de demi-épaisseur w """
+        radius = self.game_size // 2 - self.margin // 2 - self.mark_thickness // 2
+        if small:
+            radius = round(radius / 1.5)
+        # comme avec circle() partant du bas de la case : centre un peu décalé
+        dy = -(self.game_size // 2) + self.mark_thickness + radius
+        return dy, radius, self.mark_thickness / 2
+
+    def cross_polygons(self, small=False):
+        """ La croix : 2 barres en diagonale, en (couleur, polygone) """
+        d, w = self.cross_size(small)
+        polygons = []
+        for angle in (45, 135):
+            ux, uy = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+            vx, vy = -uy * w, ux * w
+            ux, uy = ux * d, uy * d
+            polygons.append((BoardGeometry.CROSS_COLOR,
+                             ((ux + vx, uy + vy), (ux - vx, uy - vy),
+                              (-ux - vx, -uy - vy), (-ux + vx, -uy + vy))))
+        return polygons
+
+    def round_polygons(self, background, small=False, sides=36):
+        """ Le rond : un disque de la couleur, évidé par un disque du fond """
+        dy, radius, w = self.round_size(small)
+        def disc(r):
+            return tuple((r * math.cos(2 * math.pi * i / sides),
+                          dy + r * math.sin(2 * math.pi * i / sides)) for i in range(sides))
+        return [(BoardGeometry.CIRCLE_COLOR, disc(radius + w)),
+                (background, disc(radius - w))]
+
+
+def marks(moves):
+    """ Les marques (joueur, row, col) d'une suite de coups, X commençant """
+    return [(CROSS if i % 2 == 0 else ROUND, row, col) for i, (row, col) in enumerate(moves)]
+
+def grid_marks(grid):
+    """ Les marques (joueur, row, col) d'une grille liste de listes """
+    return [(player, row, col) for row, line in enumerate(grid) for col, player in enumerate(line) if player]
+
+
+# -- SVG
+# --
+
+def svg_color(color):
+    return color if isinstance(color, str) else 'rgb({},{},{})'.format(*color)
+
+def svg_number(value):
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+class SVGRenderer:
+    """
+    Les images SVG d'une taille de grille : l'en-tête (marques définies
+    une fois, grille) et la balise de chaque marque dans chaque case
+    sont préparés à la construction
+    """
+
+    def __init__(self, width=3, height=3, background='white', scale=1.0):
+        geometry = self.geometry = BoardGeometry(width, height)
+        pad = geometry.margin + geometry.thickness
+        w, h = geometry.grid_width + 2 * pad, geometry.grid_height + 2 * pad
+        n = svg_number
+        cross = ''.join(f'<polygon fill="{svg_color(color)}" points="'
+                        + ' '.join(f'{n(x)},{n(y)}' for x, y in polygon) + '"/>'
+                        for color, polygon in geometry.cross_polygons())
+        dy, radius, half = geometry.round_size()
+        ring = (f'<circle cx="0" cy="{n(dy)}" r="{n(radius)}" fill="none" '
+                f'stroke="{svg_color(BoardGeometry.CIRCLE_COLOR)}" stroke-width="{n(2 * half)}"/>')
+        lines = ''.join(f'M{x0} {y0}H{x1}' if y0 == y1 else f'M{x0} {y0}V{y1}'
+                        for (x0, y0), (x1, y1) in geometry.grid_lines())
+        # le repère de turtle : y vers le haut
+        self.header = (f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                       f'width="{n(w * scale)}" height="{n(h * scale)}" '
+                       f'viewBox="{n(-w / 2)} {n(-h / 2)} {n(w)} {n(h)}">'
+                       f'<defs><g id="X">{cross}</g><g id="O">{ring}</g></defs>'
+                       f'<rect x="{n(-w / 2)}" y="{n(-h / 2)}" width="{n(w)}" height="{n(h)}" '
+                       f'fill="{svg_color(background)}"/>'
+                       f'<g transform="scale(1,-1)">'
+                       f'<path d="{lines}" stroke="{svg_color(BoardGeometry.GRID_COLOR)}" '
+                       f'stroke-width="{geometry.thickness}" fill="none"/>')
+        self.footer = '</g></svg>\n'
+        # USE[player][row][col] : la marque de player dans la case (row, col)
+        self.use = [None] + [[[('<use xlink:href="#{}" x="{}" y="{}"'.format(
+                                    'XO'[player - 1], *map(n, geometry.center(row, col))))
+                               for col in range(width)] for row in range(height)]
+                             for player in (CROSS, ROUND)]
+
+    def image(self, grid):
+        """ Le SVG d'une grille liste de listes (la ligne 0 en bas) """
+        return self.marks(grid_marks(grid))
+
+    def marks(self, marks):
+        """ Le SVG de marques (joueur, row, col) """
+        use = self.use
+        return ''.join([self.header, *(use[player][row][col] + '/>' for player, row, col in marks),
+                        self.footer])
+
+    def animation(self, moves, delay=0.5):
+        """
+        Le SVG animé d'une partie : la grille vide, puis un coup toutes
+        les delay secondes ; la position finale reste affichée
+        """
+        use = self.use
+        return ''.join([self.header,
+                        *(f'{use[player][row][col]} visibility="hidden"><set attributeName="visibility" '
+                          f'to="visible" begin="{svg_number((i + 1) * delay)}s" fill="freeze"/></use>'
+                          for i, (player, row, col) in enumerate(marks(moves))),
+                        self.footer])
+
+    def save(self, path, marks):
+        with open(path, 'w') as f:
+            f.write(self.marks(marks))
+
+
+# -- PNG
+# --
+
+def png(width, height, palette, raw, level=6):
+    """
+    Le fichier PNG à palette (couleurs (r, v, b), 256 au plus) de
+    lignes raw : un octet de filtre, puis l'indice de chaque pixel
+    """
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0))
+            + chunk(b'PLTE', b''.join(bytes(color) for color in palette))
+            + chunk(b'IDAT', zlib.compress(raw, level))
+            + chunk(b'IEND', b''))
+
+def rgb(color):
+    return RGB[color] if isinstance(color, str) else tuple(color)
+
+def blend(background, color, alpha):
+    return tuple(round(b + (c - b) * alpha) for b, c in zip(background, color))
+
+class PNGRenderer:
+    """
+    Les images PNG d'une taille de grille : la grille vide et les
+    marques (carrés de game_size pixels, sur le fond) sont pixellisées
+    à la construction ; une image est la copie de la grille vide où
+    l'on recopie les lignes des marques, compressée. Un pixel est un
+    octet, indice dans la palette : le fond, la grille, et les fondus
+    de chaque marque sur le fond (autant que de sous-pixels couverts)
+    """
+
+    SAMPLES = 4         # sur-échantillonnage des marques, par axe
+
+    def __init__(self, width=3, height=3, background='white', scale=1.0, level=6):
+        geometry = self.geometry = BoardGeometry(width, height)
+        self.scale = scale
+        self.level = level
+        pad = geometry.margin + geometry.thickness
+        self.w0, self.h0 = geometry.grid_width + 2 * pad, geometry.grid_height + 2 * pad
+        self.width, self.height = max(1, round(self.w0 * scale)), max(1, round(self.h0 * scale))
+        self.stride = 1 + self.width
+        levels = PNGRenderer.SAMPLES ** 2
+        background = rgb(background)
+        self.palette = [background, BoardGeometry.GRID_COLOR]
+        for color in (BoardGeometry.CROSS_COLOR, BoardGeometry.CIRCLE_COLOR):
+            self.palette += [blend(background, rgb(color), k / levels) for k in range(1, levels + 1)]
+        self.base = self.empty_grid()
+        self.tile = max(1, math.ceil(geometry.game_size * scale))
+        self.sprites = [None, self.sprite(self.cross_coverage(), 2),
+                        self.sprite(self.round_coverage(), 2 + levels)]
+        # OFFSETS[row][col] : position dans l'image du coin haut gauche de la marque
+        self.offsets = [[self.offset(*geometry.center(row, col)) for col in range(width)]
+                        for row in range(height)]
+
+    def pixel(self, x, y):
+        """ Le pixel (colonne, ligne) du point (x, y) du repère de turtle """
+        return (x + self.w0 / 2) * self.scale, (self.h0 / 2 - y) * self.scale
+
+    def offset(self, x, y):
+        px, py = self.pixel(x, y)
+        return round(py - self.tile / 2) * self.stride + 1 + round(px - self.tile / 2)
+
+    def empty_grid(self):
+        raw = bytearray(self.stride * self.height)     # filtre 0, fond partout
+        half = self.geometry.thickness / 2
+        for (x0, y0), (x1, y1) in self.geometry.grid_lines():
+            left, top = self.pixel(min(x0, x1) - (half if x0 == x1 else 0), max(y0, y1) + (half if y0 == y1 else 0))
+            right, bottom = self.pixel(max(x0, x1) + (half if x0 == x1 else 0), min(y0, y1) - (half if y0 == y1 else 0))
+            left, right = round(left), max(round(right), round(left) + 1)
+            for row in range(round(top), max(round(bottom), round(top) + 1)):
+                start = row * self.stride + 1
+                raw[start + left:start + right] = b'\1' * (right - left)
+        return raw
+
+    def coverage(self, inside):
+        """
+        Le nombre de sous-pixels de chaque pixel de la marque couverts
+        par la forme : inside(x, y) dit si le point (repère de turtle,
+        centre de la case à l'origine) y est
+        """
+        n, tile, scale = PNGRenderer.SAMPLES, self.tile, self.scale
+        points = [((k + 0.5) / n - tile / 2) / scale for k in range(n * tile)]
+        rows = []
+        for j in range(tile):
+            ys = [-y for y in points[j * n:(j + 1) * n]]
+            rows.append([sum(inside(x, y) for x in points[i * n:(i + 1) * n] for y in ys)
+                         for i in range(tile)])
+        return rows
+
+    def cross_coverage(self):
+        d, w = self.geometry.cross_size()
+        r = math.sqrt(0.5)
+        # pour chaque barre : |p.u| <= d le long de la barre, |p.v| <= w en travers
+        def inside(x, y):
+            a, b = (x + y) * r, (y - x) * r
+            return (abs(a) <= d and abs(b) <= w) or (abs(b) <= d and abs(a) <= w)
+        return self.coverage(inside)
+
+    def round_coverage(self):
+        dy, radius, w = self.geometry.round_size()
+        inner, outer = (radius - w) ** 2, (radius + w) ** 2
+        return self.coverage(lambda x, y: inner <= x * x + (y - dy) ** 2 <= outer)
+
+    def sprite(self, coverage, first):
+        """ Les lignes de la marque : fond, ou fondu first + couverture - 1 """
+        return [bytes(first + count - 1 if count else 0 for count in row) for row in coverage]
+
+    def marks(self, marks):
+        """ Le PNG de marques (joueur, row, col) """
+        raw = self.base[:]
+        stride, offsets, sprites, size = self.stride, self.offsets, self.sprites, self.tile
+        for player, row, col in marks:
+            start = offsets[row][col]
+            for line in sprites[player]:
+                raw[start:start + size] = line
+                start += stride
+        return png(self.width, self.height, self.palette, bytes(raw), self.level)
+
+    def image(self, grid):
+        return self.marks(grid_marks(grid))
+
+    def save(self, path, marks):
+        with open(path, 'wb') as f:
+            f.write(self.marks(marks))
+
+
+# -- EXPORT PAR LOTS
+# --
+
+def export(records, directory, fmt='svg', plies=False, animate=False, scale=1.0, delay=0.5):
+    """
+    Écrit dans directory les images (fmt : 'svg' ou 'png') des parties
+    records (itérable de engine.records.Record, lu au fur et à mesure) :
+    la position finale de chacune, toutes ses positions si plies, son
+    animation SVG si animate. Retourne le nombre de fichiers écrits
+    """
+    os.makedirs(directory, exist_ok=True)
+    renderers = {}      # un par taille de grille
+    renderer_class = PNGRenderer if fmt == 'png' else SVGRenderer
+    count = 0
+    for number, record in enumerate(records, 1):
+        size = record.width, record.height
+        if size not in renderers:
+            renderers[size] = renderer_class(*size, scale=scale)
+        renderer = renderers[size]
+        name = os.path.join(directory, f'partie-{number:06d}')
+        if animate:
+            with open(f'{name}.svg', 'w') as f:
+                f.write(renderer.animation(record.moves, delay))
+            count += 1
+            continue
+        played = marks(record.moves)
+        for ply in range(len(played) + 1) if plies else (len(played),):
+            renderer.save(f'{name}-{ply:02d}.{fmt}' if plies else f'{name}.{fmt}', played[:ply])
+            count += 1
+    return count
+
+
+def main():
+    import time
+    import argparse
+    from .records import PATH, read
+
+    parser = argparse.ArgumentParser(description='Images des parties enregistrées')
+    parser.add_argument('path', nargs='?', default=PATH, help='fichier de parties')
+    parser.add_argument('-o', '--output', default='images', help='dossier des images')
+    parser.add_argument('--png', action='store_true', help='PNG plutôt que SVG')
+    parser.add_argument('--plies', action='store_true', help='une image par position')
+    parser.add_argument('--animate', action='store_true', help='une animation SVG par partie')
+    parser.add_argument('--scale', type=float, default=1.0, help='taille des images (1 : celle de la fenêtre)')
+    parser.add_argument('--delay', type=float, default=0.5, help='secondes entre 2 coups (--animate)')
+    args = parser.parse_args()
+    if args.animate and (args.png or args.plies):
+        parser.error('--animate : SVG seulement, une image par partie')
+    start = time.perf_counter()
+    count = export(read(args.path), args.output, 'png' if args.png else 'svg',
+                   args.plies, args.animate, args.scale, args.delay)
+    elapsed = time.perf_counter() - start
+    print(f'{count} images dans {args.output} en {elapsed:.2f} s ({count / elapsed:.0f} images/s)')
+
+
+if __name__ == '__main__':
+    main()
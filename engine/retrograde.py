@@ -0,0 +1,453 @@
+"""
+Résolution complète des petites grilles MNK par analyse rétrograde
+
+negamax part de la position courante et redescend l'arbre ; dès le
+4x4 (4 alignés), il y a trop de chemins vers les mêmes positions.
+Ici, on part du bas : on énumère une fois toutes les positions
+atteignables, puis on les résout de la grille pleine vers la grille
+vide. Une position à n marques ne mène qu'à des positions à n + 1
+marques : quand vient son tour, la valeur de chaque suite est connue.
+
+1. En avant : couche par couche (n marques), les positions atteignables
+   où personne n'a encore aligné k marques, sous forme canonique (la
+   plus petite image par les isométries de la grille, voir zobrist.py).
+   Un coup qui aligne k marques (le test de check_winner, restreint
+   aux alignements qui passent par la cellule jouée, comme dans play)
+   termine la partie : la position obtenue n'est pas rangée, le coup
+   suffit à marquer la précédente comme gagnée.
+2. En arrière : de la couche pleine (nulles) à la couche vide, chaque
+   position vaut WIN si un coup gagne ou mène à une position LOSS pour
+   l'adversaire, sinon DRAW si un coup mène à une nulle, sinon LOSS.
+
+Chaque couche est un tableau trié de clés de 64 bits (plateau X, puis
+plateau O décalé de width * height bits) et un tableau de bits, deux
+par position. Les couches sont découpées en tranches de CHUNK positions,
+traitées par les processus de parallel si workers > 1 : une tranche en
+arrière relit la couche suivante dans le fichier en construction.
+
+Le fichier (par défaut retrograde_<w>x<h>_<k>.bin à la racine du dépôt) :
+
+    MAGIC, width, height, k (un octet chacun), un octet nul
+    le nombre de positions de chaque couche, 0 à width * height ('<Q')
+    pour chaque couche : ses clés ('<Q', triées), puis ses valeurs
+        (4 par octet, la position j aux bits 2 * (j % 4)), complétées
+        jusqu'à un multiple de 8 octets
+
+La valeur est celle du joueur qui a le trait (X si n est pair).
+
+    python -m engine.retrograde 4 4 4 [--workers N]     # construction puis vérification
+    python -m engine.retrograde 4 4 4 --verify          # vérification seule
+
+MNKModel.choice consulte le fichier de sa grille s'il existe
+(solution(width, height, k).best_moves(model)), comme GameModel la
+table de finales.
+"""
+
+import os
+import sys
+import time
+import bisect
+import random
+import struct
+from array import array
+
+from .zobrist import symmetries
+from . import parallel
+
+try:
+    import resource     # absent sous Windows : pas de mesure de la mémoire
+except ImportError:
+    resource = None
+
+MAGIC = b'MNK1'
+HEADER = struct.Struct('<4sBBBx')
+COUNT = struct.Struct('<Q')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOSS, DRAW, WIN = 0, 1, 2       # pour le joueur qui a le trait
+CHUNK = 20_000                  # positions par tâche (multiple de 4)
+EXACT_EMPTY = 9                 # vérification : cellules libres au plus
+
+
+def default_path(width, height, k):
+    return os.path.join(ROOT, f'retrograde_{width}x{height}_{k}.bin')
+
+
+def image_tables(width, height):
+    """
+    Pour chaque isométrie autre que l'identité, une table par octet de
+    la clé : tables[j][v] est l'image des bits v de l'octet j
+    """
+    nb_cells = width * height
+    images = []
+    for perm in symmetries(width, height)[1:]:
+        target = list(perm) + [cell + nb_cells for cell in perm]
+        tables = []
+        for start in range(0, 2 * nb_cells, 8):
+            bits = target[start:start + 8]
+            tables.append(tuple(sum(1 << bits[b] for b in range(len(bits)) if v >> b & 1)
+                                for v in range(256)))
+        images.append(tuple(tables))
+    return tuple(images)
+
+def canonical(images, key):
+    """ La plus petite image de la clé key """
+    best = key
+    for tables in images:
+        image = 0
+        rest = key
+        for table in tables:
+            image |= table[rest & 255]
+            rest >>= 8
+        if image < best:
+            best = image
+    return best
+
+
+def layout(counts):
+    """ Les positions (clés, valeurs) de chaque couche dans le fichier """
+    offset = HEADER.size + len(counts) * COUNT.size
+    offsets = []
+    for count in counts:
+        values = offset + 8 * count
+        offsets.append((offset, values))
+        offset = values + -(-count // 32) * 8     # 4 valeurs par octet, par blocs de 8 octets
+    return offsets, offset
+
+def to_array(data):
+    keys = array('Q', data)
+    if sys.byteorder == 'big':
+        keys.byteswap()
+    return keys
+
+def to_bytes(keys):
+    if sys.byteorder == 'big':
+        keys = array('Q', keys)
+        keys.byteswap()
+    return keys.tobytes()
+
+
+# -- LA RÉSOLUTION
+# --
+
+class Board:
+    """ Les tables d'une grille pour la résolution """
+
+    def __init__(self, width, height, k):
+        from .model import MNKModel
+
+        model = MNKModel(width, height, k)
+        self.nb_cells = model.nb_cells
+        self.full = model.full_mask
+        # LINES[i] : les alignements qui passent par la cellule i
+        self.lines = tuple(tuple(model.win_masks[line] for line in lines)
+                           for lines in model.line_ids)
+        self.images = image_tables(width, height)
+
+    def wins(self, board, i):
+        for mask in self.lines[i]:
+            if board & mask == mask:
+                return True
+        return False
+
+# une Board par grille dans chaque processus de parallel
+_boards = {}
+
+def board_for(config):
+    board = _boards.get(config)
+    if board is None:
+        board = _boards[config] = Board(*config)
+    return board
+
+
+def expand(config, n, data):
+    """
+    Les suites (clés canoniques, triées, en octets) des positions data
+    de la couche n, sauf celles où le coup aligne k marques
+    """
+    board = board_for(config)
+    nb_cells, full, images = board.nb_cells, board.full, board.images
+    shift = nb_cells * (n % 2)      # le plateau du joueur qui a le trait
+    children = set()
+    for key in to_array(data):
+        occupied = (key | key >> nb_cells) & full
+        mine = key >> shift & full
+        for i in range(nb_cells):
+            if not occupied >> i & 1 and not board.wins(mine | 1 << i, i):
+                children.add(canonical(images, key | 1 << i + shift))
+    return to_bytes(array('Q', sorted(children)))
+
+def read_layer(f, counts, offsets, n, start=0, stop=None):
+    """ Les clés [start, stop[ de la couche n et les valeurs de toute la couche """
+    stop = counts[n] if stop is None else stop
+    f.seek(offsets[n][0] + 8 * start)
+    keys = to_array(f.read(8 * (stop - start)))
+    f.seek(offsets[n][1])
+    return keys, f.read(-(-counts[n] // 4))
+
+def label(config, path, counts, n, start, stop):
+    """ Les valeurs (octets) des positions [start, stop[ de la couche n """
+    board = board_for(config)
+    nb_cells, full, images = board.nb_cells, board.full, board.images
+    offsets = layout(counts)[0]
+    with open(path, 'rb') as f:
+        keys = read_layer(f, counts, offsets, n, start, stop)[0]
+        after, values = read_layer(f, counts, offsets, n + 1) if n < nb_cells else ((), b'')
+    shift = nb_cells * (n % 2)
+    result = bytearray(-(-len(keys) // 4))
+    for j, key in enumerate(keys):
+        occupied = (key | key >> nb_cells) & full
+        mine = key >> shift & full
+        value = DRAW if occupied == full else LOSS
+        for i in range(nb_cells):
+            if occupied >> i & 1:
+                continue
+            if board.wins(mine | 1 << i, i):
+                value = WIN
+                break
+            index = bisect.bisect_left(after, canonical(images, key | 1 << i + shift))
+            other = values[index >> 2] >> 2 * (index & 3) & 3
+            if other == LOSS:
+                value = WIN
+                break
+            if other == DRAW:
+                value = DRAW
+        result[j >> 2] |= value << 2 * (j & 3)
+    return bytes(result)
+
+
+def run(fct, tasks, workers):
+    if parallel.worth_it(workers, len(tasks)):
+        return parallel.run(fct, tasks, workers)
+    return [fct(*task) for task in tasks]
+
+def peak_memory():
+    """
+    Le pic de mémoire du processus, en octets (None si inconnu) ; un
+    worker ne tient en plus qu'une tranche et la couche suivante
+    """
+    if resource is None:
+        return None
+    unit = 1 if sys.platform == 'darwin' else 1024      # ru_maxrss en Ko sous Linux
+    return unit * resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def build(width, height, k, path=None, workers=None, chunk=CHUNK):
+    """
+    Résout la grille et écrit le fichier ; retourne le bilan :
+    positions par couche, valeurs, durées et mémoire. chunk, le nombre
+    de positions d'une tranche, est un multiple de 4 : chaque tranche
+    écrit ses valeurs (2 bits chacune) sur des octets entiers
+    """
+    config = width, height, k
+    path = path or default_path(*config)
+    nb_cells = width * height
+    if 2 * nb_cells > 64:
+        raise ValueError(f'{width}x{height} : les clés dépassent 64 bits')
+    if chunk <= 0 or chunk % 4:
+        raise ValueError(f'tranches de {chunk} positions : il faut un multiple de 4')
+    start = time.perf_counter()
+    layers = [to_bytes(array('Q', [0]))]
+    for n in range(nb_cells):
+        data = layers[-1]
+        tasks = [(config, n, data[8 * i:8 * (i + chunk)]) for i in range(0, len(data) // 8, chunk)]
+        children = set()
+        for part in run(expand, tasks, workers):
+            children.update(to_array(part))
+        layers.append(to_bytes(array('Q', sorted(children))))
+    forward = time.perf_counter() - start
+
+    counts = [len(data) // 8 for data in layers]
+    offsets, size = layout(counts)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, width, height, k))
+        for count in counts:
+            f.write(COUNT.pack(count))
+        for data, (keys, _) in zip(layers, offsets):
+            f.seek(keys)
+            f.write(data)
+        f.truncate(size)    # les valeurs, à zéro jusqu'à la passe en arrière
+    del layers
+
+    start = time.perf_counter()
+    outcomes = [0, 0, 0]
+    with open(path, 'r+b') as f:
+        for n in range(nb_cells, -1, -1):
+            tasks = [(config, path, counts, n, i, min(i + chunk, counts[n]))
+                     for i in range(0, counts[n], chunk)]
+            values = b''.join(run(label, tasks, workers))
+            f.seek(offsets[n][1])
+            f.write(values)
+            f.flush()
+            for byte in values:
+                for j in range(4):
+                    outcomes[byte >> 2 * j & 3] += 1
+            outcomes[LOSS] -= 4 * len(values) - counts[n]   # le remplissage du dernier octet
+    backward = time.perf_counter() - start
+    # le prochain solution() relit le fichier par défaut, peut-être
+    # reconstruit ; path n'est lu qu'ici
+    _solutions.pop(config, None)
+    root = Solution(*config, path).lookup(0, 0)
+    return {'positions': sum(counts), 'layers': counts, 'root': root,
+            'wins': outcomes[WIN], 'draws': outcomes[DRAW], 'losses': outcomes[LOSS],
+            'forward': forward, 'backward': backward, 'size': os.path.getsize(path),
+            'memory': peak_memory()}
+
+
+# -- LA LECTURE
+# --
+
+class Solution:
+    """ Lecture paresseuse du fichier d'une grille résolue """
+
+    def __init__(self, width, height, k, path=None):
+        self.config = width, height, k
+        self.path = path or default_path(width, height, k)
+        self.keys = None        # les clés de chaque couche (array)
+        self.values = None      # les valeurs de chaque couche (bytes)
+        self.missing = False
+
+    def load(self):
+        """ Lit le fichier ; retourne False s'il est absent """
+        if self.keys is None and not self.missing:
+            try:
+                with open(self.path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self.missing = True
+                return False
+            magic, *config = HEADER.unpack_from(data)
+            nb_cells = config[0] * config[1]
+            if magic != MAGIC or tuple(config) != self.config:
+                raise ValueError(f'{self.path} : fichier de résolution invalide')
+            counts = [COUNT.unpack_from(data, HEADER.size + COUNT.size * n)[0]
+                      for n in range(nb_cells + 1)]
+            offsets, size = layout(counts)
+            if len(data) != size:
+                raise ValueError(f'{self.path} : fichier de résolution tronqué')
+            self.images = image_tables(*self.config[:2])
+            self.nb_cells = nb_cells
+            self.values = [data[values:values + -(-count // 4)]
+                           for count, (_, values) in zip(counts, offsets)]
+            self.keys = [to_array(data[keys:keys + 8 * count])
+                         for count, (keys, _) in zip(counts, offsets)]
+        return self.keys is not None
+
+    def lookup(self, xbits, obits):
+        """
+        Valeur (WIN, DRAW, LOSS) pour le joueur qui a le trait, ou None
+        si la position n'est pas dans le fichier (partie finie, position
+        impossible, fichier absent)
+        """
+        if not self.load():
+            return None
+        key = canonical(self.images, xbits | obits << self.nb_cells)
+        n = (xbits | obits).bit_count()
+        keys = self.keys[n]
+        index = bisect.bisect_left(keys, key)
+        if index == len(keys) or keys[index] != key:
+            return None
+        return self.values[n][index >> 2] >> 2 * (index & 3) & 3
+
+    def best_moves(self, model):
+        """
+        Les meilleurs coups (row, col) du joueur qui a le trait dans
+        model, dans l'ordre des cellules ; None si le fichier ne sait
+        pas répondre
+        """
+        x, o = model.boards[1], model.boards[2]
+        if model.player != 1 + (x | o).bit_count() % 2 or self.lookup(x, o) is None:
+            return None
+        results = {}
+        for i in range(model.nb_cells):
+            bit = model.bits[i]
+            if (x | o) & bit:
+                continue
+            if model.threatens(model.player, i):
+                results[i] = WIN + 1    # gagner tout de suite plutôt que plus tard
+            else:
+                other = self.lookup(x | bit, o) if model.player == 1 else self.lookup(x, o | bit)
+                results[i] = WIN - other
+        best = max(results.values())
+        return [divmod(i, model.width) for i in results if results[i] == best]
+
+# une Solution par grille, ouverte au premier appel
+_solutions = {}
+
+def solution(width, height, k, path=None):
+    config = width, height, k
+    if config not in _solutions:
+        _solutions[config] = Solution(width, height, k, path)
+    return _solutions[config]
+
+
+# -- LA VÉRIFICATION
+# --
+
+def verify(width, height, k, path=None, games=100, seed=None):
+    """
+    Des parties au hasard ; à chaque position où il reste au plus
+    EXACT_EMPTY cellules libres, compare le fichier à l'alpha-beta
+    complet de MNKModel. Retourne (positions comparées, écarts)
+    """
+    from .model import MNKModel
+
+    rng = random.Random(seed)
+    base = Solution(width, height, k, path)
+    if not base.load():
+        raise FileNotFoundError(base.path)
+    model = MNKModel(width, height, k)
+    checked, errors = 0, []
+    for _ in range(games):
+        model.reset()
+        while not model.end_game():
+            if model.empty <= EXACT_EMPTY:
+                model.depth = model.empty
+                score = model.negamax()
+                exact = WIN if score >= MNKModel.WIN else LOSS if score <= -MNKModel.WIN else DRAW
+                value = base.lookup(model.boards[1], model.boards[2])
+                checked += 1
+                if value != exact:
+                    errors.append((model.boards[1], model.boards[2]))
+            model.play(rng.choice(model.empty_cells()))
+    return checked, errors
+
+
+def report(config, stats):
+    width, height, k = config
+    memory = stats['memory']
+    return (f'{width}x{height}, {k} alignés : {stats["positions"]} positions '
+            f'({stats["wins"]} gagnantes, {stats["draws"]} nulles, {stats["losses"]} perdantes '
+            f'pour le trait), grille vide {("perdue", "nulle", "gagnée")[stats["root"]]} pour X\n'
+            f'  en avant {stats["forward"]:.1f} s, en arrière {stats["backward"]:.1f} s, '
+            f'fichier {stats["size"] / 1e6:.1f} Mo'
+            + (f', pic mémoire {memory / 1e6:.0f} Mo' if memory is not None else ''))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Résolution rétrograde d\'une grille MNK')
+    parser.add_argument('size', nargs=3, type=int, metavar=('width', 'height', 'k'))
+    parser.add_argument('--path', default=None)
+    parser.add_argument('--workers', type=int, default=None, help='processus pour les tranches')
+    parser.add_argument('--chunk', type=int, default=CHUNK, help='positions par tranche')
+    parser.add_argument('--verify', action='store_true', help='vérifier le fichier sans le reconstruire')
+    parser.add_argument('--games', type=int, default=100, help='parties de la vérification')
+    args = parser.parse_args()
+    config = tuple(args.size)
+    if not args.verify:
+        try:
+            stats = build(*config, args.path, args.workers, args.chunk)
+        except ValueError as error:
+            parser.error(str(error))
+        print(report(config, stats))
+    checked, errors = verify(*config, args.path, args.games)
+    if errors:
+        print(f'{len(errors)} positions sur {checked} diffèrent de l\'alpha-beta, par ex. {errors[:5]}')
+        sys.exit(1)
+    print(f'{checked} positions conformes à l\'alpha-beta')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Serveur de coups HTTP/JSON (asyncio, bibliothèque standard seulement)
+
+    python -m engine.server [--host 127.0.0.1] [--port 8018]
+
+Une position est une grille 3x3 (liste de 3 lignes, la ligne 0 en
+bas, comme dans engine.grid : 0 vide, 1 X, 2 O) ; le joueur qui a
+le trait s'en déduit (X commence). Toutes les requêtes sont des POST
+d'un objet JSON :
+
+    /move    {"grid": ...}                  -> {"move": [r, c], "score": s, "best": [[r, c], ...]}
+    /scores  {"grid": ...}                  -> {"scores": [[r, c, s], ...]}
+    /play    {"grid": ..., "move": [r, c]}  -> {"grid": ..., "winner": w, "over": bool}
+
+Un score vaut 1, 0 ou -1 pour le joueur qui a le trait ; "move" est
+le premier des meilleurs coups dans l'ordre des cellules. GET /stats
+donne l'état du cache. Une requête invalide reçoit le code 400 et
+{"error": "..."}.
+
+Les scores de tous les coups d'une position sont calculés une fois
+pour sa forme canonique (voir engine/transposition.py) et gardés
+dans un cache LRU : les 8 positions symétriques en profitent. Les
+positions absentes du cache sont calculées par lots dans un thread
+(le modèle n'est pas partagé, la boucle d'événements reste libre) :
+les requêtes arrivées pendant le calcul d'un lot forment le suivant,
+une position demandée plusieurs fois n'y est calculée qu'une fois.
+"""
+
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .model import GameModel, CROSS, ROUND, BITS, WINNING
+from .transposition import TranspositionTable, SYMMETRIES, NB_CELLS, symmetry
+
+HOST = '127.0.0.1'
+PORT = 8018
+CACHE_SIZE = 10_000
+MAX_BODY = 4096
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class RequestError(Exception):
+    """ Requête invalide : le message est renvoyé au client (code 400) """
+
+
+# -- LES POSITIONS
+# --
+
+def parse_grid(grid):
+    """ (plateau X, plateau O, joueur) d'une grille JSON ; RequestError si invalide """
+    if (not isinstance(grid, list) or len(grid) != 3
+            or any(not isinstance(line, list) or len(line) != 3 for line in grid)):
+        raise RequestError('grid : 3 lignes de 3 cellules attendues')
+    boards = [0, 0, 0]
+    for row in range(3):
+        for col in range(3):
+            value = grid[row][col]
+            if value not in (0, CROSS, ROUND) or isinstance(value, bool):
+                raise RequestError(f'grid[{row}][{col}] : 0, 1 ou 2 attendu')
+            if value:
+                boards[value] |= BITS[row][col]
+    x, o = boards[CROSS], boards[ROUND]
+    if x.bit_count() - o.bit_count() not in (0, 1):
+        raise RequestError('grid : X commence, les joueurs alternent')
+    return x, o, CROSS if x.bit_count() == o.bit_count() else ROUND
+
+def to_grid(x, o):
+    return [[CROSS if x & BITS[row][col] else ROUND if o & BITS[row][col] else 0
+                for col in range(3)] for row in range(3)]
+
+def winner(x, o):
+    return CROSS if WINNING[x] else ROUND if WINNING[o] else 0
+
+
+# -- LE SERVEUR
+# --
+
+class MoveServer:
+    """
+    Les réponses aux requêtes, et le cache des scores : forme
+    canonique -> scores des 9 cellules dans cette forme (None
+    pour une cellule occupée)
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        # le même LRU que la table de transposition, avec ses compteurs
+        self.cache = TranspositionTable(cache_size)
+        self.model = GameModel()    # utilisé seulement par le thread de calcul
+        self.executor = ThreadPoolExecutor(1)
+        self.pending = {}           # clé -> (position, future) du prochain lot
+        self.running = False        # un lot est-il en cours de calcul ?
+        self.batches = self.batched = 0
+        self.requests = 0
+
+    # -- le calcul par lots
+
+    def solve(self, positions):
+        """ Dans le thread : les scores de chaque position canonique """
+        model = self.model
+        results = []
+        for x, o, player in positions:
+            model.boards = [0, x, o]
+            model.player = player
+            model.count()
+            scores = [None] * NB_CELLS
+            for row, col in model.empty_cells():
+                scores[3 * row + col] = model.score_move((row, col))
+            results.append(scores)
+        return results
+
+    def flush(self):
+        """ Lance le calcul des positions en attente """
+        if self.running or not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        self.running = True
+        self.batches += 1
+        self.batched += len(batch)
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, self.solve,
+                                    [position for position, _ in batch.values()])
+        task.add_done_callback(lambda task: self.done(batch, task))
+
+    def done(self, batch, task):
+        self.running = False
+        error = task.exception()
+        results = [None] * len(batch) if error else task.result()
+        for (key, (_, future)), scores in zip(batch.items(), results):
+            if not error:
+                self.cache.store(key, scores)
+            if future.done():
+                continue    # annulée (voir canonical_scores)
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(scores)
+        self.flush()    # les requêtes arrivées entre temps
+
+    async def canonical_scores(self, canon, player):
+        key = canon << 2 | player
+        scores = self.cache.get(key)
+        if scores is not None:
+            return scores
+        if key not in self.pending:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = (canon >> NB_CELLS, canon & GameModel.FULL, player), future
+            asyncio.get_running_loop().call_soon(self.flush)
+        # le futur est partagé par toutes les requêtes de la position :
+        # un client qui se déconnecte n'annule que son attente
+        return await asyncio.shield(self.pending[key][1])
+
+    async def scores(self, x, o, player):
+        """ {(row, col): score} des cellules libres de la position """
+        if winner(x, o) or (x | o) == GameModel.FULL:
+            raise RequestError('la partie est finie')
+        canon, k = symmetry(x, o)
+        canonical = await self.canonical_scores(canon, player)
+        perm = SYMMETRIES[k]
+        return {divmod(i, 3): canonical[perm[i]] for i in range(NB_CELLS)
+                    if not (x | o) >> i & 1}
+
+    # -- les requêtes
+
+    async def move(self, request):
+        scores = await self.scores(*parse_grid(request.get('grid')))
+        best = max(scores.values())
+        moves = [list(move) for move, score in sorted(scores.items()) if score == best]
+        return {'move': moves[0], 'score': best, 'best': moves}
+
+    async def all_scores(self, request):
+        scores = await self.scores(*parse_grid(request.get('grid')))
+        return {'scores': [[row, col, score] for (row, col), score in sorted(scores.items())]}
+
+    async def play(self, request):
+        x, o, player = parse_grid(request.get('grid'))
+        move = request.get('move')
+        if (not isinstance(move, list) or len(move) != 2
+                or any(type(value) is not int or not 0 <= value < 3 for value in move)):
+            raise RequestError('move : [ligne, colonne] attendu, de 0 à 2')
+        if winner(x, o):
+            raise RequestError('la partie est finie')
+        bit = BITS[move[0]][move[1]]
+        if (x | o) & bit:
+            raise RequestError('cellule occupée')
+        if player == CROSS:
+            x |= bit
+        else:
+            o |= bit
+        won = winner(x, o)
+        return {'grid': to_grid(x, o), 'winner': won,
+                'over': bool(won) or (x | o) == GameModel.FULL}
+
+    def stats(self):
+        return {'requests': self.requests, 'cache': len(self.cache),
+                'hits': self.cache.hits, 'misses': self.cache.misses,
+                'batches': self.batches,
+                'batch_size': round(self.batched / self.batches, 2) if self.batches else 0}
+
+    async def dispatch(self, method, path, body):
+        """ (code HTTP, réponse) pour une requête """
+        self.requests += 1
+        routes = {'/move': self.move, '/scores': self.all_scores, '/play': self.play}
+        if path == '/stats':
+            return (200, self.stats()) if method == 'GET' else (405, {'error': 'GET attendu'})
+        if path not in routes:
+            return 404, {'error': f'{path} : inconnu'}
+        if method != 'POST':
+            return 405, {'error': 'POST attendu'}
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise RequestError('un objet JSON est attendu')
+            return 200, await routes[path](request)
+        except json.JSONDecodeError as error:
+            return 400, {'error': f'JSON invalide : {error}'}
+        except RequestError as error:
+            return 400, {'error': str(error)}
+
+    # -- HTTP/1.1, connexions persistantes
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, version = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    raise ValueError('requête trop longue')
+                body = await reader.readexactly(length)
+                status, payload = await self.dispatch(method, path, body)
+                keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                data = json.dumps(payload).encode()
+                writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                             f'Content-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\n'
+                             f'{"" if keep else "Connection: close" + chr(13) + chr(10)}\r\n'
+                             .encode('latin-1') + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass    # requête illisible ou client parti : on ferme
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        """ Sert jusqu'à l'arrêt du processus ; ready(port) est appelé une fois à l'écoute """
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serveur de coups HTTP/JSON')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT, help='0 : un port libre')
+    parser.add_argument('--cache', type=int, default=CACHE_SIZE, help='positions gardées en cache')
+    args = parser.parse_args()
+    server = MoveServer(args.cache)
+    try:
+        asyncio.run(server.serve(args.host, args.port,
+                                 ready=lambda port: print(f'à l\'écoute sur http://{args.host}:{port}',
+                                                          flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
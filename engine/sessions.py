@@ -0,0 +1,238 @@
+"""
+Gestion de milliers de parties simultanées (3x3)
+
+GameController tient une partie : un GameModel et une fenêtre. Un
+serveur en héberge des milliers ; SessionManager garde chacune dans
+un entier de 32 bits, à son indice (slot) dans un tableau :
+
+    bits 0 à 8   : plateau X
+    bits 9 à 17  : plateau O
+    bits 18, 19  : le joueur qui a le trait
+    bits 20 à 23 : nombre de coups joués
+    bits 24, 25  : les joueurs tenus par la machine (CROSS, ROUND, BOTH)
+
+Les coups de la machine ne sont pas joués à la demande : les sessions
+qui les attendent sont mises en file, et step() les joue toutes en un
+lot. Le lot est regroupé par forme canonique (voir transposition.py) :
+une position demandée par cent sessions, ou par ses symétriques, n'est
+cherchée qu'une fois, dans la table de finales ou par negamax ; ses
+meilleurs coups restent ensuite en cache (LRU) pour les lots suivants.
+
+Une session inactive depuis plus de idle secondes est évincée par
+evict() ; les sessions sont gardées dans l'ordre de leur dernière
+activité, l'éviction ne parcourt donc que celles qui partent.
+
+    sessions = SessionManager()
+    sid = sessions.open(machine=ROUND)
+    sessions.play(sid, (1, 1))
+    sessions.step()             # O a joué, dans toutes les sessions en attente
+    sessions.grid(sid)
+"""
+
+import time
+import random
+from array import array
+from collections import OrderedDict
+
+from .model import GameModel, CROSS, ROUND, BITS, WINNING
+from .tablebase import TABLEBASE, index_from_bits
+from .transposition import TranspositionTable, SYMMETRIES, NB_CELLS, FULL_MASK, symmetry
+
+BOTH = CROSS | ROUND        # la machine joue les deux camps
+IDLE = 600                  # secondes d'inactivité avant éviction
+CACHE_SIZE = 10_000         # positions canoniques gardées en cache
+
+PLAYER_SHIFT = 18
+MOVES_SHIFT = 20
+MACHINE_SHIFT = 24
+
+# CELLS[bits] : les cellules d'un plateau
+CELLS = tuple(tuple(i for i in range(NB_CELLS) if bits >> i & 1) for bits in range(FULL_MASK + 1))
+# INVERSES[k][c] : la cellule que la k-ième isométrie envoie sur c
+INVERSES = tuple(tuple(perm.index(c) for c in range(NB_CELLS)) for perm in SYMMETRIES)
+
+
+def pack(x, o, player, moves, machine):
+    return x | o << NB_CELLS | player << PLAYER_SHIFT | moves << MOVES_SHIFT | machine << MACHINE_SHIFT
+
+def unpack(state):
+    """ (plateau X, plateau O, joueur, nombre de coups, machine) """
+    return (state & FULL_MASK, state >> NB_CELLS & FULL_MASK, state >> PLAYER_SHIFT & 3,
+            state >> MOVES_SHIFT & 15, state >> MACHINE_SHIFT & 3)
+
+def winner(x, o):
+    return CROSS if WINNING[x] else ROUND if WINNING[o] else 0
+
+def over(x, o):
+    return bool(winner(x, o)) or (x | o) == FULL_MASK
+
+
+class SessionManager:
+    """ LES PARTIES EN COURS (voir le début du module) """
+
+    def __init__(self, idle=IDLE, cache_size=CACHE_SIZE):
+        self.idle = idle
+        self.slots = OrderedDict()  # session -> slot, la moins récemment active d'abord
+        self.states = array('I')    # l'état compact de chaque slot
+        self.last = array('d')      # la dernière activité de chaque slot (time.monotonic)
+        self.free = []              # les slots libérés, réutilisés
+        self.waiting = {}           # les sessions où la machine a le trait, dans l'ordre
+        self.next_id = 0
+        # forme canonique et trait -> meilleurs coups (cellules de la forme canonique)
+        self.cache = TranspositionTable(cache_size)
+        self.model = GameModel()
+        self.batches = self.searched = self.machine_moves = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, session):
+        return session in self.slots
+
+    # -- les sessions
+
+    def open(self, machine=ROUND, now=None):
+        """ Nouvelle partie ; machine : les joueurs tenus par la machine ; retourne son numéro """
+        session = self.next_id
+        self.next_id += 1
+        now = time.monotonic() if now is None else now
+        state = pack(0, 0, CROSS, 0, machine)
+        if self.free:
+            slot = self.free.pop()
+            self.states[slot] = state
+            self.last[slot] = now
+        else:
+            slot = len(self.states)
+            self.states.append(state)
+            self.last.append(now)
+        self.slots[session] = slot
+        if machine & CROSS:
+            self.waiting[session] = None
+        return session
+
+    def close(self, session):
+        self.free.append(self.slots.pop(session))
+        self.waiting.pop(session, None)
+
+    def touch(self, session, now=None):
+        """ Le slot de session, marquée active ; KeyError si elle n'existe pas (ou plus) """
+        slot = self.slots[session]
+        self.slots.move_to_end(session)
+        self.last[slot] = time.monotonic() if now is None else now
+        return slot
+
+    def evict(self, now=None):
+        """ Ferme les sessions inactives depuis plus de idle secondes ; retourne leur nombre """
+        limit = (time.monotonic() if now is None else now) - self.idle
+        count = 0
+        while self.slots:
+            session, slot = next(iter(self.slots.items()))
+            if self.last[slot] > limit:
+                break
+            self.close(session)
+            count += 1
+        self.evicted += count
+        return count
+
+    def state(self, session):
+        """ (plateau X, plateau O, joueur, nombre de coups, machine) """
+        return unpack(self.states[self.slots[session]])
+
+    def grid(self, session):
+        x, o = self.state(session)[:2]
+        return [[CROSS if x & BITS[row][col] else ROUND if o & BITS[row][col] else GameModel.EMPTY
+                    for col in range(3)] for row in range(3)]
+
+    def winner(self, session):
+        return winner(*self.state(session)[:2])
+
+    def over(self, session):
+        return over(*self.state(session)[:2])
+
+    # -- les coups
+
+    def apply(self, session, slot, cell):
+        """ Joue la cellule cell ; met la session en file si la machine doit répondre """
+        state = self.states[slot]
+        player = state >> PLAYER_SHIFT & 3
+        # la pierre sur le plateau du joueur, le trait à l'autre, un coup de plus
+        state = (state | 1 << cell + NB_CELLS * (player - 1)) ^ 3 << PLAYER_SHIFT
+        state += 1 << MOVES_SHIFT
+        self.states[slot] = state
+        finished = over(state & FULL_MASK, state >> NB_CELLS & FULL_MASK)
+        if not finished and state >> MACHINE_SHIFT & (3 - player):
+            self.waiting[session] = None
+        return finished
+
+    def play(self, session, move, now=None):
+        """
+        Le coup (row, col) du joueur humain de session ; retourne True
+        si la partie est finie. ValueError si le coup est interdit
+        """
+        slot = self.touch(session, now)
+        x, o, player, _, machine = unpack(self.states[slot])
+        row, col = move
+        if over(x, o):
+            raise ValueError('la partie est finie')
+        if machine & player:
+            raise ValueError('c\'est à la machine de jouer')
+        if not (0 <= row < 3 and 0 <= col < 3) or (x | o) & BITS[row][col]:
+            raise ValueError(f'coup interdit : {move}')
+        return self.apply(session, slot, 3 * row + col)
+
+    def best_cells(self, positions):
+        """ Les meilleurs coups (bits) de chaque position canonique (x, o, joueur) """
+        model = self.model
+        results = []
+        for x, o, player in positions:
+            entry = TABLEBASE.lookup(index_from_bits(x, o))
+            if entry is not None and entry[2] == player and entry[1]:
+                results.append(entry[1])
+                continue
+            model.boards = [0, x, o]
+            model.player = player
+            model.count()
+            scores = {3 * row + col: model.score_move((row, col)) for row, col in model.empty_cells()}
+            best = max(scores.values())
+            results.append(sum(1 << cell for cell, score in scores.items() if score == best))
+        return results
+
+    def step(self):
+        """
+        Joue en un lot le coup de la machine dans toutes les sessions
+        en attente ; retourne {session: (row, col)}
+        """
+        waiting, self.waiting = self.waiting, {}
+        if not waiting:
+            return {}
+        # les positions du lot, regroupées par forme canonique
+        keys = {}
+        for session in waiting:
+            state = self.states[self.slots[session]]
+            canon, k = symmetry(state & FULL_MASK, state >> NB_CELLS & FULL_MASK)
+            keys[session] = canon << 2 | state >> PLAYER_SHIFT & 3, k
+        best = {}
+        for key, _ in keys.values():
+            if key not in best:
+                best[key] = self.cache.get(key)
+        missing = sorted(key for key, cells in best.items() if cells is None)
+        canonical = [(key >> 2 + NB_CELLS, key >> 2 & FULL_MASK, key & 3) for key in missing]
+        for key, cells in zip(missing, self.best_cells(canonical)):
+            best[key] = CELLS[cells]
+            self.cache.store(key, best[key])
+        self.batches += 1
+        self.searched += len(missing)
+        played = {}
+        for session, (key, k) in keys.items():
+            cell = INVERSES[k][random.choice(best[key])]
+            self.apply(session, self.slots[session], cell)
+            played[session] = divmod(cell, 3)
+        self.machine_moves += len(played)
+        return played
+
+    def stats(self):
+        return {'sessions': len(self), 'waiting': len(self.waiting), 'evicted': self.evicted,
+                'batches': self.batches, 'machine_moves': self.machine_moves,
+                'searched': self.searched, 'cache': len(self.cache),
+                'hit_rate': round(self.cache.hit_rate(), 3)}
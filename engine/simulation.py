@@ -0,0 +1,148 @@
+"""
+Simulateur de parties machine contre machine, sans affichage
+
+Les parties sont jouées directement sur le modèle : GameModel
+(version objet) ou la grille et les fonctions de engine/grid.py
+(version fonctions). Sert à vérifier, après une modification
+de l'IA, que les résultats n'ont pas bougé :
+
+    python -m engine.simulation -n 100000 -x faible -o negamax --seed 1
+    python -m engine.simulation -n 100000 -x hasard -o faible --engine fonctions
+    python -m engine.simulation -n 100 --stats --log ia.jsonl
+
+Avec --stats, la recherche est mesurée (voir engine/stats.py).
+"""
+
+import time
+import random
+
+from . import grid as tictactoe
+from .model import GameModel, CROSS, ROUND
+
+
+# -- LES STRATÉGIES
+# --
+# version objet : strategie(model) -> (row, col)
+# version fonctions : strategie(grid, player) -> (row, col)
+# (les méthodes et fonctions sont cherchées à chaque appel :
+# instrumentées par engine.stats, ce sont les versions qui comptent)
+# negamaxN : negamax limité à N coups de profondeur (version objet)
+# Une nouvelle stratégie s'ajoute ici : engine.tournament la
+# fera jouer contre les autres
+
+DEPTHS = (1, 2, 3, 4)
+
+OO_STRATEGIES = {
+    'hasard': lambda model: model.hasard(),
+    'faible': lambda model: model.faible(),
+    **{f'negamax{depth}': lambda model, depth=depth: model.shallow(depth) for depth in DEPTHS},
+    'negamax': lambda model: model.choice(),
+}
+
+FUNCTIONAL_STRATEGIES = {
+    'hasard': lambda grid, player: random.choice(tictactoe.empty_cells(grid)),
+    'faible': lambda grid, player: tictactoe.faible(grid, player),
+    'negamax': lambda grid, player: tictactoe.choice(grid, player),
+}
+
+
+def play_oo(model, strategies):
+    """ Joue une partie complète sur model ; retourne le gagnant (0 si nul) """
+    model.reset()
+    while not model.play(strategies[model.player](model)):
+        pass
+    return model.winner
+
+def play_functional(strategies):
+    grid = tictactoe.init_grid()
+    counts = tictactoe.init_counts()
+    stack = []
+    player = tictactoe.CROIX
+    gameover = False
+    while not gameover:
+        row, col = strategies[player](grid, player)
+        winner, gameover = tictactoe.play_move(grid, counts, stack, row, col, player)
+        player = 3 - player
+    return winner
+
+
+class Results:
+    """ Bilan d'une série de parties, du point de vue de X """
+
+    def __init__(self, strategies, games, elapsed, wins, stats=None):
+        self.strategies = strategies
+        self.games = games
+        self.elapsed = elapsed
+        self.wins = wins        # wins[0] : nuls, wins[CROSS], wins[ROUND]
+        self.stats = stats      # les mesures de engine.stats, ou None
+
+    @property
+    def draws(self):
+        return self.wins[0]
+
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else float('inf')
+
+    def __str__(self):
+        x, o = self.strategies
+        return (f'X {x} / O {o} : {self.games} parties, '
+                f'{self.wins[CROSS]} victoires X, {self.draws} nuls, '
+                f'{self.wins[ROUND]} victoires O '
+                f'({self.games_per_second():.0f} parties/s)' +
+                (f'\n{self.stats}' if self.stats is not None else ''))
+
+
+def simulate(games, x='negamax', o='negamax', seed=None, engine='objet',
+             stats=False, log=None):
+    """
+    Joue games parties, X avec la stratégie x, O avec o ;
+    seed fixe le hasard pour rejouer exactement la même série.
+    Avec stats, les appels à choice() sont mesurés (et écrits
+    dans le fichier log s'il est donné)
+    """
+    random.seed(seed)
+    wins = [0, 0, 0]
+    probe = None
+    start = time.perf_counter()
+    if engine == 'objet':
+        strategies = (None, OO_STRATEGIES[x], OO_STRATEGIES[o])
+        model = GameModel()
+        if stats:
+            from .stats import instrument
+            probe = instrument(model, log)
+        for _ in range(games):
+            wins[play_oo(model, strategies)] += 1
+    else:
+        for name in (x, o):
+            if name not in FUNCTIONAL_STRATEGIES:
+                raise ValueError(f'stratégie {name} : version objet seulement')
+        strategies = (None, FUNCTIONAL_STRATEGIES[x], FUNCTIONAL_STRATEGIES[o])
+        if stats:
+            from .stats import instrument
+            probe = instrument(tictactoe, log)
+        try:
+            for _ in range(games):
+                wins[play_functional(strategies)] += 1
+        finally:
+            if probe is not None:
+                probe.release()     # le module est partagé : on le remet en état
+    return Results((x, o), games, time.perf_counter() - start, wins, probe)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parties machine contre machine sans affichage')
+    parser.add_argument('-n', '--games', type=int, default=10_000)
+    parser.add_argument('-x', default='negamax', choices=sorted(OO_STRATEGIES))
+    parser.add_argument('-o', default='negamax', choices=sorted(OO_STRATEGIES))
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--engine', default='objet', choices=('objet', 'fonctions'))
+    parser.add_argument('--stats', action='store_true', help='mesure la recherche de l\'IA')
+    parser.add_argument('--log', default=None, help='fichier JSON lines des mesures (avec --stats)')
+    args = parser.parse_args()
+    print(simulate(args.games, args.x, args.o, args.seed, args.engine, args.stats, args.log))
+
+
+if __name__ == '__main__':
+    main()
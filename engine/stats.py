@@ -0,0 +1,237 @@
+"""
+Instrumentation de la recherche de l'IA
+
+    probe = stats.instrument(model)             # version objet
+    probe = stats.instrument(grid, 'ia.jsonl')  # version fonctions
+    ...                                         # des appels à choice()
+    print(probe)                                # bilan
+    probe.release()
+
+Tant que instrument() n'a pas été appelé, rien n'est compté : un
+modèle change alors de classe pour une classe dérivée qui compte
+(InstrumentedGameModel, InstrumentedMNKModel), et pour le module
+engine.grid les fonctions de recherche sont remplacées par des
+enveloppes. release() remet tout en place. Hors mesure, la
+recherche ne paie donc rien.
+
+Pour chaque appel à choice(), probe.records reçoit un dictionnaire :
+nombre de nœuds, de feuilles et de positions terminales (partie
+finie), profondeur atteinte, facteur de branchement moyen, durée,
+nœuds par seconde et accès à la table de transposition. Si un
+fichier log est donné, chaque mesure y est ajoutée sur une ligne
+au format JSON.
+"""
+
+import json
+import time
+import functools
+
+from . import grid
+from .model import GameModel, MNKModel
+
+
+class SearchStats:
+    """ Les mesures de la recherche, coup après coup """
+
+    def __init__(self, engine, log=None):
+        self.engine = engine    # 'objet' ou 'fonctions'
+        self.log = log
+        self.records = []
+        self.target = None      # ce qui a été instrumenté, pour release()
+        self.originals = {}
+        self.start_move()
+
+    def start_move(self):
+        self.nodes = self.leaves = self.terminals = self.roots = 0
+        self.depth = self.max_depth = 0
+
+    def enter(self):
+        """ Entrée dans un nœud ; retourne le nombre de nœuds jusqu'à lui """
+        self.nodes += 1
+        self.depth += 1
+        if self.depth == 1:
+            self.roots += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+        return self.nodes
+
+    def leave(self, leaf, terminal):
+        self.depth -= 1
+        if leaf:
+            self.leaves += 1
+            if terminal:
+                self.terminals += 1
+
+    def finish(self, player, move, elapsed, hits=0, misses=0):
+        """ Fin d'un appel à choice() : la mesure est enregistrée """
+        interior = self.nodes - self.leaves
+        record = {
+            'engine': self.engine,
+            'player': player,
+            'move': list(move),
+            'elapsed': round(elapsed, 6),
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'terminals': self.terminals,
+            'depth': self.max_depth,
+            'branching': round((self.nodes - self.roots) / interior, 3) if interior else 0.0,
+            'nps': round(self.nodes / elapsed) if elapsed else 0,
+            'tt_hits': hits,
+            'tt_misses': misses,
+        }
+        self.records.append(record)
+        if self.log is not None:
+            with open(self.log, 'a') as log:
+                log.write(json.dumps(record) + '\n')
+        return record
+
+    @property
+    def last(self):
+        return self.records[-1] if self.records else None
+
+    def overlay(self):
+        """ Le dernier coup, en une ligne (pour l'interface graphique) """
+        record = self.last
+        if record is None:
+            return ''
+        return (f"{record['nodes']} nœuds en {record['elapsed']:.3f} s "
+                f"({record['nps']} n/s), prof. {record['depth']}, "
+                f"branchement {record['branching']:.1f}")
+
+    def release(self):
+        """ Remet en place les fonctions de recherche d'origine """
+        if isinstance(self.target, Instrumented):
+            self.target.__class__ = BASES[type(self.target)]
+        for name, fct in self.originals.items():
+            setattr(self.target, name, fct)
+        self.originals = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __str__(self):
+        moves = len(self.records)
+        if not moves:
+            return f'{self.engine} : aucun coup mesuré'
+        nodes = sum(record['nodes'] for record in self.records)
+        elapsed = sum(record['elapsed'] for record in self.records)
+        hits = sum(record['tt_hits'] for record in self.records)
+        lookups = hits + sum(record['tt_misses'] for record in self.records)
+        direct = sum(1 for record in self.records if not record['nodes'])
+        return (f'{self.engine} : {moves} coups'
+                f'{f" (dont {direct} sans recherche)" if direct else ""}, {nodes} nœuds '
+                f'({nodes / moves:.0f} par coup, '
+                f'{nodes / elapsed if elapsed else 0:.0f} n/s), '
+                f'{1000 * elapsed / moves:.2f} ms par coup, '
+                f'prof. max {max(record["depth"] for record in self.records)}, '
+                f'{sum(record["terminals"] for record in self.records)} positions terminales, '
+                f'table {100 * hits / lookups if lookups else 0:.0f}% de hits')
+
+
+# -- VERSION OBJET
+# --
+
+class Instrumented:
+    """
+    Les méthodes de recherche d'un modèle, comptées dans self.probe ;
+    se place avant la classe du modèle (voir InstrumentedGameModel)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # modèle créé dans un processus de parallel : ses mesures restent là-bas
+        self.probe = SearchStats('objet')
+
+    def over(self):
+        """ La partie est-elle finie ? (l'adversaire vient d'aligner k marques) """
+        return not self.empty or self.k in self.counts[3 - self.player]
+
+    def node(self, search, *args):
+        probe = self.probe
+        count = probe.enter()
+        try:
+            return search(*args)
+        finally:
+            leaf = count == probe.nodes
+            probe.leave(leaf, leaf and self.over())
+
+    def alphabeta(self, *args):
+        return self.node(super().alphabeta, *args)
+
+    def choice(self):
+        probe = self.probe
+        hits, misses = self.table.hits, self.table.misses
+        probe.start_move()
+        start = time.perf_counter()
+        move = super().choice()
+        probe.finish(self.player, move, time.perf_counter() - start,
+                     self.table.hits - hits, self.table.misses - misses)
+        return move
+
+
+class InstrumentedGameModel(Instrumented, GameModel):
+
+    def negamax(self):
+        return self.node(super().negamax)
+
+class InstrumentedMNKModel(Instrumented, MNKModel):
+    pass    # MNKModel.negamax n'est qu'un appel à alphabeta
+
+
+INSTRUMENTED = {GameModel: InstrumentedGameModel, MNKModel: InstrumentedMNKModel}
+BASES = {cls: base for base, cls in INSTRUMENTED.items()}
+
+
+# -- VERSION FONCTIONS
+# --
+
+def counted(probe, search):
+    """ search(grid, player, ...) comptée dans probe """
+    @functools.wraps(search)
+    def counted_search(board, player, *args, **kwargs):
+        count = probe.enter()
+        try:
+            return search(board, player, *args, **kwargs)
+        finally:
+            leaf = count == probe.nodes
+            probe.leave(leaf, leaf and (grid.check_winner(board, 3 - player)
+                                        or grid.full(board)))
+    return counted_search
+
+def counted_choice(probe, choice):
+    @functools.wraps(choice)
+    def counted_search(board, player, *args, **kwargs):
+        table = kwargs.get('table', args[0] if args else grid.TABLE)
+        hits, misses = table.hits, table.misses
+        probe.start_move()
+        start = time.perf_counter()
+        move = choice(board, player, *args, **kwargs)
+        probe.finish(player, move, time.perf_counter() - start,
+                     table.hits - hits, table.misses - misses)
+        return move
+    return counted_search
+
+
+def instrument(target, log=None):
+    """
+    Active les mesures sur target, un modèle ou le module engine.grid ;
+    retourne l'objet SearchStats qui les reçoit
+    """
+    if type(target) in INSTRUMENTED or isinstance(target, Instrumented):
+        if isinstance(target, Instrumented):
+            target.probe.release()
+        probe = SearchStats('objet', log)
+        target.__class__ = INSTRUMENTED[type(target)]
+        target.probe = probe
+    elif target is grid:
+        probe = SearchStats('fonctions', log)
+        # les fonctions d'origine, même si grid est déjà instrumenté
+        probe.originals = {name: getattr(getattr(grid, name), '__wrapped__', getattr(grid, name))
+                                for name in ('negamax', 'alphabeta', 'choice')}
+        grid.negamax = counted(probe, probe.originals['negamax'])
+        grid.alphabeta = counted(probe, probe.originals['alphabeta'])
+        grid.choice = counted_choice(probe, probe.originals['choice'])
+    else:
+        raise TypeError(f'rien à instrumenter dans {target!r}')
+    probe.target = target
+    return probe
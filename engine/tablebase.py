@@ -0,0 +1,241 @@
+"""
+Table de finales du TicTacToe : le jeu parfait précalculé
+
+Chaque position est repérée par son codage en base 3 : la cellule
+(row, col), d'indice i = 3 * row + col, vaut 0, 1 ou 2 et pèse 3 ** i.
+Il y a 3 ** 9 = 19683 codages possibles ; le fichier contient un
+enregistrement de 2 octets (petit-boutiste) pour chacun, après
+l'en-tête MAGIC :
+
+    bits 0 à 8   : les meilleurs coups (bit 3 * row + col)
+    bits 9 et 10 : score + 1 pour le joueur qui a le trait
+    bits 11 et 12: le joueur qui a le trait
+    bit 15       : position atteignable (0 si l'enregistrement est vide)
+
+Le fichier se construit une fois pour toutes :
+    python -m engine.tablebase            # construction puis vérification
+    python -m engine.tablebase --verify   # vérification seule
+
+Il est ouvert (mmap) au premier appel de lookup et non à l'import :
+l'interface graphique ne paie rien au démarrage. S'il n'existe pas,
+lookup retourne None et les moteurs reviennent à la recherche.
+"""
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+
+MAGIC = b'TTT1'
+PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tablebase.bin')
+
+NB_CELLS = 9
+SIZE = 3 ** NB_CELLS
+RECORD = struct.Struct('<H')
+
+REACHABLE = 1 << 15
+MOVES_MASK = (1 << NB_CELLS) - 1
+
+LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6))
+
+def build_base3():
+    """
+    BASE3[board] : poids en base 3 des cellules d'un plateau de 9 bits,
+    déduit de celui de board privé de son bit de poids faible
+    """
+    base3 = [0] * (1 << NB_CELLS)
+    for board in range(1, 1 << NB_CELLS):
+        low = board & -board
+        base3[board] = base3[board ^ low] + 3 ** (low.bit_length() - 1)
+    return tuple(base3)
+
+BASE3 = build_base3()
+
+
+def index_from_bits(xbits, obits):
+    """ Codage base 3 d'une position donnée par deux plateaux de 9 bits """
+    return BASE3[xbits] + 2 * BASE3[obits]
+
+def index_from_grid(grid):
+    """ Codage base 3 d'une grille liste de listes """
+    index = 0
+    for row in range(2, -1, -1):
+        for col in range(2, -1, -1):
+            index = 3 * index + grid[row][col]
+    return index
+
+
+def pack(score, moves, player):
+    return REACHABLE | player << 11 | (score + 1) << 9 | moves
+
+def unpack(record):
+    """ (score, meilleurs coups, joueur) ou None pour un enregistrement vide """
+    if not record & REACHABLE:
+        return None
+    return (record >> 9 & 3) - 1, record & MOVES_MASK, record >> 11 & 3
+
+
+class Tablebase:
+    """ Lecture paresseuse du fichier de la table de finales """
+
+    def __init__(self, path=PATH):
+        self.path = path
+        self.data = None
+        self.missing = False
+
+    def load(self):
+        """ Ouvre le fichier ; retourne False s'il est absent """
+        if self.data is None and not self.missing:
+            try:
+                with open(self.path, 'rb') as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self.missing = True
+                return False
+            if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + SIZE * RECORD.size:
+                data.close()
+                raise ValueError(f'{self.path} : fichier de table de finales invalide')
+            self.data = data
+        return self.data is not None
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.data = None
+        self.missing = False
+
+    def lookup(self, index):
+        """ (score, meilleurs coups, joueur) pour la position index, ou None """
+        if not self.load():
+            return None
+        record, = RECORD.unpack_from(self.data, len(MAGIC) + index * RECORD.size)
+        return unpack(record)
+
+    def best_moves(self, index, player):
+        """
+        Les meilleurs coups (row, col) de player dans la position index,
+        dans l'ordre des cellules ; None si la table ne sait pas répondre
+        """
+        entry = self.lookup(index)
+        if entry is None:
+            return None
+        score, moves, to_play = entry
+        if to_play != player or not moves:
+            return None
+        return [divmod(i, 3) for i in range(NB_CELLS) if moves >> i & 1]
+
+TABLEBASE = Tablebase()
+
+
+# -- CONSTRUCTION
+# --
+
+def won(cells, player):
+    return any(cells[a] == cells[b] == cells[c] == player for a, b, c in LINES)
+
+def encode(cells):
+    index = 0
+    for value in reversed(cells):
+        index = 3 * index + value
+    return index
+
+
+def solve(cells, player, solved):
+    """
+    Score de la position pour player (qui a le trait) ; chaque
+    position atteignable est résolue une fois et rangée dans
+    solved : index -> (score, meilleurs coups, joueur)
+    """
+    index = encode(cells)
+    if index in solved:
+        return solved[index][0]
+    if won(cells, 3 - player):
+        score, moves = -1, 0
+    elif 0 not in cells:
+        score, moves = 0, 0
+    else:
+        scores = {}
+        for i in range(NB_CELLS):
+            if cells[i] == 0:
+                cells[i] = player
+                scores[i] = -solve(cells, 3 - player, solved)
+                cells[i] = 0
+        score = max(scores.values())
+        moves = sum(1 << i for i in scores if scores[i] == score)
+    solved[index] = score, moves, player
+    return score
+
+
+def build(path=PATH):
+    """ Résout toutes les positions atteignables et écrit le fichier """
+    solved = {}
+    solve([0] * NB_CELLS, 1, solved)
+    records = array('H', bytes(SIZE * RECORD.size))
+    for index, (score, moves, player) in solved.items():
+        records[index] = pack(score, moves, player)
+    if sys.byteorder == 'big':
+        records.byteswap()
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(records.tobytes())
+    return solved
+
+
+def verify(path=PATH):
+    """
+    Compare le fichier au negamax de engine/grid.py sur toutes les
+    positions atteignables ; retourne la liste des écarts
+    """
+    from . import grid as tictactoe
+
+    solved = {}
+    solve([0] * NB_CELLS, 1, solved)
+    base = Tablebase(path)
+    if not base.load():
+        raise FileNotFoundError(path)
+    errors = []
+    for index, (score, moves, player) in solved.items():
+        cells = [index // 3 ** i % 3 for i in range(NB_CELLS)]
+        grid = [cells[3 * row:3 * row + 3] for row in range(3)]
+        if base.lookup(index) != (score, moves, player):
+            errors.append(index)
+        elif moves:
+            expected = tictactoe.negamax(grid, player)
+            best = 0
+            for i in range(NB_CELLS):
+                if cells[i] == 0:
+                    row, col = divmod(i, 3)
+                    grid[row][col] = player
+                    if -tictactoe.negamax(grid, 3 - player) == expected:
+                        best |= 1 << i
+                    grid[row][col] = 0
+            if (expected, best) != (score, moves):
+                errors.append(index)
+    base.close()
+    return errors
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Table de finales du TicTacToe')
+    parser.add_argument('path', nargs='?', default=PATH)
+    parser.add_argument('--verify', action='store_true',
+                        help='vérifier le fichier sans le reconstruire')
+    args = parser.parse_args()
+    if not args.verify:
+        solved = build(args.path)
+        print(f'{args.path} : {len(solved)} positions atteignables, '
+              f'{os.path.getsize(args.path)} octets')
+    errors = verify(args.path)
+    if errors:
+        print(f'{len(errors)} positions diffèrent du negamax, par ex. {errors[:5]}')
+        sys.exit(1)
+    print('conforme au negamax')
+
+
+if __name__ == '__main__':
+    main()
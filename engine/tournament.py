@@ -0,0 +1,191 @@
+"""
+Tournoi entre les stratégies de la version objet
+
+Chaque stratégie de simulation.OO_STRATEGIES (ou celles choisies)
+rencontre chacune des autres, la moitié des parties avec les croix,
+l'autre avec les ronds. Les parties sont découpées en tâches de CHUNK
+parties, réparties sur un pool de processus (voir engine/parallel.py) ;
+chaque tâche a sa graine, tirée de seed : avec la même graine le
+tournoi donne les mêmes résultats, quel que soit le nombre de
+processus.
+
+Le bilan donne, pour chaque rencontre, les victoires, nuls et
+défaites, et un classement Elo : les classements qui expliquent
+le mieux les scores observés (une partie nulle vaut un demi-point).
+
+    python -m engine.tournament -n 1000000
+    python -m engine.tournament -n 100000 -s hasard faible negamax2 negamax --seed 1 -w 4
+
+Les processus retrouvent les stratégies par leur nom : une nouvelle
+stratégie doit être ajoutée dans simulation.py, pas au lancement.
+"""
+
+import math
+import time
+import random
+import itertools
+
+from . import parallel
+from .model import GameModel, CROSS, ROUND
+from .simulation import OO_STRATEGIES, play_oo
+
+CHUNK = 5000            # parties par tâche
+ELO_MEAN = 1500         # la moyenne des classements Elo
+ELO_PRIOR = 1           # parties nulles fictives entre chaque paire :
+                        # un joueur qui ne perd jamais reste classé
+
+_models = {}            # le modèle de chaque processus, gardé d'une tâche à l'autre
+
+
+def play_games(x, o, games, seed):
+    """ games parties, X joue x et O joue o ; retourne [nuls, victoires X, victoires O] """
+    if 'model' not in _models:
+        _models['model'] = GameModel()
+    model = _models['model']
+    random.seed(seed)
+    strategies = (None, OO_STRATEGIES[x], OO_STRATEGIES[o])
+    wins = [0, 0, 0]
+    for _ in range(games):
+        wins[play_oo(model, strategies)] += 1
+    return wins
+
+
+def schedule(strategies, games, seed=None):
+    """
+    Les tâches (x, o, parties, graine) : games parties par paire de
+    stratégies, chacune jouant la moitié d'entre elles avec les croix
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in itertools.combinations(strategies, 2):
+        for x, o, n in ((a, b, games - games // 2), (b, a, games // 2)):
+            for start in range(0, n, CHUNK):
+                tasks.append((x, o, min(CHUNK, n - start), rng.getrandbits(32)))
+    return tasks
+
+
+class Results:
+    """ Le bilan d'un tournoi """
+
+    def __init__(self, strategies, elapsed, workers):
+        self.strategies = strategies
+        self.elapsed = elapsed
+        self.workers = workers
+        # scores[a, b] : [victoires, nuls, défaites] de a contre b
+        self.scores = {(a, b): [0, 0, 0] for a in strategies for b in strategies if a != b}
+        self.colors = [0, 0, 0]     # nuls, victoires X, victoires O
+
+    def add(self, x, o, wins):
+        draws, x_wins, o_wins = wins
+        for player, opponent, won, lost in ((x, o, x_wins, o_wins), (o, x, o_wins, x_wins)):
+            score = self.scores[player, opponent]
+            score[0] += won
+            score[1] += draws
+            score[2] += lost
+        for i in range(3):
+            self.colors[i] += wins[i]
+
+    @property
+    def games(self):
+        return sum(self.colors)
+
+    def points(self, player, opponent):
+        """ (points marqués, parties jouées) par player contre opponent """
+        won, drawn, lost = self.scores[player, opponent]
+        return won + drawn / 2, won + drawn + lost
+
+    def elo(self, iterations=200):
+        """
+        Classements Elo qui rendent les scores attendus égaux aux
+        scores observés (maximum de vraisemblance, méthode de Newton
+        joueur par joueur), ramenés à une moyenne de ELO_MEAN
+        """
+        scale = 400 / math.log(10)
+        ratings = dict.fromkeys(self.strategies, 0.0)
+        for _ in range(iterations):
+            for player in self.strategies:
+                gap = slope = 0.0
+                for opponent in self.strategies:
+                    if opponent == player:
+                        continue
+                    points, games = self.points(player, opponent)
+                    points, games = points + ELO_PRIOR / 2, games + ELO_PRIOR
+                    expected = 1 / (1 + 10 ** ((ratings[opponent] - ratings[player]) / 400))
+                    gap += points - games * expected
+                    slope += games * expected * (1 - expected)
+                ratings[player] += scale * gap / slope
+        mean = sum(ratings.values()) / len(ratings)
+        return {player: rating - mean + ELO_MEAN for player, rating in ratings.items()}
+
+    def __str__(self):
+        width = max(10, max(len(name) for name in self.strategies) + 2)
+        lines = [f'{len(self.strategies)} stratégies, {self.games} parties en '
+                 f'{self.elapsed:.1f} s ({self.games / self.elapsed:.0f} parties/s, '
+                 f'{self.workers} processus)',
+                 f'{self.colors[CROSS]} victoires X, {self.colors[0]} nuls, '
+                 f'{self.colors[ROUND]} victoires O',
+                 '',
+                 'victoires / nuls / défaites (%) de la ligne contre la colonne',
+                 ' ' * width + ''.join(f'{name:>{width + 4}}' for name in self.strategies)]
+        for player in self.strategies:
+            line = f'{player:{width}}'
+            for opponent in self.strategies:
+                if opponent == player:
+                    line += f'{"-":>{width + 4}}'
+                    continue
+                score = self.scores[player, opponent]
+                total = sum(score) or 1
+                line += ' ' * (width - 8) + '{:>4.0f}/{:>3.0f}/{:>3.0f}'.format(
+                    *(100 * n / total for n in score))
+            lines.append(line)
+        lines += ['', f'classement Elo (moyenne {ELO_MEAN})']
+        ratings = self.elo()
+        for rank, player in enumerate(sorted(ratings, key=ratings.get, reverse=True), 1):
+            points = sum(self.points(player, opponent)[0] for opponent in self.strategies
+                         if opponent != player)
+            games = sum(self.points(player, opponent)[1] for opponent in self.strategies
+                        if opponent != player)
+            lines.append(f'{rank:2}. {player:{width}}{ratings[player]:6.0f}'
+                         f'   score {100 * points / games if games else 0:5.1f}%')
+        return '\n'.join(lines)
+
+
+def tournament(games, strategies=None, seed=None, workers=None):
+    """
+    Le tournoi de games parties en tout, réparties également entre
+    les paires de strategies (toutes celles de OO_STRATEGIES par
+    défaut), joué par workers processus (autant que de processeurs
+    par défaut)
+    """
+    strategies = list(strategies or OO_STRATEGIES)
+    unknown = [name for name in strategies if name not in OO_STRATEGIES]
+    if unknown or len(strategies) < 2:
+        raise ValueError(f'il faut au moins 2 stratégies parmi {", ".join(OO_STRATEGIES)}')
+    workers = workers or parallel.cpu_count()
+    pairs = len(strategies) * (len(strategies) - 1) // 2
+    tasks = schedule(strategies, games // pairs, seed)
+    start = time.perf_counter()
+    if workers > 1:
+        wins = parallel.run(play_games, tasks, workers)
+    else:
+        wins = [play_games(*task) for task in tasks]
+    results = Results(strategies, time.perf_counter() - start, workers)
+    for (x, o, _, _), task_wins in zip(tasks, wins):
+        results.add(x, o, task_wins)
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tournoi entre stratégies')
+    parser.add_argument('-n', '--games', type=int, default=100_000, help='nombre total de parties')
+    parser.add_argument('-s', '--strategies', nargs='+', choices=list(OO_STRATEGIES), default=None)
+    parser.add_argument('-w', '--workers', type=int, default=None, help='processus (défaut : un par processeur)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    print(tournament(args.games, args.strategies, args.seed, args.workers))
+
+
+if __name__ == '__main__':
+    main()
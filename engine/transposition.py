@@ -0,0 +1,149 @@
+"""
+Table de transposition pour les recherches negamax
+
+Une position est identifiée par sa forme canonique : la plus petite
+de ses 8 images par les rotations et symétries de la grille 3x3.
+Deux positions qui se déduisent l'une de l'autre par une de ces
+transformations ont la même valeur et partagent donc une entrée.
+
+Les plateaux sont codés comme dans GameModel : un entier de 9 bits
+par joueur, la cellule (row, col) correspondant au bit 3 * row + col.
+"""
+
+from collections import OrderedDict
+
+NB_CELLS = 9
+FULL_MASK = (1 << NB_CELLS) - 1
+
+
+def rotation(row, col):
+    """ Rotation d'un quart de tour """
+    return col, 2 - row
+
+def reflection(row, col):
+    """ Symétrie d'axe vertical """
+    return row, 2 - col
+
+
+def build_symmetries():
+    """
+    Les 8 isométries du carré, sous forme de permutations :
+    perm[i] est l'indice de l'image de la cellule i
+    """
+    perms = []
+    for reflect in (False, True):
+        for quarter in range(4):
+            perm = []
+            for i in range(NB_CELLS):
+                row, col = divmod(i, 3)
+                if reflect:
+                    row, col = reflection(row, col)
+                for _ in range(quarter):
+                    row, col = rotation(row, col)
+                perm.append(3 * row + col)
+            perms.append(tuple(perm))
+    return tuple(perms)
+
+SYMMETRIES = build_symmetries()
+
+def permute_all(perm):
+    """
+    Les images des 512 plateaux par la permutation perm ; celle de
+    board se déduit de celle de board privé de son bit de poids faible
+    """
+    images = [0] * (FULL_MASK + 1)
+    for board in range(1, FULL_MASK + 1):
+        low = board & -board
+        images[board] = images[board ^ low] | 1 << perm[low.bit_length() - 1]
+    return tuple(images)
+
+# TRANSFORMS[k][board] : image du plateau board par la k-ième isométrie
+TRANSFORMS = tuple(permute_all(perm) for perm in SYMMETRIES)
+
+
+def canonical(xbits, obits):
+    """
+    Forme canonique des deux plateaux, codée sur 18 bits :
+    la plus petite image parmi les 8 isométries
+    """
+    return min(t[xbits] << NB_CELLS | t[obits] for t in TRANSFORMS)
+
+def position_key(xbits, obits, player):
+    """ Clé de la position pour la table : forme canonique et trait """
+    return canonical(xbits, obits) << 2 | player
+
+def symmetry(xbits, obits):
+    """
+    (forme canonique, indice dans SYMMETRIES d'une isométrie qui y
+    envoie la position) : la cellule i y devient perm[i]
+    """
+    images = [t[xbits] << NB_CELLS | t[obits] for t in TRANSFORMS]
+    image = min(images)
+    return image, images.index(image)
+
+
+# nature du score mémorisé : exact, minorant (coupure beta)
+# ou majorant (aucun coup n'a dépassé alpha)
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+def bound(score, alpha, beta):
+    """ Nature d'un score obtenu avec la fenêtre (alpha, beta) """
+    if score <= alpha:
+        return UPPER
+    if score >= beta:
+        return LOWER
+    return EXACT
+
+
+class TranspositionTable:
+    """
+    Cache borné clé -> (score, nature du score)
+
+    Lorsque la table est pleine, on évince l'entrée utilisée
+    le moins récemment (LRU). Les compteurs hits / misses
+    mesurent l'efficacité du cache.
+    """
+
+    SIZE = 100_000
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """ Le score mémorisé pour key, None s'il est absent """
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return score
+
+    def store(self, key, score):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return (f'TranspositionTable({len(self)}/{self.size} entrées, '
+                f'{self.hits} hits, {self.misses} misses, '
+                f'{self.evictions} évictions)')
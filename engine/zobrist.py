@@ -0,0 +1,108 @@
+"""
+Clés de Zobrist des positions, tenues à jour coup après coup
+
+À chaque (joueur, cellule) est associé un code aléatoire de 64 bits,
+et un autre au trait de ROUND : la clé d'une position est le XOR des
+codes de ses marques (et du trait). Jouer ou annuler un coup ne coûte
+donc qu'un XOR, quelle que soit la taille de la grille, là où
+position_key (transposition.py) relit les plateaux entiers.
+
+Pour que les positions symétriques partagent une clé, le modèle tient
+aussi la clé de chaque image de la position par les isométries de la
+grille (8 pour un carré, 4 sinon). Les clés des images sont rangées
+dans un seul entier, 64 bits chacune : le code d'un coup contient déjà
+celui de la cellule image dans chaque tranche, et un seul XOR les met
+toutes à jour. La clé canonique est la plus petite des tranches.
+
+    table = zobrist_table(width, height)
+    keys = table.keys(boards, player)           # une fois
+    keys ^= table.moves[player][i]              # à chaque coup, et pour l'annuler
+    table.canonical(keys)                       # clé pour les tables
+"""
+
+import sys
+import random
+
+KEY_BITS = 64
+KEY_MASK = (1 << KEY_BITS) - 1
+SEED = 0x70B1
+
+# les codes d'une taille de grille ne dépendent que de SEED : deux
+# processus (voir parallel.py) calculent les mêmes clés
+_tables = {}
+
+
+def symmetries(width, height):
+    """
+    Les isométries de la grille, sous forme de permutations
+    (perm[i] : l'indice de l'image de la cellule i), l'identité d'abord
+    """
+    def image(row, col, reflect, quarter):
+        if reflect:
+            col = width - 1 - col
+        if quarter == 2:
+            return (height - 1 - row) * width + width - 1 - col
+        for _ in range(quarter):
+            row, col = col, width - 1 - row     # quart de tour (grille carrée)
+        return row * width + col
+
+    if width == height:
+        transforms = [(reflect, quarter) for reflect in (False, True) for quarter in range(4)]
+    else:
+        # rectangle : identité, symétrie d'axe vertical, demi-tour, symétrie d'axe horizontal
+        transforms = [(False, 0), (True, 0), (False, 2), (True, 2)]
+    return tuple(tuple(image(*divmod(i, width), reflect, quarter)
+                       for i in range(width * height))
+                 for reflect, quarter in transforms)
+
+
+class ZobristTable:
+    """
+    Les codes d'une grille width x height : moves[player][i] change
+    le joueur de la cellule i et le trait, dans toutes les images
+    """
+
+    def __init__(self, width, height, seed=SEED):
+        rng = random.Random(f'{seed}:{width}x{height}')
+        self.nb_cells = width * height
+        self.perms = symmetries(width, height)
+        self.shifts = tuple(KEY_BITS * k for k in range(len(self.perms)))
+        self.size = KEY_BITS // 8 * len(self.perms)    # octets de l'ensemble des clés
+        codes = [None] + [[rng.getrandbits(KEY_BITS) for _ in range(self.nb_cells)]
+                              for player in (1, 2)]
+        self.side = self.spread(rng.getrandbits(KEY_BITS))
+        self.moves = [None] + [tuple(self.side ^ sum(codes[player][perm[i]] << shift
+                                                     for perm, shift in zip(self.perms, self.shifts))
+                                     for i in range(self.nb_cells))
+                                   for player in (1, 2)]
+
+    def spread(self, code):
+        """ code, recopié dans la tranche de chaque image """
+        return sum(code << shift for shift in self.shifts)
+
+    def keys(self, boards, player):
+        """ Les clés de la position et de ses images, calculées de zéro """
+        keys = self.side if player == 2 else 0
+        for owner in (1, 2):
+            board = boards[owner]
+            while board:
+                low = board & -board
+                # chaque moves[] change aussi le trait : on le rétablit
+                keys ^= self.moves[owner][low.bit_length() - 1] ^ self.side
+                board ^= low
+        return keys
+
+    def canonical(self, keys):
+        """
+        La clé commune à la position et à ses images : la plus petite
+        tranche, lue d'un bloc comme un tableau d'entiers de 64 bits
+        """
+        return min(memoryview(keys.to_bytes(self.size, sys.byteorder)).cast('Q'))
+
+
+def zobrist_table(width, height):
+    """ La table de la grille width x height, créée au premier appel """
+    table = _tables.get((width, height))
+    if table is None:
+        table = _tables[width, height] = ZobristTable(width, height)
+    return table
@@ -0,0 +1,90 @@
+"""
+Recherche en tâche de fond : une recherche annulée ne gêne pas la suivante
+"""
+
+import time
+
+import pytest
+
+from engine import model as model_module
+from engine.background import BackgroundSearch
+from engine.model import GameModel, MNKModel, SearchTimeout
+from engine.tablebase import TABLEBASE
+
+
+@pytest.fixture
+def no_tablebase(monkeypatch):
+    # sans table de finales, choice cherche vraiment
+    monkeypatch.setattr(TABLEBASE, 'missing', True)
+    monkeypatch.setattr(TABLEBASE, 'data', None)
+
+
+def test_stop_interrupts_search(no_tablebase):
+    model = GameModel()
+    model.stop()
+    with pytest.raises(SearchTimeout):
+        model.alphabeta()
+    with pytest.raises(SearchTimeout):
+        model.negamax()
+
+
+def test_cancelled_search_then_new_search(no_tablebase):
+    model = GameModel()
+    for _ in range(50):
+        model.table.clear()
+        # les copies partagent la table de transposition
+        first = model.clone()
+        search = BackgroundSearch(first.choice, stop=first.stop)
+        search.cancel()
+        assert search.done()
+        second = model.clone()
+        search = BackgroundSearch(second.choice, stop=second.stop)
+        search.thread.join()
+        assert search.result() in model.empty_cells()
+    assert len(model.table) > 0
+
+
+def test_stop_then_reset_then_choice(no_tablebase):
+    """ Un stop() ne vaut que pour la recherche en cours """
+    model = GameModel()
+    model.stop()
+    model.reset()
+    assert model.choice() in model.empty_cells()
+    model = MNKModel(5, 5, 4, time_limit=0.2)
+    model.stop()
+    model.reset()
+    model.choice()
+    assert model.completed_depth > 0
+
+
+class NoSolution:
+    """ Un fichier de solution absent, long à chercher : stop() arrive pendant """
+
+    def __init__(self, model):
+        self.model = model
+
+    def best_moves(self, model):
+        self.model.stop()
+        return []
+
+
+def test_stop_before_deadline(monkeypatch):
+    model = MNKModel(5, 5, 4, time_limit=5)
+    model.play((2, 2))
+    monkeypatch.setattr(model_module, 'solution', lambda *config: NoSolution(model))
+    start = time.monotonic()
+    assert model.choice() in model.empty_cells()
+    assert time.monotonic() - start < 1
+    assert model.completed_depth == 0
+
+
+def test_cancel_right_after_start():
+    """ cancel() juste après le lancement : le thread n'a pas commencé sa recherche """
+    for _ in range(20):
+        model = MNKModel(7, 7, 4, depth=20, time_limit=5)
+        model.play((3, 3))
+        start = time.monotonic()
+        search = BackgroundSearch(model.choice, stop=model.stop)
+        search.cancel()
+        assert search.done()
+        assert time.monotonic() - start < 1
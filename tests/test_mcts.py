@@ -0,0 +1,38 @@
+"""
+MCTSModel : l'arbre gardé d'un coup à l'autre ne grossit pas sans fin
+"""
+
+import random
+
+from engine.mcts import MCTSModel, UNEXPANDED
+
+ITERATIONS = 300
+
+
+def reachable(tree):
+    """ Le nombre de nœuds atteints depuis la racine """
+    count, pending = 0, [tree.root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        if tree.first[node] != UNEXPANDED:
+            pending.extend(range(tree.first[node], tree.first[node] + tree.count[node]))
+    return count
+
+
+def test_reused_tree_stays_bounded():
+    random.seed(18)
+    model = MCTSModel(9, 9, 5, iterations=ITERATIONS)
+    plies = reused = 0
+    while plies < 40:
+        if model.end_game():
+            model.reset()
+        model.play(model.choice())
+        plies += 1
+        reused += model.reused > 0
+        tree = model.tree
+        # rien que le sous-arbre de la racine : les branches abandonnées sont libérées
+        assert reachable(tree) == len(tree)
+        # chaque itération développe au plus un nœud
+        assert len(tree) <= 2 * ITERATIONS * model.nb_cells
+    assert reused > 10
@@ -0,0 +1,21 @@
+"""
+Enregistrement des parties : une grille hors format est refusée
+avant de jouer, sans créer le fichier
+"""
+
+import pytest
+
+from engine.records import fits
+from tictactoe_oo import GameController
+
+
+def test_fits():
+    assert fits(3, 3, 3) and fits(15, 15, 5) and fits(16, 15, 16)
+    assert not fits(19, 19, 5) and not fits(17, 3, 3) and not fits(16, 16, 5)
+
+
+def test_record_refuses_large_board(tmp_path):
+    path = tmp_path / 'parties.ttr'
+    with pytest.raises(ValueError):
+        GameController(19, 19, 5, record=str(path))
+    assert not path.exists()
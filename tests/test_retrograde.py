@@ -0,0 +1,31 @@
+"""
+Résolution rétrograde : la taille des tranches est vérifiée par build,
+qui ne change pas le fichier lu par les modèles
+"""
+
+import pytest
+
+from engine.retrograde import build, solution, default_path, DRAW
+
+
+@pytest.mark.parametrize('chunk', [0, 6, 101])
+def test_build_refuses_unaligned_chunk(tmp_path, chunk):
+    path = tmp_path / '3x3.bin'
+    with pytest.raises(ValueError):
+        build(3, 3, 3, str(path), workers=1, chunk=chunk)
+    assert not path.exists()
+
+
+def test_build_small_chunks(tmp_path):
+    """ Découpé en tranches de 8 positions, le fichier est le même """
+    small, whole = tmp_path / 'small.bin', tmp_path / 'whole.bin'
+    assert build(3, 3, 3, str(small), workers=1, chunk=8)['root'] == DRAW
+    build(3, 3, 3, str(whole), workers=1)
+    assert small.read_bytes() == whole.read_bytes()
+
+
+def test_build_leaves_default_solution(tmp_path):
+    """ Le fichier de build n'est pas celui que liront les modèles """
+    path = tmp_path / '3x3.bin'
+    build(3, 3, 3, str(path), workers=1)
+    assert solution(3, 3, 3).path == default_path(3, 3, 3)
@@ -0,0 +1,25 @@
+"""
+Serveur de coups : les requêtes regroupées dans un même lot
+"""
+
+import asyncio
+
+from engine.model import CROSS
+from engine.server import MoveServer
+
+
+def test_cancelled_request_does_not_block_batch():
+    async def run():
+        server = MoveServer()
+        # la même position, demandée deux fois : un seul futur partagé
+        first = asyncio.create_task(server.scores(0, 0, CROSS))
+        second = asyncio.create_task(server.scores(0, 0, CROSS))
+        await asyncio.sleep(0)
+        assert len(server.pending) == 1
+        first.cancel()      # le client s'est déconnecté
+        scores = await asyncio.wait_for(second, 10)
+        assert first.cancelled()
+        return scores
+
+    scores = asyncio.run(run())
+    assert len(scores) == 9 and max(scores.values()) == 0
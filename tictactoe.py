@@ -4,171 +4,39 @@
 Projet TicTacToe version non objet
 -- niveau lycéen --
 
+Lancement : ./tictactoe.py [fichier.ttr]
+Avec un fichier, les parties y sont enregistrées (voir engine/records.py)
+
 Auteur : Sébastien Hoarau
 Date   : 2018.12.19
 """
 
-import turtle
-import math
-import time
-import random
+# les règles et l'IA (voir engine/grid.py)
+from engine.grid import CROIX, ROND, init_grid, init_counts, play_move, pop_move,\
+                         valid_move, choice
+from engine.background import BackgroundSearch
+from engine.records import RecordWriter, Record
+from engine.render import BoardGeometry
 
 # ---------------------------------
 # LES CONSTANTES
 # ---------------------------------
 
-EMPTY = 0
-CROIX = 1
-ROND = 2
-
 TITLE = 'TicTacToe'
 TITLE_FONT = ('helvetica', 36, 'normal')
 GAME_FONT = ('helvetica', 28, 'normal')
 TITLE_POSITION = 0, 250
 MSG_POSITION = 0, -250
-GAME_SIZE = 120     # la dimension d'une croix ou d'un rond
-                    # cette dimension conditionne l'ensemble
-                    # de l'interface
-MARGIN = 15
-THICKNESS = 6           # taille du trait des éléments graphiques
-GRID_SIZE = 3 * GAME_SIZE + 2 * THICKNESS
-
-CROSS_COLOR = 'firebrick'
-CIRCLE_COLOR = 'darkcyan'
-MARK_THICKNESS = THICKNESS * 2
+# dimensions des cases, des traits et forme des marques : celles
+# de la vue objet (voir engine/render.py)
+GEOMETRY = BoardGeometry()
 
 HUMAIN = 0
 MACHINE = 1
 
-TOKEN = ['', 'X', 'O']
-
-# ---------------------------------
-# LE MODELE
-# ---------------------------------
-
-# le jeu se compose d'une grille 3x3
-# contenant 3 entiers :
-# 0 = cellule vide
-# 1 = cellule jouée par le joueur 1
-# 2 = cellule jouée par le joueur 2
-
-def init_grid():
-    return [[EMPTY] * 3 for _ in range(3)]
-
-def play_move(grid, row, col, player):
-    grid[row][col] = player
-    winner = check_winner(grid, player)
-    end = check_end(grid, winner)
-    return winner, end
-
-def valid_move(grid, row, col):
-    return row is not None and grid[row][col] == EMPTY
-
-
-def one_line(grid, player):
-    for row in range(3):
-        if grid[row] == [player] * 3:
-            return player
-    return 0
-
-def one_diag(grid, player):
-    if [grid[row][row] for row in range(3)] == [player] * 3:
-        return player
-    if [grid[row][2 - row] for row in range(3)] == [player] * 3:
-        return player
-    return 0
-
-def one_col(grid, player):
-    for col in range(3):
-        if [grid[row][col] for row in range(3)] == [player] * 3:
-            return player
-    return 0
-
-
-def check_winner(grid, player):
-    """ 
-    Si grid correspond à une configuration gagnante
-    pour player retourne player
-    Sinon retourne 0
-    """
-    return one_line(grid, player) or\
-            one_col(grid, player) or\
-            one_diag(grid, player)
-
-
-def full(grid):
-    return all(grid[r][c] != EMPTY for r in range(3) for c in range(3)) 
-
-def check_end(grid, winner):
-    return winner or full(grid)
-
-
-# -- IA
-# --
-
-def empty_cells(grid):
-    return [(r,c) for r in range(3) for c in range(3)
-                if grid[r][c] == EMPTY]
-
-def faible(grid, player):
-    """
-    Stratégie minimaliste : si un coup gagnant on 
-    le joue, sinon, si un coup perdant on joue
-    à cet endroit pour bloquer, sinon au hasard
-    """
-    copie = [grid[row].copy() for row in range(3)]
-    for r, c in empty_cells(grid):
-        copie[r][c] = player
-        if check_winner(copie, player) == player:
-            return r, c
-        copie[r][c] = EMPTY
-    adversaire = 3 - player
-    for r, c in empty_cells(grid):
-        copie[r][c] = adversaire
-        if check_winner(copie, adversaire) == adversaire:
-            return r, c
-        copie[r][c] = EMPTY
-    return random.choice(empty_cells(grid))
-
-
-def negamax(grid, player):
-    """
-    Calcule le meilleur score pour le joueur courant
-    Au TicTacToe, on va pouvoir explorer toutes les
-    configurations et retourner le vrai score des configurations
-    finales : 1 si le joueur gagne, -1 s'il perd et 0 pour un nul
-    """
-    winner = check_winner(grid, player)
-    if winner == player:
-        return 1
-    elif full(grid):
-        return 0
-    else:
-        bestScore = -10
-        for r, c in empty_cells(grid):
-            grid2 = [grid[row].copy() for row in range(3)]
-            grid2[r][c] = player 
-            score = -negamax(grid2, 3 - player)
-            if score > bestScore:
-                 bestScore = score
-        return bestScore
-
-
-def choice(grid, player):
-    # return faible(grid, player)
-    bestScore = -10
-    l_bestPos = []
-    for r, c in empty_cells(grid):
-        grid2 = [grid[row].copy() for row in range(3)]
-        grid2[r][c] = player
-        score = -negamax(grid2, 3 - player)
-        if score > bestScore:
-            bestScore = score
-            bestPos = [(r, c)]
-        elif score == bestScore:
-            bestPos.append((r,c))
-    return random.choice(bestPos)
+POLL_DELAY = 50     # ms entre 2 coups d'oeil sur la recherche de l'IA
 
+TOKEN = ['', 'X', 'O']
 
 # ---------------------------------
 # LA VUE
@@ -188,49 +56,49 @@ def draw_grid(t):
     """
     Dessine la grille vierge
     """
-    t.color((80,80,80))
-    a = GRID_SIZE // 2
-    b = GAME_SIZE // 2 + MARGIN // 2
-    pts = [(-a,-b), (-a,b), (-b,-a), (b,-a)]
-    angles = [0, 0, 90, 90]
-    for index, pt in enumerate(pts):
-        move_to(t, pt)
-        t.seth(angles[index])
-        t.fd(GRID_SIZE)
+    t.color(BoardGeometry.GRID_COLOR)
+    t.pensize(GEOMETRY.thickness)
+    for start, end in GEOMETRY.grid_lines():
+        move_to(t, start)
+        t.goto(end)
 
 
+def register_shapes(t):
+    """
+    Les marques sont dessinées une fois pour toutes, en formes
+    que la tortue tamponne : les formes 'X', 'O', 'X-' et 'O-'
+    (taille réduite)
+    """
+    import turtle
+    background = t.screen.bgcolor()
+    for small in (False, True):
+        marks = {'X': GEOMETRY.cross_polygons(small), 'O': GEOMETRY.round_polygons(background, small)}
+        for token, polygons in marks.items():
+            shape = turtle.Shape('compound')
+            for color, polygon in polygons:
+                shape.addcomponent(polygon, color, color)
+            t.screen.register_shape(token + ('-' if small else ''), shape)
+
+def stamp(t, token, centre, small):
+    t.up()
+    t.seth(90)          # cap au nord : le repère des formes est celui de l'écran
+    t.shape(token + ('-' if small else ''))
+    t.goto(centre)
+    return t.stamp()
+
 def draw_cross(t, centre, small=False):
     """
-    Dessine une croix centrée au point centre
+    Tamponne une croix centrée au point centre
     En taille réduite si small vaut True
     """
-    t.seth(0)
-    t.color(CROSS_COLOR)
-    t.pensize(MARK_THICKNESS)
-    d = round(2*GAME_SIZE / (3*math.sqrt(2)))
-    if small:
-        d = round(d/1.5)
-    move_to(t, centre)
-    t.left(45)
-    for _ in range(4):
-        t.fd(d)
-        move_to(t, centre)
-        t.left(90)
+    return stamp(t, 'X', centre, small)
 
 def draw_round(t, centre, small=False):
     """
-    Dessine un rond centré au point centre
+    Tamponne un rond centré au point centre
     En taille réduite si small vaut True
     """
-    x, y = centre
-    t.seth(0)
-    t.color(CIRCLE_COLOR)
-    t.pensize(MARK_THICKNESS)
-    move_to(t, (x, y - GAME_SIZE // 2 + MARK_THICKNESS))
-    radius = GAME_SIZE // 2 - MARGIN // 2 - MARK_THICKNESS // 2
-    if small:
-        radius = round(radius / 1.5)
-    t.circle(radius)
+    return stamp(t, 'O', centre, small)
 
 
 def center(row, col):
@@ -239,11 +107,7 @@ def center(row, col):
     donc du style (0,0), (1,0) etc
     en coordonnées où seront dessinées la X ou le O
     """
-    row = row - 1
-    col = col - 1
-    pixrow = (GAME_SIZE + MARGIN) * row
-    pixcol = (GAME_SIZE + MARGIN) * col
-    return (pixcol, pixrow)
+    return GEOMETRY.center(row, col)
 
 def view_update(t, row, col, player):
     if player == CROIX:
@@ -281,8 +145,16 @@ def screen_game(t):
     draw_grid(t)
     t.screen.update()
 
+def erase(t, n):
+    """
+    Efface les n dernières marques (après l'annulation de coups) :
+    les tampons sont retirés dans l'ordre inverse des coups
+    """
+    t.clearstamps(-n)
+    t.screen.update()
+
 def inside(value):
-    return -GRID_SIZE//2 <= value <= GRID_SIZE//2
+    return -GEOMETRY.grid_width//2 <= value <= GEOMETRY.grid_width//2
 
 def trad_click(mouse_x, mouse_y):
     """
@@ -290,9 +162,9 @@ def trad_click(mouse_x, mouse_y):
     graphique en coordonnées 3x3 de notre grille de jeu
     """
     if inside(mouse_x) and inside(mouse_y):
-        row = (mouse_y + GRID_SIZE // 2) // GAME_SIZE
-        col = (mouse_x + GRID_SIZE // 2) // GAME_SIZE
-        return int(row), int(col)
+        row = (mouse_y + GEOMETRY.grid_height / 2) // GEOMETRY.step
+        col = (mouse_x + GEOMETRY.grid_width / 2) // GEOMETRY.step
+        return min(int(row), 2), min(int(col), 2)
     return None, None
 
 
@@ -302,6 +174,7 @@ def annonce(t, msg):
     t.clear()
     move_to(t, MSG_POSITION)
     t.write(msg, align='center', font=GAME_FONT)
+    t.screen.update()
 
 def annonce_player(t, player):
     annonce(t, f'{TOKEN[player]} joue')
@@ -319,7 +192,7 @@ def stop(t, winner):
 
 def init_turtle(t):
     t.ht()
-    t.screen.tracer(300)
+    t.screen.tracer(0)     # l'écran n'est redessiné que par screen.update()
     t.screen.colormode(255)
 
 
@@ -330,53 +203,142 @@ def human(players, player):
 def block_click(t):
     t.screen.onclick(None)
 
-def unblock_click(view, msg, grid, players, player, gameover):
+def block_keys(t):
+    t.screen.onkeypress(None, 'u')
+    t.screen.onkeypress(None, 'r')
+
+def unblock_keys(view, msg, grid, counts, stack, redo, recorder, players, player):
+    """
+    Les touches u (annuler) et r (refaire) : actives seulement
+    quand un humain a la main ou que la partie est finie
+    """
+    view.screen.onkeypress(lambda: undo(view, msg, grid, counts, stack, redo, recorder, players, player), 'u')
+    view.screen.onkeypress(lambda: redo_move(view, msg, grid, counts, stack, redo, recorder, players, player), 'r')
+
+def unblock_click(view, msg, grid, counts, stack, redo, recorder, players, player, gameover):
     """
     La fonction qui débloque le clic souris et lance la boucle de jeu
     avec les coordonnées du clic
     """
-    view.screen.onclick(lambda x, y: gameloop(view, msg, x, y, grid, players, player, gameover))
+    view.screen.onclick(lambda x, y: gameloop(view, msg, x, y, grid, counts, stack, redo, recorder, players, player, gameover))
 
 
-def gameloop(view, msg, row, col, grid, players, player, gameover):
+def gameloop(view, msg, row, col, grid, counts, stack, redo, recorder, players, player, gameover):
     """
     La boucle de jeu :
     En entrant on commence par bloquer les clics, le temps de traiter
     les infos courantes
     """
     block_click(view)
+    block_keys(view)
     winner = 0 # pas de gagnant pour l'instant
     if row is not None: # La 1ere fois qu'on arrive ici row est None
         if human(players, player):
             row, col = trad_click(row, col) # on demande à la vue de traduire le clic souris en row, col du jeu
         if not human(players, player) or valid_move(grid, row, col):
-            winner, gameover = play_move(grid, row, col, player) # mise à jour du modèle
+            winner, gameover = play_move(grid, counts, stack, row, col, player) # mise à jour du modèle
+            redo.clear() # un nouveau coup : les coups annulés ne peuvent plus être refaits
             view_update(view, row, col, player) # mise à jour de la vue (on affiche la nouvelle marque)
+            if gameover:
+                save(recorder, stack, players, winner) # la partie est enregistrée
             player = 3 - player # on passe au joueur suivant
-    play(view, msg, grid, players, player, winner, gameover)
+    play(view, msg, grid, counts, stack, redo, recorder, players, player, winner, gameover)
 
 
-def play(view, msg, grid, players, player, winner, gameover):
+def play(view, msg, grid, counts, stack, redo, recorder, players, player, winner, gameover):
     """
     La fonction qui permet de récupérer 1 coup
     """
     if gameover:
         stop(msg, winner)
+        if HUMAIN in players:
+            unblock_keys(view, msg, grid, counts, stack, redo, recorder, players, player)
     elif human(players, player):
         # si c'est un humain qui joue, on débloque le clic qui appelera
         # la boucle de jeu avec les coordonnées du clic
-        unblock_click(view, msg, grid, players, player, gameover)
+        unblock_click(view, msg, grid, counts, stack, redo, recorder, players, player, gameover)
+        unblock_keys(view, msg, grid, counts, stack, redo, recorder, players, player)
         annonce_player(msg, player)
     else:
-        annonce(msg, 'Je réfléchis...')
-        row, col = choice(grid, player) # l'IA
-        gameloop(view, msg, row, col, grid, players, player, gameover) 
+        # le coup de la machine est lancé par la minuterie, et non
+        # appelé d'ici : la pile d'appels ne grandit pas d'un coup à l'autre
+        view.screen.ontimer(lambda: think(view, msg, grid, counts, stack, redo, recorder, players, player, gameover), 0)
+
+
+def think(view, msg, grid, counts, stack, redo, recorder, players, player, gameover):
+    """
+    L'IA cherche dans un thread, sur une copie de la grille :
+    la fenêtre reste réactive pendant ce temps
+    """
+    search = BackgroundSearch(choice, [line.copy() for line in grid], player)
+    wait_machine(view, msg, search, grid, counts, stack, redo, recorder, players, player, gameover)
+
+
+def wait_machine(view, msg, search, grid, counts, stack, redo, recorder, players, player, gameover):
+    """
+    On revient ici toutes les POLL_DELAY millisecondes
+    jusqu'à ce que l'IA ait trouvé son coup
+    """
+    if search.done():
+        row, col = search.result()
+        gameloop(view, msg, row, col, grid, counts, stack, redo, recorder, players, player, gameover)
+    else:
+        annonce(msg, f'Je réfléchis... {search.elapsed():.1f} s')
+        view.screen.ontimer(lambda: wait_machine(view, msg, search, grid, counts, stack, redo, recorder, players, player, gameover), POLL_DELAY)
 
 
+def save(recorder, stack, players, winner):
+    """
+    Enregistre la partie finie : les coups sont ceux de la pile
+    (recorder vaut None si on n'enregistre pas)
+    """
+    if recorder is not None:
+        strategies = tuple('humain' if players[p] == HUMAIN else 'negamax' for p in (CROIX, ROND))
+        recorder.write(Record(3, 3, 3, strategies, winner, tuple(stack)))
 
 
+# -- Annuler / refaire, avec la pile des coups joués (stack)
+# -- et celle des coups annulés (redo)
 
-def game_begin(key, main_turtle, snd_turtle, grid, players, player, gameover):
+def undo(view, msg, grid, counts, stack, redo, recorder, players, player):
+    """
+    Annule le dernier coup, et ceux de la machine qui le précèdent :
+    la main revient ainsi à un humain
+    """
+    if not stack:
+        return
+    n = len(stack)
+    redo.append(pop_move(grid, counts, stack))
+    player = 3 - player
+    while stack and not human(players, player):
+        redo.append(pop_move(grid, counts, stack))
+        player = 3 - player
+    erase(view, n - len(stack))
+    gameloop(view, msg, None, None, grid, counts, stack, redo, recorder, players, player, False)
+
+def redo_move(view, msg, grid, counts, stack, redo, recorder, players, player):
+    """
+    Rejoue le dernier coup annulé, et ceux de la machine qui le
+    suivaient
+    """
+    if not redo:
+        return
+    block_click(view)
+    block_keys(view)
+    winner, gameover = 0, False
+    while redo and not gameover:
+        row, col = redo.pop()
+        winner, gameover = play_move(grid, counts, stack, row, col, player)
+        view_update(view, row, col, player)
+        player = 3 - player
+        if human(players, player):
+            break
+    play(view, msg, grid, counts, stack, redo, recorder, players, player, winner, gameover)
+
+
+
+
+def game_begin(key, main_turtle, snd_turtle, grid, counts, stack, redo, recorder, players, player, gameover):
     """
     Le début du jeu : après la mise à jour de la liste des joueurs 
     en fonction du choix de l'utilisateur,
@@ -389,23 +351,31 @@ def game_begin(key, main_turtle, snd_turtle, grid, players, player, gameover):
             '4':(None, MACHINE,MACHINE)}
     for p in [CROIX, ROND]:
         players[p] = choix[key][p]
+    # une seule partie : une touche 1 à 4 en cours de partie lancerait
+    # une seconde boucle de jeu sur la même grille
+    for touche in choix:
+        main_turtle.screen.onkeypress(None, touche)
     screen_game(main_turtle)
-    gameloop(main_turtle, snd_turtle, None, None, grid, players, player, gameover)
+    gameloop(main_turtle, snd_turtle, None, None, grid, counts, stack, redo, recorder, players, player, gameover)
 
 
-def start():
+def start(record=None):
     """
     La fonction d'entrée dans le jeu
     Création des tortues,
     Initialisation des diverses variables nécessaires
+    Les parties sont enregistrées dans le fichier record s'il est donné
     """
 
+    import turtle   # importé ici : le module reste utilisable sans affichage
+
     # Les tortues
     #
     main_turtle = turtle.Turtle()  # tortue principale
     init_turtle(main_turtle)
     snd_turtle = turtle.Turtle()   # tortue secondaire pour les messages temproraires
     init_turtle(snd_turtle)
+    register_shapes(main_turtle)   # les formes des marques
     main_turtle.screen.listen()    # on écoute les interaction utilisateur
 
     # Premier écran du jeu : choix de joueurs
@@ -418,14 +388,18 @@ def start():
     player = CROIX              # joueur courant, c'est CROIX qui commence   
     gameover = False            # le booléen qui annoncera la fin de la partie
     grid = init_grid()          # initialisation de la grille
+    counts = init_counts()      # et de ses compteurs (alignements, cellules libres)
+    stack = []                  # les coups joués, pour pouvoir les annuler
+    redo = []                   # les coups annulés, pour pouvoir les refaire
+    recorder = RecordWriter(record) if record else None    # l'enregistrement des parties
     players = [None, None, None]
 
     # La suite ne se fera que lorsqu'on aura appuyé sur une touche parmi 1, 2, 3, 4
     #
-    main_turtle.screen.onkeypress(lambda : game_begin('1', main_turtle, snd_turtle, grid, players, player, gameover), '1')
-    main_turtle.screen.onkeypress(lambda : game_begin('2', main_turtle, snd_turtle, grid, players, player, gameover), '2')
-    main_turtle.screen.onkeypress(lambda : game_begin('3', main_turtle, snd_turtle, grid, players, player, gameover), '3')
-    main_turtle.screen.onkeypress(lambda : game_begin('4', main_turtle, snd_turtle, grid, players, player, gameover), '4')
+    main_turtle.screen.onkeypress(lambda : game_begin('1', main_turtle, snd_turtle, grid, counts, stack, redo, recorder, players, player, gameover), '1')
+    main_turtle.screen.onkeypress(lambda : game_begin('2', main_turtle, snd_turtle, grid, counts, stack, redo, recorder, players, player, gameover), '2')
+    main_turtle.screen.onkeypress(lambda : game_begin('3', main_turtle, snd_turtle, grid, counts, stack, redo, recorder, players, player, gameover), '3')
+    main_turtle.screen.onkeypress(lambda : game_begin('4', main_turtle, snd_turtle, grid, counts, stack, redo, recorder, players, player, gameover), '4')
 
 
     # Le mainloop qui permet à la fenêtre graphique de rester ouverte
@@ -435,7 +409,9 @@ def start():
 
 # LE MAIN, minimaliste
 #
-start()
+if __name__ == '__main__':
+    import sys
+    start(*sys.argv[1:2])
 
 
 
@@ -7,6 +7,16 @@ avec le module turtle
 
 Lancement du script : ./tictactoe.py Puis 
 tout doit se faire à la souris ;-)
+Pour une grille plus grande : ./tictactoe_oo.py largeur hauteur k
+Avec --stats, les mesures de la recherche de l'IA s'affichent sous
+le message ; avec --stats=fichier.jsonl, elles y sont aussi écrites
+Avec --record, les parties sont enregistrées dans parties.ttr (ou
+--record=fichier.ttr, voir engine/records.py)
+Avec --mcts, la machine joue par recherche Monte-Carlo (voir
+engine/mcts.py), mieux adaptée aux grandes grilles
+Quand la machine joue seule : --pace=ms fixe la pause avant chaque
+coup (2000 par défaut), --turbo (ou la touche t) supprime pauses et
+affichages intermédiaires, --auto enchaîne les parties
 
 Auteur : Sébastien Hoarau 
 Date   : Décembre 2018
@@ -16,12 +26,14 @@ Date   : Décembre 2018
 # --
 
 import turtle
-import math
-import time
-import random
 
-CROSS = 1
-ROUND = 2
+# le modèle : règles et IA (voir engine/model.py)
+from engine.model import GameModel, MNKModel, CROSS, ROUND
+from engine.mcts import MCTSModel
+from engine.background import BackgroundSearch
+from engine import stats as stats_module
+from engine.records import RecordWriter, Record, fits
+from engine.render import BoardGeometry
 
 
 # -- LES CLASSES
@@ -33,18 +45,20 @@ class GameView(turtle.Turtle):
     TITLE = 'TicTacToe'
     TITLE_FONT = ('helvetica', 36, 'normal')
     GAME_FONT = ('helvetica', 28, 'normal')
+    STATS_FONT = ('courier', 12, 'normal')
     TITLE_POSITION = 0, 250
     MSG_POSITION = 0, -250
-    GAME_SIZE = 120     # la dimension d'une croix ou d'un rond
-                        # cette dimension conditionne l'ensemble
-                        # de l'interface
-    MARGIN = 15
-    THICKNESS = 6           # taille du trait des éléments graphiques
-    GRID_SIZE = 3 * GAME_SIZE + 2 * THICKNESS
-
-    CROSS_COLOR = 'firebrick'
-    CIRCLE_COLOR = 'darkcyan'
-    MARK_THICKNESS = THICKNESS * 2
+    STATS_POSITION = 0, -280
+    TALLY_POSITION = 0, -300
+    # la géométrie est partagée avec le rendu sans écran (engine/render.py)
+    GAME_SIZE = BoardGeometry.GAME_SIZE
+    MARGIN = BoardGeometry.MARGIN
+    THICKNESS = BoardGeometry.THICKNESS
+    GRID_SIZE = BoardGeometry.GRID_SIZE
+
+    CROSS_COLOR = BoardGeometry.CROSS_COLOR
+    CIRCLE_COLOR = BoardGeometry.CIRCLE_COLOR
+    MARK_THICKNESS = BoardGeometry.MARK_THICKNESS
 
     TOKEN = ['', 'X', 'O']
 
@@ -56,16 +70,39 @@ class GameView(turtle.Turtle):
         #
         turtle.Turtle.__init__(self)
         self.ht()
-        self.screen.tracer(300)
+        self.screen.tracer(0)     # l'écran n'est redessiné que par screen.update()
         self.screen.colormode(255)
         self.pensize(GameView.THICKNESS)
-        
+
+        # -- géométrie de la grille : les dimensions des constantes
+        # -- sont celles d'une grille 3x3, réduites pour les plus grandes
+        #
+        geometry = self.geometry = BoardGeometry(model.width, model.height)
+        self.game_size = geometry.game_size
+        self.margin = geometry.margin
+        self.thickness = geometry.thickness
+        self.mark_thickness = geometry.mark_thickness
+        self.step = geometry.step       # écart entre 2 centres
+        self.grid_width = geometry.grid_width
+        self.grid_height = geometry.grid_height
 
         # -- 2e tortue pour les messages temporaires
         #
         self.turtle_msg = turtle.Turtle()
         self.turtle_msg.ht()
 
+        # -- 3e tortue qui tamponne les marques, dessinées une fois
+        # -- pour toutes en formes : effacer une marque, c'est retirer
+        # -- son tampon. Cap au nord : le repère des formes est alors
+        # -- celui de l'écran
+        #
+        self.turtle_marks = turtle.Turtle()
+        self.turtle_marks.ht()
+        self.turtle_marks.up()
+        self.turtle_marks.seth(90)
+        self.shapes = self.register_shapes()
+        self.grid_drawn = False
+
 
     def mainloop(self):
         self.screen.update()
@@ -93,65 +130,67 @@ class GameView(turtle.Turtle):
                 font=GameView.TITLE_FONT)
 
     def game_screen(self):
-        self.clear()
-        self.draw_title()
-        self.draw_grid()
+        """ Grille vierge : seules les marques sont effacées si elle est déjà là """
+        if not self.grid_drawn:
+            self.clear()
+            self.draw_title()
+            self.draw_grid()
+            self.grid_drawn = True
+        self.turtle_marks.clearstamps()
         self.screen.update()
 
     def draw_grid(self):
-        self.color((80,80,80))
-        a = GameView.GRID_SIZE // 2
-        b = GameView.GAME_SIZE // 2 + GameView.MARGIN // 2
-        pts = [(-a,-b), (-a,b), (-b,-a), (b,-a)]
-        angles = [0, 0, 90, 90]
-        for index, pt in enumerate(pts):
-            self.move_to(pt)
-            self.seth(angles[index])
-            self.fd(GameView.GRID_SIZE)
+        self.color(BoardGeometry.GRID_COLOR)
+        self.pensize(self.thickness)
+        for start, end in self.geometry.grid_lines():
+            self.move_to(start)
+            self.goto(end)
 
-    def inside(self, value):
-        return -GameView.GRID_SIZE // 2 <= value <= GameView.GRID_SIZE // 2
+    def inside(self, value, size):
+        return -size // 2 <= value <= size // 2
 
     def trad_click(self, mouse_x, mouse_y):
-        if self.inside(mouse_x) and self.inside(mouse_y):
-            row = (mouse_y + GameView.GRID_SIZE // 2) // GameView.GAME_SIZE
-            col = (mouse_x + GameView.GRID_SIZE // 2) // GameView.GAME_SIZE
-            return int(row), int(col)
+        width, height = self.model.width, self.model.height
+        if self.inside(mouse_x, self.grid_width) and self.inside(mouse_y, self.grid_height):
+            row = (mouse_y + self.step * height / 2) // self.step
+            col = (mouse_x + self.step * width / 2) // self.step
+            return min(max(int(row), 0), height - 1), min(max(int(col), 0), width - 1)
         return None, None
 
     def center(self, row, col):
-        row = row - 1
-        col = col - 1
-        pixrow = (GameView.GAME_SIZE + GameView.MARGIN) * row
-        pixcol = (GameView.GAME_SIZE + GameView.MARGIN) * col
-        return (pixcol, pixrow)
-
-
+        return self.geometry.center(row, col)
+
+    def cross_polygons(self, small=False):
+        """ La croix : 2 barres en diagonale, en (couleur, polygone) """
+        return self.geometry.cross_polygons(small)
+
+    def round_polygons(self, small=False, sides=36):
+        """ Le rond : un disque de la couleur, évidé par un disque du fond """
+        return self.geometry.round_polygons(self.screen.bgcolor(), small, sides)
+
+    def register_shapes(self):
+        """ Enregistre les formes des marques : {(joueur, small): nom} """
+        shapes = {}
+        for player, polygons in ((CROSS, self.cross_polygons), (ROUND, self.round_polygons)):
+            for small in (False, True):
+                name = f'{GameView.TOKEN[player]}{self.game_size}{"-" if small else ""}'
+                shape = turtle.Shape('compound')
+                for color, polygon in polygons(small):
+                    shape.addcomponent(polygon, color, color)
+                self.screen.register_shape(name, shape)
+                shapes[player, small] = name
+        return shapes
+
+    def stamp(self, player, centre, small=False):
+        self.turtle_marks.shape(self.shapes[player, small])
+        self.turtle_marks.goto(centre)
+        return self.turtle_marks.stamp()
 
     def cross(self, centre, small=False):
-        self.seth(0)
-        self.color(GameView.CROSS_COLOR)
-        self.pensize(GameView.MARK_THICKNESS)
-        d = round(2*GameView.GAME_SIZE / (3*math.sqrt(2)))
-        if small:
-            d = round(d/1.5)
-        self.move_to(centre)
-        self.left(45)
-        for _ in range(4):
-            self.fd(d)
-            self.move_to(centre)
-            self.left(90)
+        return self.stamp(CROSS, centre, small)
 
     def round(self, centre, small=False):
-        x, y = centre
-        self.seth(0)
-        self.color(GameView.CIRCLE_COLOR)
-        self.pensize(GameView.MARK_THICKNESS)
-        self.move_to((x, y - GameView.GAME_SIZE // 2 + GameView.MARK_THICKNESS))
-        radius = GameView.GAME_SIZE // 2 - GameView.MARGIN // 2 - GameView.MARK_THICKNESS // 2
-        if small:
-            radius = round(radius / 1.5)
-        self.circle(radius)
+        return self.stamp(ROUND, centre, small)
 
 
     def draw_fcts(self):
@@ -160,7 +199,8 @@ class GameView(turtle.Turtle):
     def update(self):
         row, col = self.controller.last_move
         self.draw_fcts()[self.model.player](self.center(row, col))
-        self.screen.update()
+        if not self.controller.fast():  # en turbo, l'écran attend la fin de la partie
+            self.screen.update()
 
     def move_to(self, pos, other=None):
         if other:
@@ -176,10 +216,18 @@ class GameView(turtle.Turtle):
         self.turtle_msg.clear()
         self.move_to(GameView.MSG_POSITION, self.turtle_msg)
         self.turtle_msg.write(msg, align='center', font=GameView.GAME_FONT)
+        probe = self.controller.stats
+        if probe is not None and probe.last:
+            self.move_to(GameView.STATS_POSITION, self.turtle_msg)
+            self.turtle_msg.write(probe.overlay(), align='center', font=GameView.STATS_FONT)
+        self.screen.update()
 
     def annonce_player(self):
         self.annonce(f'{GameView.TOKEN[self.model.player]} joue')
 
+    def thinking(self, elapsed):
+        self.annonce(f'{GameView.TOKEN[self.model.player]} réfléchit... {elapsed:.1f} s')
+
 
     def stop(self):
         winner = self.model.winner
@@ -187,161 +235,88 @@ class GameView(turtle.Turtle):
             self.annonce(f'{GameView.TOKEN[winner]} GAGNE')
         else:
             self.annonce('PARTIE NULLE')
-        self.screen.update()
-
-
-class GameModel:
-    """ LE MODÈLE """
-
-    EMPTY = 0
-    HUMAIN = 0
-    MACHINE = 1
-
-    def __init__(self):
-        self.grid = [[0] * 3 for _ in range(3)]
-        self.player = CROSS
-        self.winner = 0
-
-
-    def valid_move(self, row, col):
-        return self.grid[row][col] == GameModel.EMPTY
-
-    def empty_cells(self):
-        return {(r,c) for r in range(3) for c in range(3) 
-                        if self.grid[r][c] == GameModel.EMPTY}
-
-    def negamax(self):
-        """
-        Calcule le meilleur score pour le joueur courant
-        Au TicTacToe, on va pouvoir explorer toutes les
-        configurations et retourner le vrai score des configurations
-        finales : 1 si le joueur gagne, -1 s'il perd et 0 pour un nul
-        """
-        if self.check_winner():
-            return 1
-        elif self.full():
-            return 0
-        else:
-            bestScore = -10
-            for r, c in self.empty_cells():
-                self.grid[r][c] = self.player
-                self.next_player() 
-                score = -self.negamax()
-                if score > bestScore:
-                     bestScore = score
-                self.grid[r][c] = GameModel.EMPTY
-                self.next_player()
-            return bestScore
-
-
-    def choice(self):
-        # return faible(grid, player)
-        bestScore = -10
-        l_bestPos = []
-        for r, c in self.empty_cells():
-            self.grid[r][c] = self.player
-            self.next_player() 
-            score = -self.negamax()
-            if score > bestScore:
-                bestScore = score
-                bestPos = [(r, c)]
-            elif score == bestScore:
-                bestPos.append((r,c))
-            self.grid[r][c] = GameModel.EMPTY
-            self.next_player() 
-        return random.choice(bestPos)
-
-    # def choice(self):
-    #     """ La machine joue au hasard pour l'instant """
-    #     candidats = [(row, col) for row in range(3) for col in range(3)
-    #                     if self.valid_move(row, col)]
-    #     return random.choice(candidats)
-
-    def next_player(self):
-        self.player = 3 - self.player
-
-
-    def one_line(self):
-        """
-        Retourne l'ID du joueur courant si celui-ci à 3
-        aligné sur une ligne, 0 sinon
-        """
-        for row in range(3):
-            if self.grid[row] == [self.player] * 3:
-                return self.player
-        return 0
-
-    def one_diag(self):
-        """
-        Retourne l'ID du joueur courant s'il en a 3
-        alignés sur une deux diagonales, 0 sinon
-        """
-        if [self.grid[row][row] for row in range(3)] == [self.player] * 3:
-            return self.player
-        if [self.grid[row][2 - row] for row in range(3)] == [self.player] * 3:
-            return self.player
-        return 0
-
-    def one_col(self):
-        """
-        Retourne l'ID du joueur courant s'il en a 3
-        alignés sur une des colonnes, 0 sinon
-        """
-        for col in range(3):
-            if [self.grid[row][col] for row in range(3)] == [self.player] * 3:
-                return self.player
-        return 0
-
-
-    def full(self):
-        return all(self.grid[r][c] != GameModel.EMPTY
-                        for r in range(3) for c in range(3))
-
-    def check_winner(self):
-        return self.one_line() or\
-                self.one_col() or\
-                self.one_diag()
-
-    def update_winner(self):
-        self.winner = self.check_winner()
-
-
-    def end_game(self):
-        return self.winner != 0 or self.full()
-
-    def play(self, move):
-        row, col = move
-        self.grid[row][col] = self.player
-        self.update_winner()
-        self.next_player()
-        return self.end_game()
-
 
+    def tally(self, results):
+        """ Le bilan des parties enchaînées, sous le message """
+        draws, x_wins, o_wins = results
+        self.move_to(GameView.TALLY_POSITION, self.turtle_msg)
+        self.turtle_msg.write(f'{draws + x_wins + o_wins} parties : X {x_wins}, O {o_wins}, '
+                              f'nulles {draws}', align='center', font=GameView.STATS_FONT)
+        self.screen.update()
 
 
 class GameController:
-    """ LE CONTRÔLEUR """
-
-    def __init__(self):
-        self.model = GameModel()
+    """
+    LE CONTRÔLEUR : une machine à états. Aucune méthode n'en appelle
+    une autre en boucle : un coup de la machine est toujours lancé
+    par screen.ontimer, la pile d'appels ne grandit donc pas d'un coup
+    à l'autre, et la fenêtre reste réactive entre deux coups
+
+        MENU     l'écran d'accueil, une touche 1 à 4 lance la partie
+        HUMAN    on attend le clic du joueur
+        MACHINE  l'IA cherche son coup (dans un thread)
+        OVER     partie finie ; relancée après RESTART_DELAY si auto
+    """
+
+    MENU, HUMAN, MACHINE, OVER = 'menu', 'humain', 'machine', 'fin'
+
+    POLL_DELAY = 50     # ms entre 2 coups d'oeil sur la recherche de l'IA
+    TURBO_POLL_DELAY = 2    # le même, en mode turbo
+    PACE = 2000         # ms avant chaque coup quand la machine joue seule
+    RESTART_DELAY = 2000    # ms avant de relancer une partie finie (auto)
+
+    def __init__(self, width=3, height=3, k=3, stats=False, log=None, record=None, mcts=False,
+                 pace=PACE, turbo=False, auto=False, time_limit=MNKModel.TIME_LIMIT):
+        # time_limit : secondes de réflexion par coup au-delà du 3x3,
+        # que la machine ne dépasse pas quelle que soit la grille
+        if record and not fits(width, height, k):
+            # sinon encode échouerait à la fin de la première partie
+            raise ValueError(f'--record : les parties en {width}x{height}/{k} ne tiennent pas '
+                             'dans le format des fichiers de parties (16 de côté au plus, '
+                             'moins de 256 cellules)')
+        if mcts:
+            self.model = MCTSModel(width, height, k, time_limit=time_limit)
+        elif (width, height, k) == (3, 3, 3):
+            self.model = GameModel()
+        else:
+            self.model = MNKModel(width, height, k, time_limit=time_limit)
+        # les mesures de la recherche (voir engine/stats.py), None si inactives
+        self.stats = stats_module.instrument(self.model, log) if stats else None
         self.view = GameView(self, self.model)
-
-        self.wait = False       # pour temporiser qd la machine joue seule
+        # l'enregistrement des parties dans le fichier record, None si inactif
+        self.recorder = RecordWriter(record) if record else None
+
+        self.pace = pace        # pour temporiser qd la machine joue seule
+        self.turbo = turbo      # machine seule : ni pause, ni affichage avant la fin
+        self.auto = auto        # enchaîner les parties
+        self.state = GameController.MENU
+        self.key = None         # le choix des joueurs, pour relancer
+        self.game = 0           # numéro de la partie : les minuteries d'une
+                                # partie abandonnée n'ont plus d'effet
+        self.results = [0, 0, 0]    # nulles, victoires X, victoires O
         self.players = tuple()  # qui sont les joueurs
         self.gameover = False
         self.last_move = None
-
+        self.moves = []         # les coups de la partie en cours
+        self.search = None      # la recherche de l'IA en cours
 
 
     def block_click(self):
         self.view.screen.onclick(None)
 
     def unblock_click(self):
-        self.view.screen.onclick(self.gameloop)
+        self.view.screen.onclick(self.click)
 
     def human(self):
         return self.players[self.model.player] == GameModel.HUMAIN
 
+    def machines_only(self):
+        return GameModel.HUMAIN not in self.players
+
+    def fast(self):
+        """ Le mode turbo ne vaut que si aucun humain ne joue """
+        return self.turbo and self.machines_only()
+
     def valid_move(self, row, col):
         if row is not None and self.model.valid_move(row, col):
             self.last_move = row, col
@@ -351,46 +326,121 @@ class GameController:
     def annonce_player(self):
         self.view.annonce_player()
 
-    def gameloop(self, x = None, y = None):
-        self.block_click()
-        if x is not None:
-            if self.human():
-                row, col = self.view.trad_click(x, y)
-            if not self.human() or self.valid_move(row, col):   
-                self.view.update()
-                self.gameover = self.model.play(self.last_move)
-        self.play()
-
-    def play(self):
+    def schedule(self, delay, action):
+        """ action() dans delay ms, si la partie en cours est toujours la même """
+        game = self.game
+        self.view.screen.ontimer(lambda: game == self.game and action(), delay)
+
+    # -- les transitions
+
+    def click(self, x, y):
+        """ HUMAN : le clic du joueur """
+        if self.state != GameController.HUMAN:
+            return
+        row, col = self.view.trad_click(x, y)
+        if self.valid_move(row, col):
+            self.block_click()
+            self.move()
+
+    def move(self):
+        """ Joue last_move, puis passe au tour suivant """
+        self.view.update()
+        self.gameover = self.model.play(self.last_move)
+        self.moves.append(self.last_move)
+        if self.gameover:
+            self.save(self.model.winner)
+        self.next_turn()
+
+    def next_turn(self):
         if self.gameover:
             self.stop()
         elif self.human():
+            self.state = GameController.HUMAN
             self.annonce_player()
             self.unblock_click()
         else:
-            self.annonce_player()
-            if self.wait:
-                time.sleep(2)
-            self.last_move = self.model.choice()
-            self.gameloop(1)
+            self.state = GameController.MACHINE
+            if not self.fast():
+                self.annonce_player()
+            pause = self.pace if self.machines_only() and not self.turbo else 0
+            self.schedule(pause, self.think)
+
+    def think(self):
+        """
+        L'IA cherche sur une copie du modèle, dans un thread : la
+        fenêtre reste réactive et poll vient chercher le résultat
+        """
+        model = self.model.clone()
+        self.search = BackgroundSearch(model.choice, stop=model.stop)
+        self.poll(self.search)
+
+    def poll(self, search):
+        if search is not self.search:   # recherche annulée entre temps
+            return
+        if not search.done():
+            if self.fast():
+                delay = GameController.TURBO_POLL_DELAY
+            else:
+                delay = GameController.POLL_DELAY
+                self.view.thinking(search.elapsed())
+            self.view.screen.ontimer(lambda: self.poll(search), delay)
+            return
+        self.search = None
+        self.last_move = search.result()
+        self.move()
+
+    def cancel(self):
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+
+    def save(self, winner):
+        """ Enregistre la partie ; winner vaut None si elle est abandonnée """
+        if self.recorder is not None and self.moves:
+            model = self.model
+            strategies = tuple('humain' if player == GameModel.HUMAIN else model.strategy
+                               for player in self.players[1:])
+            self.recorder.write(Record(model.width, model.height, model.k,
+                                       strategies, winner, tuple(self.moves)))
+        self.moves = []
 
     def mainloop(self):
         self.view.mainloop()
 
     def stop(self):
+        """ OVER : le résultat, et la partie suivante si auto """
+        self.state = GameController.OVER
+        self.results[self.model.winner] += 1
         self.view.stop()
+        if self.auto:
+            self.view.tally(self.results)
+            self.schedule(0 if self.fast() else GameController.RESTART_DELAY,
+                          lambda: self.game_begin(self.key))
+
+    def toggle_turbo(self):
+        """ La touche t : le mode turbo, pris en compte dès le coup suivant """
+        self.turbo = not self.turbo
 
     def game_begin(self, key):
         choix = {'1':(None, GameModel.HUMAIN, GameModel.HUMAIN),
                 '2':(None, GameModel.HUMAIN,GameModel.MACHINE),
                 '3':(None, GameModel.MACHINE, GameModel.HUMAIN),
                 '4':(None, GameModel.MACHINE,GameModel.MACHINE)}
+        # une touche pendant la partie la recommence : on abandonne
+        # la recherche en cours éventuelle, et les minuteries
+        self.cancel()
+        self.block_click()
+        self.game += 1
+        if not self.gameover:
+            self.save(None)
+        if key != self.key:
+            self.results = [0, 0, 0]
+        self.key = key
+        self.model.reset()
+        self.gameover = False
         self.players = choix[key]
-        if self.players[CROSS] == GameModel.MACHINE and\
-                    self.players[ROUND] == GameModel.MACHINE:
-            self.wait = True
         self.view.game_screen()
-        self.gameloop()
+        self.next_turn()
 
     def start(self):
         self.view.screen.listen()
@@ -402,10 +452,31 @@ class GameController:
         self.view.screen.onkeypress(lambda : self.game_begin('2'), '2')
         self.view.screen.onkeypress(lambda : self.game_begin('3'), '3')
         self.view.screen.onkeypress(lambda : self.game_begin('4'), '4')
-
-
-
-ttt = GameController()
-ttt.start()
-ttt.mainloop()
-
+        self.view.screen.onkeypress(self.toggle_turbo, 't')
+
+
+
+if __name__ == '__main__':
+    # ./tictactoe_oo.py [largeur hauteur k] [--stats[=fichier.jsonl]]
+    # [--record[=fichier.ttr]] [--mcts] [--pace=ms] [--turbo] [--auto] [--time=ms],
+    # par ex. 15 15 5 --time=50 pour le Gomoku, 50 ms par coup de la machine
+    import sys
+    from engine.records import PATH
+    sizes = [int(arg) for arg in sys.argv[1:] if not arg.startswith('--')]
+    options = [arg for arg in sys.argv[1:] if arg.startswith('--stats')]
+    log = options[0].partition('=')[2] or None if options else None
+    if options and '--mcts' in sys.argv:
+        # engine/stats ne sait compter que les recherches alpha-beta
+        sys.exit('--stats ne mesure pas la recherche Monte-Carlo : retirer --stats ou --mcts')
+    records = [arg.partition('=')[2] or PATH for arg in sys.argv[1:] if arg.startswith('--record')]
+    paces = [int(arg.partition('=')[2]) for arg in sys.argv[1:] if arg.startswith('--pace=')]
+    limits = [int(arg.partition('=')[2]) / 1000 for arg in sys.argv[1:] if arg.startswith('--time=')]
+    try:
+        ttt = GameController(*sizes[:3], stats=bool(options), log=log, record=records[0] if records else None,
+                             mcts='--mcts' in sys.argv, pace=paces[0] if paces else GameController.PACE,
+                             turbo='--turbo' in sys.argv, auto='--auto' in sys.argv,
+                             time_limit=limits[0] if limits else MNKModel.TIME_LIMIT)
+    except ValueError as error:
+        sys.exit(str(error))
+    ttt.start()
+    ttt.mainloop()